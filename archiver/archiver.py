@@ -5,45 +5,67 @@ University of Ottawa, Ontario, Canada
 E-mail: apesaran -at- uottawa -dot- ca / alipsgh -at- gmail -dot- com
 """
 
+import json
 import os
-import zipfile
-from os.path import basename
+import pickle
+
+import numpy
 
 
 class Archiver:
     """
-    This class stores results of experiments in .zip files for future reference!
+    This class stores results of experiments in compressed .npz files for future reference!
+    Each series is stored as a typed array, next to a small JSON header of metadata, e.g. the names of the pairs,
+    their settings, and the random seed. An archive is loaded back into NumPy arrays by Archiver.load.
+    Objects which are not arrays, e.g. the learners and detectors of a checkpoint, are stored by pickle.
     """
 
-    @staticmethod
-    def archive_single(label, stats, dir_path, name, sub_name):
-
-        file_path = (dir_path + name + "_" + sub_name).lower()
-
-        stats_writer = open(file_path + ".txt", 'w')
-        stats_writer.write(label + "\n")
-        stats_writer.write(str(stats) + "\n")
-        stats_writer.close()
-
-        zipper = zipfile.ZipFile(file_path + ".zip", 'w')
-        zipper.write(file_path + ".txt", compress_type=zipfile.ZIP_DEFLATED, arcname=basename(file_path + ".txt"))
-        zipper.close()
+    HEADER_KEY = "__header__"
 
-        os.remove(file_path + ".txt")
+    @staticmethod
+    def archive_single(label, stats, dir_path, name, sub_name, metadata=None):
+        metadata = dict(metadata) if metadata is not None else {}
+        metadata["labels"] = [label]
+        return Archiver.archive_arrays({"stats": numpy.asarray(stats)}, dir_path, name, sub_name, metadata)
 
     @staticmethod
-    def archive_multiple(labels, stats, dir_path, name, sub_name):
+    def archive_multiple(labels, stats, dir_path, name, sub_name, metadata=None):
+        # THE SERIES ARE STORED AS THE ROWS OF AN ARRAY, IN THE ORDER OF THE LABELS
+        metadata = dict(metadata) if metadata is not None else {}
+        metadata["labels"] = list(labels)
+        return Archiver.archive_arrays({"stats": numpy.asarray(stats)}, dir_path, name, sub_name, metadata)
 
-        file_path = (dir_path + name + "_" + sub_name).lower()
+    @staticmethod
+    def archive_arrays(arrays, dir_path, name, sub_name, metadata=None):
+        """Stores the named arrays, together with the metadata, in a .npz file. The arrays are compressed
+        and written into the archive, and the metadata must be serializable to JSON."""
+        file_path = (dir_path + name + "_" + sub_name).lower() + ".npz"
+        header = numpy.array(json.dumps(metadata if metadata is not None else {}))
+        # THE FILE IS WRITTEN UNDER A TEMPORARY NAME FIRST, SO READERS NEVER SEE A HALF-WRITTEN FILE
+        temp_path = file_path + "." + str(os.getpid()) + ".tmp.npz"
+        numpy.savez_compressed(temp_path, **{Archiver.HEADER_KEY: header}, **arrays)
+        os.replace(temp_path, file_path)
+        return file_path
 
-        stats_writer = open(file_path + ".txt", 'w')
-        for i in range(0, len(labels)):
-            stats_writer.write(labels[i] + "\n")
-            stats_writer.write(str(stats[i]) + "\n")
-        stats_writer.close()
+    @staticmethod
+    def load(file_path):
+        """Returns the metadata and the named arrays of an archive."""
+        with numpy.load(file_path, allow_pickle=False) as archive:
+            metadata = json.loads(str(archive[Archiver.HEADER_KEY]))
+            arrays = {key: archive[key] for key in archive.files if key != Archiver.HEADER_KEY}
+        return metadata, arrays
 
-        zipper = zipfile.ZipFile(file_path + ".zip", 'w')
-        zipper.write(file_path + ".txt", compress_type=zipfile.ZIP_DEFLATED, arcname=basename(file_path + ".txt"))
-        zipper.close()
+    @staticmethod
+    def archive_object(obj, dir_path, name, sub_name):
+        """Stores an object in a .pkl file, which replaces the previous one at once."""
+        file_path = (dir_path + name + "_" + sub_name).lower() + ".pkl"
+        temp_path = file_path + "." + str(os.getpid()) + ".tmp"
+        with open(temp_path, "wb") as writer:
+            pickle.dump(obj, writer, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, file_path)
+        return file_path
 
-        os.remove(file_path + ".txt")
+    @staticmethod
+    def load_object(file_path):
+        with open(file_path, "rb") as reader:
+            return pickle.load(reader)
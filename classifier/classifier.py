@@ -5,21 +5,32 @@ University of Ottawa, Ontario, Canada
 E-mail: apesaran -at- uottawa -dot- ca / alipsgh -at- gmail -dot- com
 """
 
+import random
 import time
-from collections import OrderedDict
 
+from data_structures.confusion_matrix import ConfusionMatrix
 from dictionary.tornado_dictionary import TornadoDic
 from evaluators.classifier_evaluator import PredictionEvaluator
+from evaluators.memory_evaluator import MemoryEvaluator
+
+# THE STRIDES BETWEEN THE MEASURED CALLS ARE DRAWN FROM A RANDOM STATE OF THEIR OWN, AS THE GLOBAL ONE
+# IS USED BY THE LEARNERS AND THE DETECTORS, E.G. FOR THE INITIAL WEIGHTS OF PERCEPTRON
+_TIMING_RANDOM = random.Random()
 
 
 class SuperClassifier:
     """A classifier, e.g. Naive Bayes, inherits this super class!"""
 
+    # THE RUNNING TIMES ARE MEASURED ON ONE CALL IN TIMING_STEP CALLS, ON AVERAGE, AND EXTRAPOLATED TO THE CALLS
+    # IN BETWEEN; THE STRIDES ARE RANDOM, AND SO IS THE FIRST MEASURED CALL, SO THAT THE MEASURED CALLS DO NOT
+    # FALL IN STEP WITH ANY PERIODIC PATTERN OF THE STREAM. WITH A TIMING_STEP OF 1, EVERY CALL IS MEASURED
+    TIMING_STEP = 1
+
     def __init__(self, labels, attributes):
         self.CLASSES = labels
         self.ATTRIBUTES = attributes
-        self.__CONFUSION_MATRIX = OrderedDict()
-        self.__GLOBAL_CONFUSION_MATRIX = OrderedDict()
+        self.__CONFUSION_MATRIX = ConfusionMatrix(labels)
+        self.__GLOBAL_CONFUSION_MATRIX = ConfusionMatrix(labels)
 
         self.NUMBER_OF_INSTANCES_OBSERVED = 0
 
@@ -27,46 +38,34 @@ class SuperClassifier:
         self._TESTING_TIME = 0
         self._TOTAL_TRAINING_TIME = 0
         self._TOTAL_TESTING_TIME = 0
+        self.__TRAINING_SKIPS = _TIMING_RANDOM.randrange(self.TIMING_STEP)
+        self.__TESTING_SKIPS = _TIMING_RANDOM.randrange(self.TIMING_STEP)
 
         # THE _ACTIVE ATTRIBUTE IS USED TO SHOW WHETHER A CLASSIFIER IS SUSPENDED OR NOT
         self._ACTIVE = True
         self._IS_READY = False
 
-        self.__init_confusion_matrix()
-        self.__init_global_confusion_matrix()
-
-    def __init_confusion_matrix(self):
-        # self.__CONFUSION_MATRIX =
-        for real_class in self.CLASSES:
-            self.__CONFUSION_MATRIX[real_class] = OrderedDict()
-            for predicted_class in self.CLASSES:
-                self.__CONFUSION_MATRIX[real_class][predicted_class] = 0
-
-    def __init_global_confusion_matrix(self):
-        # self.__GLOBAL_CONFUSION_MATRIX =
-        for real_class in self.CLASSES:
-            self.__GLOBAL_CONFUSION_MATRIX[real_class] = OrderedDict()
-            for predicted_class in self.CLASSES:
-                self.__GLOBAL_CONFUSION_MATRIX[real_class][predicted_class] = 0
-
     def update_confusion_matrix(self, real_class, predicted_class):
-        self.__CONFUSION_MATRIX[real_class][predicted_class] += 1
-        self.__GLOBAL_CONFUSION_MATRIX[real_class][predicted_class] += 1
+        self.__CONFUSION_MATRIX.update(real_class, predicted_class)
+        self.__GLOBAL_CONFUSION_MATRIX.update(real_class, predicted_class)
 
     def get_confusion_matrix(self):
         return self.__CONFUSION_MATRIX
 
     def print_confusion_matrix(self):
-        for real_class in self.CLASSES:
-            for predicted_class in self.CLASSES:
-                print(self.__CONFUSION_MATRIX[real_class][predicted_class], end="\t")
-            print()
+        PredictionEvaluator.print_confusion_matrix(self.__CONFUSION_MATRIX)
 
     def get_global_confusion_matrix(self):
         return self.__GLOBAL_CONFUSION_MATRIX
 
     def reset_confusion_matrix(self):
-        self.__init_confusion_matrix()
+        self.__CONFUSION_MATRIX.reset()
+
+    def memory_footprint(self):
+        """Returns an estimate of the bytes taken by the classifier, from the sizes of its attributes and its
+        confusion matrices. A classifier adds the items of its tables, or its nodes, to this."""
+        return MemoryEvaluator.get_shallow_size(self) + MemoryEvaluator.get_shallow_size(self.__CONFUSION_MATRIX) + \
+            MemoryEvaluator.get_shallow_size(self.__GLOBAL_CONFUSION_MATRIX)
 
     def is_ready(self):
         return self._IS_READY
@@ -83,6 +82,11 @@ class SuperClassifier:
     def activate(self):
         self._ACTIVE = True
 
+    def set_timing_step(self, timing_step):
+        self.TIMING_STEP = timing_step
+        self.__TRAINING_SKIPS = _TIMING_RANDOM.randrange(timing_step)
+        self.__TESTING_SKIPS = _TIMING_RANDOM.randrange(timing_step)
+
     def get_training_time(self):
         return self._TRAINING_TIME
 
@@ -110,35 +114,57 @@ class SuperClassifier:
         self.reset_confusion_matrix()
 
     def do_training(self, record):
-        t1 = time.perf_counter()
+        if self.__TRAINING_SKIPS > 0:
+            self.__TRAINING_SKIPS -= 1
+            self.train(record)
+            return
+        t1 = time.perf_counter_ns()
         self.train(record)
-        t2 = time.perf_counter()
-        delta = (t2 - t1) * 1000  # in milliseconds
-        self._TRAINING_TIME += delta
-        self._TOTAL_TRAINING_TIME += delta
+        t2 = time.perf_counter_ns()
+        self.__add_training_time(t2 - t1)
 
     def train(self, record):
         pass
 
     def do_loading(self, record):
-        t1 = time.time()
+        if self.__TRAINING_SKIPS > 0:
+            self.__TRAINING_SKIPS -= 1
+            self.load(record)
+            return
+        t1 = time.perf_counter_ns()
         self.load(record)
-        t2 = time.time()
-        delta = (t2 - t1) * 1000  # in milliseconds
-        self._TRAINING_TIME += delta
-        self._TOTAL_TRAINING_TIME += delta
+        t2 = time.perf_counter_ns()
+        self.__add_training_time(t2 - t1)
 
     def load(self, record):
         pass
 
     def do_testing(self, record):
-        t1 = time.time()
+        if self.__TESTING_SKIPS > 0:
+            self.__TESTING_SKIPS -= 1
+            return self.test(record)
+        t1 = time.perf_counter_ns()
         pr = self.test(record)
-        t2 = time.time()
-        delta = (t2 - t1) * 1000  # in milliseconds
+        t2 = time.perf_counter_ns()
+        stride = self.__get_timing_stride()
+        self.__TESTING_SKIPS = stride - 1
+        delta = (t2 - t1) * stride / 1000000  # in milliseconds
         self._TESTING_TIME += delta
         self._TOTAL_TESTING_TIME += delta
         return pr
 
     def test(self, record):
         pass
+
+    def __add_training_time(self, delta_ns):
+        stride = self.__get_timing_stride()
+        self.__TRAINING_SKIPS = stride - 1
+        delta = delta_ns * stride / 1000000  # in milliseconds
+        self._TRAINING_TIME += delta
+        self._TOTAL_TRAINING_TIME += delta
+
+    def __get_timing_stride(self):
+        # A MEASURED CALL STANDS FOR ITSELF AND FOR THE CALLS SKIPPED AFTER IT, TIMING_STEP - 1 OF THEM ON AVERAGE
+        if self.TIMING_STEP == 1:
+            return 1
+        return _TIMING_RANDOM.randint(1, 2 * self.TIMING_STEP - 1)
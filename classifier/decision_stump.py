@@ -7,6 +7,7 @@ E-mail: apesaran -at- uottawa -dot- ca / alipsgh -at- gmail -dot- com
 
 import math
 import operator
+import sys
 from collections import OrderedDict
 
 from classifier.classifier import SuperClassifier
@@ -114,6 +115,13 @@ class DecisionStump(SuperClassifier):
             print("Please train a Decision Stump classifier first!")
             exit()
 
+    def memory_footprint(self):
+        size = super().memory_footprint()
+        for values_distributions in self.ATTRIBUTES_VALUES_DISTRIBUTIONS.values():
+            size += sys.getsizeof(values_distributions)
+            size += sum(sys.getsizeof(distributions) for distributions in values_distributions.values())
+        return size
+
     def reset(self):
         super()._reset_stats()
         self.CLASSES_DISTRIBUTIONS = OrderedDict()
@@ -15,6 +15,8 @@ import math
 import operator
 from collections import OrderedDict
 
+import numpy
+
 from classifier.classifier import SuperClassifier
 from dictionary.tornado_dictionary import TornadoDic
 
@@ -29,78 +31,247 @@ def calculate_entropy(x, y):
     return entropy
 
 
+def calculate_x_log_x(x):
+    """Calculates x * log2(x) element-wise, where 0 * log2(0) is taken as 0."""
+    x = x.astype(float)
+    return x * numpy.log2(numpy.where(x > 0, x, 1))
+
+
 def calculate_info_gain(node):
-    """This function calculate the information gain of attributes given a node."""
+    """This function calculate the information gain of attributes given a node, and returns the number of
+    instances the gains are based on."""
+
+    # THE CLASS COUNTS ARE TAKEN FROM THE STATISTICS OF THE FIRST CANDIDATE, SINCE A REACTIVATED LEAF HAS
+    # SEEN MORE INSTANCES THAN ITS ATTRIBUTE STATISTICS SHOW
+    distributions = node.CANDIDATE_ATTRIBUTES_VALUES_DISTRIBUTIONS
+    if len(node.CANDIDATE_OFFSETS) != 0:
+        end = node.CANDIDATE_OFFSETS[1] if len(node.CANDIDATE_OFFSETS) > 1 else len(distributions)
+        classes_distributions = distributions[:end].sum(axis=0).tolist()
+    else:
+        classes_distributions = node.NUMERIC_ESTIMATORS[0].COUNTS
+    n = sum(classes_distributions)
+
+    node.CANDIDATE_ATTRIBUTES_SCORES = OrderedDict()
+    node.CANDIDATE_SPLIT_VALUES = OrderedDict()
+    if n == 0:
+        return n
 
     # CALCULATING EXPECTED INFORMATION OF WHOLE TRAINING DATA
-    expected_info_tr = 0
-    for c, v in node.CLASSES_DISTRIBUTIONS.items():
-        if v == 0:
-            continue
-        expected_info_tr += calculate_entropy(v, node.NUMBER_OF_EXAMPLES_SEEN)
+    expected_info_tr = calculate_expected_info(classes_distributions)
 
-    # CALCULATING EXPECTED INFORMATION WITH CONSIDERING EACH ATTRIBUTE
+    # CALCULATING EXPECTED INFORMATION WITH CONSIDERING EACH NOMINAL ATTRIBUTE, FOR ALL ATTRIBUTES AT ONCE.
+    # FOR AN ATTRIBUTE, IT IS SUM_v (n_v / n) * H(v) = (SUM_v n_v * log2(n_v) - SUM_v SUM_c n_vc * log2(n_vc)) / n
     # THEN CALCULATING THEIR GAINS - OR SCORES
-    for attr, values_and_distributions in node.CANDIDATE_ATTRIBUTES_VALUES_DISTRIBUTIONS.items():
-        expected_info_attr = 0
-        for value, class_distributions in values_and_distributions.items():
-            sum_classes_dist = sum(class_distributions.values())
-            expected_info_v = 0
-            for class_key, class_dist in class_distributions.items():
-                if class_dist == 0:
-                    continue
-                expected_info_v += calculate_entropy(class_dist, sum_classes_dist)
-            expected_info_attr += (sum_classes_dist / node.NUMBER_OF_EXAMPLES_SEEN) * expected_info_v
-        node.CANDIDATE_ATTRIBUTES_SCORES[attr] = expected_info_tr - expected_info_attr
+    if len(node.CANDIDATE_OFFSETS) != 0:
+        rows_info = calculate_x_log_x(distributions.sum(axis=1)) - calculate_x_log_x(distributions).sum(axis=1)
+        expected_info_attrs = numpy.add.reduceat(rows_info, node.CANDIDATE_OFFSETS) / n
+        for attribute, expected_info_attr in zip(node.CANDIDATE_ATTRIBUTES, expected_info_attrs.tolist()):
+            node.CANDIDATE_ATTRIBUTES_SCORES[attribute.NAME] = expected_info_tr - expected_info_attr
+
+    # NUMERIC ATTRIBUTES ARE SCORED BY THEIR BEST BINARY SPLITS
+    for attribute, estimator in zip(node.NUMERIC_ATTRIBUTES, node.NUMERIC_ESTIMATORS):
+        expected_info_attr, split_value = estimator.get_best_split()
+        if split_value is None:
+            continue
+        node.CANDIDATE_ATTRIBUTES_SCORES[attribute.NAME] = expected_info_tr - expected_info_attr
+        node.CANDIDATE_SPLIT_VALUES[attribute.NAME] = split_value
+
+    return n
+
+
+def calculate_expected_info(classes_distributions):
+    n = sum(classes_distributions)
+    expected_info = 0
+    for v in classes_distributions:
+        if v <= 0:
+            continue
+        expected_info += calculate_entropy(v, n)
+    return expected_info
+
+
+class GaussianEstimator:
+    """This class keeps the count, mean, variance, minimum, and maximum of a numeric attribute for each class.
+    Split points are evaluated on raw values by assuming the attribute is normally distributed in each class."""
+
+    NUM_SPLIT_POINTS = 10
+
+    def __init__(self, num_classes):
+        self.COUNTS = [0] * num_classes
+        self.MEANS = [0.0] * num_classes
+        self.M2S = [0.0] * num_classes
+        self.MINIMUMS = [math.inf] * num_classes
+        self.MAXIMUMS = [-math.inf] * num_classes
+
+    def update(self, value, class_code):
+        # WELFORD'S ALGORITHM FOR THE MEAN AND THE SUM OF SQUARED DIFFERENCES
+        self.COUNTS[class_code] += 1
+        delta = value - self.MEANS[class_code]
+        self.MEANS[class_code] += delta / self.COUNTS[class_code]
+        self.M2S[class_code] += delta * (value - self.MEANS[class_code])
+        if value < self.MINIMUMS[class_code]:
+            self.MINIMUMS[class_code] = value
+        if value > self.MAXIMUMS[class_code]:
+            self.MAXIMUMS[class_code] = value
+
+    def get_std(self, class_code):
+        if self.COUNTS[class_code] < 2:
+            return 0.0
+        return math.sqrt(self.M2S[class_code] / (self.COUNTS[class_code] - 1))
+
+    def get_size(self):
+        return 5 * len(self.COUNTS) * 8
+
+    def calculate_probability_density(self, value, class_code):
+        if self.COUNTS[class_code] == 0:
+            return 0.0
+        std = self.get_std(class_code)
+        if std > 0:
+            z = (value - self.MEANS[class_code]) / std
+            return math.exp(-0.5 * z * z) / (std * math.sqrt(2 * math.pi))
+        return 1.0 if value == self.MEANS[class_code] else 0.0
+
+    def calculate_count_less_equal(self, value, class_code):
+        """Estimates the number of instances of a class whose values are less than or equal to value."""
+        if value < self.MINIMUMS[class_code]:
+            return 0.0
+        if value >= self.MAXIMUMS[class_code]:
+            return float(self.COUNTS[class_code])
+        std = self.get_std(class_code)
+        z = (value - self.MEANS[class_code]) / (std * math.sqrt(2))
+        return self.COUNTS[class_code] * 0.5 * (1 + math.erf(z))
+
+    def get_best_split(self):
+        """Returns the lowest expected information of a binary split, and its split point."""
+        minimum, maximum = min(self.MINIMUMS), max(self.MAXIMUMS)
+        if not minimum < maximum:
+            return None, None
+        n = sum(self.COUNTS)
+        best_expected_info, best_split_value = None, None
+        w = (maximum - minimum) / (GaussianEstimator.NUM_SPLIT_POINTS + 1)
+        for k in range(1, GaussianEstimator.NUM_SPLIT_POINTS + 1):
+            split_value = minimum + k * w
+            left = [self.calculate_count_less_equal(split_value, c) for c in range(0, len(self.COUNTS))]
+            right = [count - l for count, l in zip(self.COUNTS, left)]
+            n_left = sum(left)
+            expected_info = (n_left * calculate_expected_info(left) + (n - n_left) * calculate_expected_info(right)) / n
+            if best_expected_info is None or expected_info < best_expected_info:
+                best_expected_info, best_split_value = expected_info, split_value
+        return best_expected_info, best_split_value
 
 
 # HERE WE GO WITH THE "HOEFFDING NODE".
 class HoeffdingNode:
 
-    def __init__(self, classes, candidate_attributes):
+    # A ROUGH ESTIMATE OF THE BYTES TAKEN BY A NODE, EXCLUDING ITS COUNT ARRAYS
+    NODE_SIZE = 1024
+
+    def __init__(self, classes, attributes, candidate_indexes):
         # CREATING ATTRIBUTES
         self.__ATTRIBUTE_NAME = None
+        self.__ATTRIBUTE_INDEX = None
+        self.__SPLIT_VALUE = None
+        self.__SPLIT_KEYS = None
         self.NUMBER_OF_EXAMPLES_SEEN = 0
 
-        self.CLASSES_DISTRIBUTIONS = OrderedDict()
-        self.CLASSES_PROB_DISTRIBUTIONS = OrderedDict()
-
-        self.CANDIDATE_ATTRIBUTES = candidate_attributes
+        self.CLASSES_DISTRIBUTIONS = numpy.zeros(len(classes), dtype=numpy.int64)
+
+        # CANDIDATE ATTRIBUTES ARE KNOWN BY THEIR INDEXES AMONG ALL ATTRIBUTES. THE COUNTS OF THE VALUES OF
+        # NOMINAL CANDIDATES ARE THE ROWS OF ONE (VALUE x CLASS) ARRAY, WHERE THE v-TH VALUE OF THE i-TH
+        # CANDIDATE IS IN THE ROW CANDIDATE_OFFSETS[i] + v. NUMERIC CANDIDATES HAVE GAUSSIAN ESTIMATORS.
+        self.CANDIDATE_INDEXES = []
+        self.CANDIDATE_ATTRIBUTES = []
+        self.CANDIDATE_OFFSETS = []
+        self.CANDIDATE_NUM_VALUES = None
+        self.NUMERIC_INDEXES = []
+        self.NUMERIC_ATTRIBUTES = []
+        for i in candidate_indexes:
+            if attributes[i].TYPE == TornadoDic.NUMERIC_ATTRIBUTE:
+                self.NUMERIC_INDEXES.append(i)
+                self.NUMERIC_ATTRIBUTES.append(attributes[i])
+            else:
+                self.CANDIDATE_INDEXES.append(i)
+                self.CANDIDATE_ATTRIBUTES.append(attributes[i])
 
-        self.CANDIDATE_ATTRIBUTES_VALUES_DISTRIBUTIONS = OrderedDict()
-        self.CANDIDATE_ATTRIBUTES_VALUES_PROB_DISTRIBUTIONS = OrderedDict()
+        self.CANDIDATE_ATTRIBUTES_VALUES_DISTRIBUTIONS = None
+        self.NUMERIC_ESTIMATORS = None
         self.CANDIDATE_ATTRIBUTES_SCORES = OrderedDict()
+        self.CANDIDATE_SPLIT_VALUES = OrderedDict()
 
         self.PARENT = None
         self.BRANCHES = OrderedDict()
         self.__CLASS = None
 
-        self.initialize_classes(classes)
-        self.initialize_attributes(classes)
+        # AN INACTIVE LEAF ONLY KEEPS ITS CLASS COUNTS, SO IT NEITHER SPLITS NOR PREDICTS WITH NAIVE BAYES
+        self.ACTIVE = True
 
-    def initialize_classes(self, classes):
-        for c in classes:
-            self.CLASSES_DISTRIBUTIONS[c] = 0
-            self.CLASSES_PROB_DISTRIBUTIONS[c] = 0.0
+        self.initialize_attributes(classes)
 
     def initialize_attributes(self, classes):
+        offset = 0
+        num_values = []
         for attribute in self.CANDIDATE_ATTRIBUTES:
-            self.CANDIDATE_ATTRIBUTES_VALUES_DISTRIBUTIONS[attribute.NAME] = OrderedDict()
-            self.CANDIDATE_ATTRIBUTES_VALUES_PROB_DISTRIBUTIONS[attribute.NAME] = OrderedDict()
-            for value in attribute.POSSIBLE_VALUES:
-                self.CANDIDATE_ATTRIBUTES_VALUES_DISTRIBUTIONS[attribute.NAME][value] = OrderedDict()
-                self.CANDIDATE_ATTRIBUTES_VALUES_PROB_DISTRIBUTIONS[attribute.NAME][value] = OrderedDict()
-                for c in classes:
-                    self.CANDIDATE_ATTRIBUTES_VALUES_DISTRIBUTIONS[attribute.NAME][value][c] = 0
-                    self.CANDIDATE_ATTRIBUTES_VALUES_PROB_DISTRIBUTIONS[attribute.NAME][value][c] = 0.0
-
-    def set_attribute_name(self, name):
+            self.CANDIDATE_OFFSETS.append(offset)
+            num_values.append(len(attribute.POSSIBLE_VALUES))
+            offset += len(attribute.POSSIBLE_VALUES)
+        self.CANDIDATE_NUM_VALUES = numpy.array(num_values, dtype=numpy.int64)
+        self.CANDIDATE_ATTRIBUTES_VALUES_DISTRIBUTIONS = numpy.zeros((offset, len(classes)), dtype=numpy.int64)
+        self.NUMERIC_ESTIMATORS = [GaussianEstimator(len(classes)) for _ in self.NUMERIC_INDEXES]
+
+    def activate(self):
+        """Allocates the attribute counts of the leaf again; they start from zero."""
+        if not self.ACTIVE:
+            rows = int(self.CANDIDATE_NUM_VALUES.sum())
+            self.CANDIDATE_ATTRIBUTES_VALUES_DISTRIBUTIONS = numpy.zeros((rows, len(self.CLASSES_DISTRIBUTIONS)),
+                                                                         dtype=numpy.int64)
+            self.NUMERIC_ESTIMATORS = [GaussianEstimator(len(self.CLASSES_DISTRIBUTIONS)) for _ in self.NUMERIC_INDEXES]
+            self.ACTIVE = True
+
+    def deactivate(self):
+        """Releases the attribute counts of the leaf, and keeps its class counts."""
+        if self.ACTIVE:
+            self.CANDIDATE_ATTRIBUTES_VALUES_DISTRIBUTIONS = None
+            self.NUMERIC_ESTIMATORS = None
+            self.CANDIDATE_ATTRIBUTES_SCORES = OrderedDict()
+            self.CANDIDATE_SPLIT_VALUES = OrderedDict()
+            self.ACTIVE = False
+
+    def get_promise(self):
+        """The number of instances the leaf misclassifies by the majority class, i.e. what a split could fix."""
+        if self.NUMBER_OF_EXAMPLES_SEEN == 0:
+            return 0
+        return self.NUMBER_OF_EXAMPLES_SEEN - int(self.CLASSES_DISTRIBUTIONS.max())
+
+    def calculate_size(self):
+        """Estimates the bytes taken by the node, excluding its children."""
+        return HoeffdingNode.NODE_SIZE + self.CLASSES_DISTRIBUTIONS.nbytes + \
+            (self.calculate_attributes_size() if self.ACTIVE else 0)
+
+    def calculate_attributes_size(self):
+        return int(self.CANDIDATE_NUM_VALUES.sum()) * self.CLASSES_DISTRIBUTIONS.nbytes + \
+            len(self.NUMERIC_INDEXES) * 5 * self.CLASSES_DISTRIBUTIONS.nbytes
+
+    def set_attribute_name(self, name, index=None):
         """This function is called when an attribute has been considered as an appropriate choice of splitting!"""
         self.__ATTRIBUTE_NAME = name
+        self.__ATTRIBUTE_INDEX = index
 
     def get_attribute_name(self):
         return self.__ATTRIBUTE_NAME
 
+    def get_attribute_index(self):
+        return self.__ATTRIBUTE_INDEX
+
+    def set_split_value(self, split_value):
+        """This function is called when the node is split by a numeric attribute, into two branches."""
+        self.__SPLIT_VALUE = split_value
+        self.__SPLIT_KEYS = ("<=" + str(split_value), ">" + str(split_value))
+
+    def get_split_value(self):
+        return self.__SPLIT_VALUE
+
+    def get_split_keys(self):
+        return self.__SPLIT_KEYS
+
     def set_class(self, c):
         """This function is called when the node is supposed to be labelled with the most frequent class."""
         self.__CLASS = c
@@ -110,12 +281,21 @@ class HoeffdingNode:
         return c
 
     def get_child_node(self, value):
-        return self.BRANCHES[value]
+        if self.__SPLIT_VALUE is None:
+            return self.BRANCHES[value]
+        # MISSING VALUES GO TO THE LEFT BRANCH
+        if value == "?" or value <= self.__SPLIT_VALUE:
+            return self.BRANCHES[self.__SPLIT_KEYS[0]]
+        return self.BRANCHES[self.__SPLIT_KEYS[1]]
 
 
 class HoeffdingTree(SuperClassifier):
     """This is the implementation of Hoeffding Tree which is also known as Very Fast Decision Tree (VFDT)
-    in the literature. Hoeffding Tree is an incremental decision tree for particularly learning from data streams."""
+    in the literature. Hoeffding Tree is an incremental decision tree for particularly learning from data streams.
+    Leaves keep their statistics as count arrays, and they are evaluated for splitting once every n_min instances,
+    i.e. the grace period; class probabilities are derived from the counts when they are needed.
+    If numeric attributes are given, they are learnt from raw values with Gaussian estimators and binary splits,
+    and the tree is no longer fed with discretized values."""
 
     LEARNER_NAME = TornadoDic.HOEFFDING_TREE
     LEARNER_TYPE = TornadoDic.TRAINABLE
@@ -125,9 +305,16 @@ class HoeffdingTree(SuperClassifier):
                  max_memory_size=33554432, memory_check_step=1000000):
 
         super().__init__(classes, attributes)
-        self.__ROOT = HoeffdingNode(classes, attributes)
+
+        # THE TREE TAKES RAW VALUES OF NUMERIC ATTRIBUTES, IF THERE ARE ANY
+        for attribute in attributes:
+            if attribute.TYPE == TornadoDic.NUMERIC_ATTRIBUTE:
+                self.LEARNER_CATEGORY = TornadoDic.MIX_CLASSIFIER
+                break
 
         self.ATTRIBUTES_NAMES = []
+        self.__CLASSES_CODES = OrderedDict()
+        self.__VALUES_CODES = []
 
         self.__DELTA = delta
         self.__TIE = tie
@@ -136,14 +323,25 @@ class HoeffdingTree(SuperClassifier):
 
         self.__MAX_MEMORY_SIZE = max_memory_size
         self.__MEMORY_CHECK_STEP = memory_check_step
+        self.__INSTANCES_SINCE_MEMORY_CHECK = 0
 
         self.__PREDICTION_MODE = leaf_prediction_mode
 
         self.__set_attributes_names()
+        self.__ROOT = self.__create_node(list(range(0, len(self.ATTRIBUTES))))
 
     def __set_attributes_names(self):
+        for i, c in enumerate(self.CLASSES):
+            self.__CLASSES_CODES[c] = i
         for attribute in self.ATTRIBUTES:
             self.ATTRIBUTES_NAMES.append(attribute.NAME)
+            values_codes = OrderedDict()
+            for i, v in enumerate(attribute.POSSIBLE_VALUES):
+                values_codes[v] = i
+            self.__VALUES_CODES.append(values_codes)
+
+    def __create_node(self, candidate_indexes):
+        return HoeffdingNode(self.CLASSES, self.ATTRIBUTES, candidate_indexes)
 
     def get_root(self):
         return self.__ROOT
@@ -151,8 +349,7 @@ class HoeffdingTree(SuperClassifier):
     def __trace(self, instance):
         current_node = self.__ROOT
         while len(current_node.BRANCHES) != 0:
-            index = self.ATTRIBUTES_NAMES.index(current_node.get_attribute_name())
-            current_node = current_node.get_child_node(instance[index])
+            current_node = current_node.get_child_node(instance[current_node.get_attribute_index()])
         return current_node
 
     def train(self, instance):
@@ -160,48 +357,94 @@ class HoeffdingTree(SuperClassifier):
         x, y = instance[:-1], instance[-1]
 
         node = self.__trace(x)
+        y_code = self.__CLASSES_CODES[y]
 
         node.NUMBER_OF_EXAMPLES_SEEN += 1
-        node.CLASSES_DISTRIBUTIONS[y] += 1
+        node.CLASSES_DISTRIBUTIONS[y_code] += 1
 
-        if self.__PREDICTION_MODE == TornadoDic.NB:
+        self.__INSTANCES_SINCE_MEMORY_CHECK += 1
+        if self.__INSTANCES_SINCE_MEMORY_CHECK >= self.__MEMORY_CHECK_STEP:
+            self.__INSTANCES_SINCE_MEMORY_CHECK = 0
+            self.enforce_memory_limit()
 
-            for c in self.CLASSES:
-                node.CLASSES_PROB_DISTRIBUTIONS[c] = node.CLASSES_DISTRIBUTIONS[c] / node.NUMBER_OF_EXAMPLES_SEEN
+        class_index = int(numpy.argmax(node.CLASSES_DISTRIBUTIONS))
+        most_populated_class = (self.CLASSES[class_index], int(node.CLASSES_DISTRIBUTIONS[class_index]))
+        node.set_class(most_populated_class)
 
-            for i in range(0, len(x)):
-                attribute, value = self.ATTRIBUTES[i], x[i]
-                if node.CANDIDATE_ATTRIBUTES.__contains__(attribute):
-                    node.CANDIDATE_ATTRIBUTES_VALUES_DISTRIBUTIONS[attribute.NAME][value][y] += 1
+        if not node.ACTIVE:
+            return
 
-            for c, c_prob in node.CLASSES_DISTRIBUTIONS.items():
-                for attr in node.CANDIDATE_ATTRIBUTES:
-                    attr_name = attr.NAME
-                    k = len(node.CANDIDATE_ATTRIBUTES_VALUES_DISTRIBUTIONS[attr_name])
-                    for value in attr.POSSIBLE_VALUES:
-                        d = node.CANDIDATE_ATTRIBUTES_VALUES_DISTRIBUTIONS[attr_name][value][c]
-                        node.CANDIDATE_ATTRIBUTES_VALUES_PROB_DISTRIBUTIONS[attr_name][value][c] = (d + 1) / (k + c_prob)
+        distributions = node.CANDIDATE_ATTRIBUTES_VALUES_DISTRIBUTIONS
+        for i, attribute_index in enumerate(node.CANDIDATE_INDEXES):
+            row = node.CANDIDATE_OFFSETS[i] + self.__VALUES_CODES[attribute_index][x[attribute_index]]
+            distributions[row, y_code] += 1
+        for i, attribute_index in enumerate(node.NUMERIC_INDEXES):
+            if x[attribute_index] != "?":
+                node.NUMERIC_ESTIMATORS[i].update(x[attribute_index], y_code)
 
-        most_populated_class = max(node.CLASSES_DISTRIBUTIONS.items(), key=operator.itemgetter(1))
-        node.set_class(most_populated_class)
+        # SPLITS ARE ONLY EVALUATED ONCE EVERY n_min INSTANCES, AND ONLY IF THE NODE IS NOT PURE
+        if node.NUMBER_OF_EXAMPLES_SEEN % self.__N_min == 0 and node.NUMBER_OF_EXAMPLES_SEEN != most_populated_class[1] \
+                and len(node.CANDIDATE_INDEXES) + len(node.NUMERIC_INDEXES) != 0:
 
-        if (node.NUMBER_OF_EXAMPLES_SEEN - 1) != most_populated_class[1]:
-            calculate_info_gain(node)
-
-        if node.NUMBER_OF_EXAMPLES_SEEN >= self.__N_min and len(node.CANDIDATE_ATTRIBUTES_SCORES) != 0:
+            n = calculate_info_gain(node)
+            if n == 0 or len(node.CANDIDATE_ATTRIBUTES_SCORES) == 0:
+                return
 
             g1, g2 = self.__get_two_attributes_with_highest_scores(node.CANDIDATE_ATTRIBUTES_SCORES)
-            epsilon = calculate_hoeffding_bound(self.__R, self.__DELTA, node.NUMBER_OF_EXAMPLES_SEEN)
+            epsilon = calculate_hoeffding_bound(self.__R, self.__DELTA, n)
             if g1[1] - g2[1] > epsilon or epsilon < self.__TIE:
-                node.set_attribute_name(g1[0])
-                new_attributes_set = self.ATTRIBUTES.copy()
                 attribute_index = self.ATTRIBUTES_NAMES.index(g1[0])
-                del new_attributes_set[attribute_index]
-                for value in self.ATTRIBUTES[attribute_index].POSSIBLE_VALUES:
-                    leaf = HoeffdingNode(self.CLASSES, new_attributes_set)
+                node.set_attribute_name(g1[0], attribute_index)
+                if g1[0] in node.CANDIDATE_SPLIT_VALUES:
+                    # A NUMERIC ATTRIBUTE MAY BE USED AGAIN FURTHER DOWN THE TREE
+                    node.set_split_value(node.CANDIDATE_SPLIT_VALUES[g1[0]])
+                    new_candidate_indexes = node.CANDIDATE_INDEXES + node.NUMERIC_INDEXES
+                    values = node.get_split_keys()
+                else:
+                    new_candidate_indexes = [i for i in node.CANDIDATE_INDEXES + node.NUMERIC_INDEXES
+                                             if i != attribute_index]
+                    values = self.ATTRIBUTES[attribute_index].POSSIBLE_VALUES
+                for value in values:
+                    leaf = self.__create_node(sorted(new_candidate_indexes))
                     node.BRANCHES[value] = leaf
                     leaf.PARENT = node
 
+    def get_nodes(self):
+        """Returns the internal nodes and the leaves of the tree."""
+        internal_nodes, leaves = [], []
+        stack = [self.__ROOT]
+        while len(stack) != 0:
+            node = stack.pop()
+            if len(node.BRANCHES) == 0:
+                leaves.append(node)
+            else:
+                internal_nodes.append(node)
+                stack.extend(node.BRANCHES.values())
+        return internal_nodes, leaves
+
+    def calculate_size(self):
+        """Estimates the bytes taken by the tree from the shapes of its count arrays."""
+        internal_nodes, leaves = self.get_nodes()
+        return sum(node.calculate_size() for node in internal_nodes + leaves)
+
+    def enforce_memory_limit(self):
+        """Keeps the most promising leaves active while the tree fits into max_memory_size; the other
+        leaves are deactivated, and deactivated leaves are activated again once there is room for them."""
+        internal_nodes, leaves = self.get_nodes()
+
+        # THE SIZE OF THE TREE IF ALL LEAVES WERE INACTIVE
+        size = sum(node.calculate_size() for node in internal_nodes)
+        size += sum(HoeffdingNode.NODE_SIZE + leaf.CLASSES_DISTRIBUTIONS.nbytes for leaf in leaves)
+
+        leaves.sort(key=lambda leaf: leaf.get_promise(), reverse=True)
+        for leaf in leaves:
+            attributes_size = leaf.calculate_attributes_size()
+            if size + attributes_size <= self.__MAX_MEMORY_SIZE:
+                leaf.activate()
+                size += attributes_size
+            else:
+                leaf.deactivate()
+
     def print_tree(self, node, c=""):
         c += "\t"
         print(c + node.get_attribute_name() + " " + str(node.CLASSES_DISTRIBUTIONS))
@@ -212,6 +455,29 @@ class HoeffdingTree(SuperClassifier):
             else:
                 print(c + str(child.PARENT.get_class()))
 
+    def __calculate_joint_probabilities(self, node, x):
+        """Calculates the naive bayes P(c) * P(x_1|c) * ... * P(x_n|c) of a leaf for all classes, where x_i
+        are the values of the candidate attributes of the leaf."""
+        n = node.NUMBER_OF_EXAMPLES_SEEN
+        if n == 0:
+            return numpy.zeros(len(self.CLASSES))
+        if not node.ACTIVE:
+            return node.CLASSES_DISTRIBUTIONS / n
+        rows = [node.CANDIDATE_OFFSETS[i] + self.__VALUES_CODES[attribute_index][x[attribute_index]]
+                for i, attribute_index in enumerate(node.CANDIDATE_INDEXES)]
+        factors = numpy.empty((len(rows) + len(node.NUMERIC_INDEXES) + 1, len(self.CLASSES)))
+        factors[0] = node.CLASSES_DISTRIBUTIONS / n
+        factors[1:len(rows) + 1] = (node.CANDIDATE_ATTRIBUTES_VALUES_DISTRIBUTIONS[rows] + 1) / \
+                                   (node.CANDIDATE_NUM_VALUES[:, None] + node.CLASSES_DISTRIBUTIONS)
+        for i, attribute_index in enumerate(node.NUMERIC_INDEXES):
+            estimator = node.NUMERIC_ESTIMATORS[i]
+            if x[attribute_index] == "?" or sum(estimator.COUNTS) == 0:
+                factors[len(rows) + 1 + i] = 1
+            else:
+                factors[len(rows) + 1 + i] = [estimator.calculate_probability_density(x[attribute_index], c)
+                                              for c in range(0, len(self.CLASSES))]
+        return factors.prod(axis=0)
+
     def test(self, instance):
         if self._IS_READY:
             x = instance[0:len(instance) - 1]
@@ -224,16 +490,8 @@ class HoeffdingTree(SuperClassifier):
             if self.__PREDICTION_MODE == TornadoDic.MC:
                 prediction = node.get_class()[0]
             else:
-                predictions = OrderedDict()
-                for c in node.CLASSES_DISTRIBUTIONS.keys():
-                    pr = node.CLASSES_PROB_DISTRIBUTIONS[c]
-                    for attr_index in range(0, len(x)):
-                        if node.CANDIDATE_ATTRIBUTES.__contains__(self.ATTRIBUTES[attr_index]):
-                            attr = self.ATTRIBUTES[attr_index]
-                            value = x[attr_index]
-                            pr *= node.CANDIDATE_ATTRIBUTES_VALUES_PROB_DISTRIBUTIONS[attr.NAME][value][c]
-                    predictions[c] = pr
-                prediction = max(predictions.items(), key=operator.itemgetter(1))[0]
+                predictions = self.__calculate_joint_probabilities(node, x)
+                prediction = self.CLASSES[int(numpy.argmax(predictions))]
 
             self.update_confusion_matrix(y, prediction)
 
@@ -251,19 +509,10 @@ class HoeffdingTree(SuperClassifier):
         if node.get_class() is None:
             node = node.PARENT
 
-        prob = []
         if self.__PREDICTION_MODE == TornadoDic.MC:
-            for c in self.CLASSES:
-                prob.append(node.CLASSES_PROB_DISTRIBUTIONS[c])
+            prob = (node.CLASSES_DISTRIBUTIONS / node.NUMBER_OF_EXAMPLES_SEEN).tolist()
         else:
-            for c in self.CLASSES:
-                pr = node.CLASSES_PROB_DISTRIBUTIONS[c]
-                for attr_index in range(0, len(X)):
-                    if node.CANDIDATE_ATTRIBUTES.__contains__(self.ATTRIBUTES[attr_index]):
-                        attr = self.ATTRIBUTES[attr_index]
-                        value = X[attr_index]
-                        pr *= node.CANDIDATE_ATTRIBUTES_VALUES_PROB_DISTRIBUTIONS[attr.NAME][value][c]
-                prob.append(pr)
+            prob = self.__calculate_joint_probabilities(node, X).tolist()
 
             prob_sum = sum(prob)
             if prob_sum != 0.0:
@@ -293,8 +542,12 @@ class HoeffdingTree(SuperClassifier):
             g2 = (0, 0)
         return g1, g2
 
+    def memory_footprint(self):
+        return super().memory_footprint() + self.calculate_size()
+
     def reset(self):
         super()._reset_stats()
+        self.__INSTANCES_SINCE_MEMORY_CHECK = 0
         del self.__ROOT
         gc.collect()
-        self.__ROOT = HoeffdingNode(self.CLASSES, self.ATTRIBUTES)
+        self.__ROOT = self.__create_node(list(range(0, len(self.ATTRIBUTES))))
@@ -8,6 +8,9 @@ E-mail: apesaran -at- uottawa -dot- ca / alipsgh -at- gmail -dot- com
 import math
 import operator
 
+import numpy
+from scipy.spatial import cKDTree
+
 from classifier.classifier import SuperClassifier
 from dictionary.tornado_dictionary import *
 
@@ -33,35 +36,70 @@ def calculate_hamming_distance(instance_1, instance_2):
 class KNN(SuperClassifier):
     """This is the implementation of the K Nearest Neighbor algorithm. This classifier keeps the recent
     instances of a data stream within a window. For a new instance, its nearest neighbors are located in the window.
-    Then, using the majority voting approach, the class of the new instance is decided."""
+    Then, using the majority voting approach, the class of the new instance is decided.
+    The window is a ring buffer of arrays, so the distances to all the instances are calculated at once. For large
+    windows, a kd-tree index can be used, which is rebuilt every index_rebuild_step loaded instances; instances
+    loaded since the last rebuild are searched directly."""
 
     LEARNER_NAME = TornadoDic.K_NN
     LEARNER_TYPE = TornadoDic.LOADABLE
     LEARNER_CATEGORY = TornadoDic.NUM_CLASSIFIER
 
-    def __init__(self, labels, attributes, k=5, window_size=100):
+    def __init__(self, labels, attributes, k=5, window_size=100, use_index=False, index_rebuild_step=None):
 
         super().__init__(labels, attributes)
 
-        self.INSTANCES = []
         self.K = k
         self.LEARNER_NAME = str(self.K) + " NEAREST NEIGHBORS"
         self.__WINDOW_SIZE = window_size
 
+        # THE WINDOW KEEPS window_size + 1 INSTANCES, AS AN INSTANCE IS ONLY REMOVED WHEN THE WINDOW IS OVERFULL
+        self.__CAPACITY = window_size + 1
+        self.__CLASSES_CODES = {c: i for i, c in enumerate(labels)}
+        # THE ROWS OF INSTANCES ARE ALLOCATED WITH THE FIRST INSTANCE LOADED, AS THE LIST OF ATTRIBUTES MAY BE SHARED
+        # WITH OTHER LEARNERS, WHICH MAY EXTEND IT, E.G. PERCEPTRON APPENDS ITS BIAS ATTRIBUTE
+        self.X = None
+        self.Y = numpy.empty(self.__CAPACITY, dtype=numpy.int64)
+        # THE STAMPS ARE THE ARRIVAL ORDERS OF THE INSTANCES, WHICH BREAK TIES BETWEEN EQUAL DISTANCES
+        self.STAMPS = numpy.empty(self.__CAPACITY, dtype=numpy.int64)
+        self.__SIZE = 0
+        self.__NEXT_STAMP = 0
+
+        self.__USE_INDEX = use_index
+        self.__INDEX_REBUILD_STEP = index_rebuild_step if index_rebuild_step is not None else max(1, window_size // 10)
+        self.__INDEX = None
+        self.__INDEX_SLOTS = None
+        self.__INDEX_STAMPS = None
+        self.__INDEX_STAMP = 0
+
     def load(self, instance):
-        if len(self.INSTANCES) > self.__WINDOW_SIZE:
-            self.INSTANCES.pop(0)
-        self.INSTANCES.append(instance)
+        if self.X is None:
+            self.X = numpy.empty((self.__CAPACITY, len(instance) - 1))
+        slot = self.__NEXT_STAMP % self.__CAPACITY
+        self.X[slot] = instance[0:len(instance) - 1]
+        self.Y[slot] = self.__CLASSES_CODES[instance[len(instance) - 1]]
+        self.STAMPS[slot] = self.__NEXT_STAMP
+        self.__NEXT_STAMP += 1
+        self.__SIZE = min(self.__SIZE + 1, self.__CAPACITY)
+        if self.__USE_INDEX and self.__NEXT_STAMP - self.__INDEX_STAMP >= self.__INDEX_REBUILD_STEP:
+            self.__build_index()
+
+    def __build_index(self):
+        self.__INDEX_SLOTS = numpy.arange(0, self.__SIZE)
+        self.__INDEX_STAMPS = self.STAMPS[:self.__SIZE].copy()
+        self.__INDEX = cKDTree(self.X[:self.__SIZE])
+        self.__INDEX_STAMP = self.__NEXT_STAMP
 
     def test(self, ts_instance):
         if self._IS_READY:
-            distances = []
-            x_test = ts_instance[0:len(ts_instance) - 1]
+            x_test = numpy.asarray(ts_instance[0:len(ts_instance) - 1], dtype=float)
             y = ts_instance[len(ts_instance) - 1]
-            for instance in self.INSTANCES:
-                x = instance[0:len(instance) - 1]
-                distances.append([instance, ts_instance, calculate_euclidean_distance(x, x_test)])
-            knn = self.__find_k_nearest_neighbours(distances)
+            if self.__INDEX is not None:
+                slots, distances = self.__search_index(x_test)
+            else:
+                slots = numpy.arange(0, self.__SIZE)
+                distances = numpy.sqrt(((self.X[:self.__SIZE] - x_test) ** 2).sum(axis=1))
+            knn = self.__find_k_nearest_neighbours(slots, distances)
             predicted_class = self.__predict(knn)
             self.update_confusion_matrix(y, predicted_class)
             return predicted_class
@@ -69,32 +107,54 @@ class KNN(SuperClassifier):
             print("Please load KNN classifier with some instances first!")
             exit()
 
-    def __find_k_nearest_neighbours(self, distances):
-        unsorted_distance_dic = {}
-        for i in range(0, len(distances)):
-            unsorted_distance_dic[i] = distances[i][2]
-        sorted_distance_list = sorted(unsorted_distance_dic.items(), key=operator.itemgetter(1))
-        knn = {}
-        num_total_nodes = len(distances)
-        if num_total_nodes < self.K:
-            k = num_total_nodes
-        else:
-            k = self.K
-        for i in range(0, k):
-            knn[i] = distances[sorted_distance_list[i][0]][0]
-        return knn
-
-    @staticmethod
-    def __predict(knn):
+    def __search_index(self, x_test):
+        """Returns the candidate neighbours from the index, together with the instances loaded after the index
+        was built. Indexed instances which have since been removed from the window are dropped."""
+        num_new = self.__NEXT_STAMP - self.__INDEX_STAMP
+        k = min(self.K + num_new, len(self.__INDEX_SLOTS))
+        distances, positions = self.__INDEX.query(x_test, k=k)
+        positions, distances = numpy.atleast_1d(positions), numpy.atleast_1d(distances)
+        slots = self.__INDEX_SLOTS[positions]
+        alive = self.STAMPS[slots] == self.__INDEX_STAMPS[positions]
+        slots, distances = slots[alive], distances[alive]
+
+        new_slots = numpy.array([s % self.__CAPACITY for s in range(self.__INDEX_STAMP, self.__NEXT_STAMP)],
+                                dtype=numpy.int64)
+        new_distances = numpy.sqrt(((self.X[new_slots] - x_test) ** 2).sum(axis=1))
+        return numpy.concatenate((slots, new_slots)), numpy.concatenate((distances, new_distances))
+
+    def __find_k_nearest_neighbours(self, slots, distances):
+        """Returns the slots of the k nearest neighbours from the nearest, where older instances come first
+        among equally distant ones."""
+        k = min(self.K, len(slots))
+        if k < len(slots):
+            kth_distance = numpy.partition(distances, k - 1)[k - 1]
+            selected = distances <= kth_distance
+            slots, distances = slots[selected], distances[selected]
+        order = numpy.lexsort((self.STAMPS[slots], distances))[:k]
+        return slots[order]
+
+    def __predict(self, knn):
         knn_class_dist = {}
-        for k, v in knn.items():
-            if knn_class_dist.__contains__(v[len(v) - 1]) is True:
-                knn_class_dist[v[len(v) - 1]] += 1
+        for v in self.Y[knn].tolist():
+            if knn_class_dist.__contains__(v) is True:
+                knn_class_dist[v] += 1
             else:
-                knn_class_dist[v[len(v) - 1]] = 1
+                knn_class_dist[v] = 1
         prediction = max(knn_class_dist.items(), key=operator.itemgetter(1))[0]
-        return prediction
+        return self.CLASSES[prediction]
+
+    def memory_footprint(self):
+        # THE WINDOW IS KEPT IN ARRAYS, WHICH ARE ALREADY COUNTED AS ATTRIBUTES; THE INDEX SHARES THEM,
+        # AND TAKES ABOUT 64 BYTES PER NODE
+        size = super().memory_footprint()
+        if self.__INDEX is not None:
+            size += self.__INDEX.indices.nbytes + self.__INDEX.size * 64
+        return size
 
     def reset(self):
         super()._reset_stats()
-        self.INSTANCES = []
+        self.__SIZE = 0
+        self.__NEXT_STAMP = 0
+        self.__INDEX = None
+        self.__INDEX_STAMP = 0
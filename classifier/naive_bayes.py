@@ -5,15 +5,19 @@ University of Ottawa, Ontario, Canada
 E-mail: apesaran -at- uottawa -dot- ca / alipsgh -at- gmail -dot- com
 """
 
-import operator
+import sys
 from collections import OrderedDict
 
+import numpy
+
 from classifier.classifier import SuperClassifier
 from dictionary.tornado_dictionary import TornadoDic
 
 
 class NaiveBayes(SuperClassifier):
-    """This is the implementation of incremental naive bayes classifier for learning from data streams."""
+    """This is the implementation of incremental naive bayes classifier for learning from data streams.
+    Records are coded into integers, and counts are kept in NumPy arrays. Thus, training an instance only
+    increments one count per attribute, and probabilities are calculated from the counts at prediction time."""
 
     LEARNER_NAME = TornadoDic.NAIVE_BAYES
     LEARNER_TYPE = TornadoDic.TRAINABLE
@@ -26,90 +30,89 @@ class NaiveBayes(SuperClassifier):
         self.ATTRIBUTES_NAMES = []
         self.ALPHA = smoothing_parameter
 
-        self.CLASSES_DISTRIBUTIONS = OrderedDict()
-        self.CLASSES_PROB_DISTRIBUTIONS = OrderedDict()
+        self.CLASSES_CODES = OrderedDict()
+        self.ATTRIBUTES_VALUES_CODES = []
+
+        # THE COUNTS OF ALL (ATTRIBUTE, VALUE) PAIRS ARE THE ROWS OF ONE ARRAY, AND THE COUNTS
+        # OF THE v-TH VALUE OF THE a-TH ATTRIBUTE ARE IN THE ROW ATTRIBUTES_OFFSETS[a] + v.
+        self.ATTRIBUTES_OFFSETS = []
+        self.ATTRIBUTES_NUM_VALUES = None
 
-        self.ATTRIBUTES_VALUES_DISTRIBUTIONS = OrderedDict()
-        self.ATTRIBUTES_VALUES_PROB_DISTRIBUTIONS = OrderedDict()
+        self.CLASSES_DISTRIBUTIONS = None
+        self.ATTRIBUTES_VALUES_DISTRIBUTIONS = None
 
-        self.__initialize_classes()
-        self.__initialize_attributes()
+        self.__FACTORS = None
+        self.__DENOMINATORS = None
+        self.__DENOMINATORS_UPDATED = False
 
-    def __initialize_classes(self):
-        for c in self.CLASSES:
-            self.CLASSES_DISTRIBUTIONS[c] = 0
-            self.CLASSES_PROB_DISTRIBUTIONS[c] = 0.0
+        self.__initialize_codes()
+        self.__initialize_counts()
 
-    def __initialize_attributes(self):
+    def __initialize_codes(self):
+        for i, c in enumerate(self.CLASSES):
+            self.CLASSES_CODES[c] = i
+        offset = 0
         for attr in self.ATTRIBUTES:
             self.ATTRIBUTES_NAMES.append(attr.NAME)
-            self.ATTRIBUTES_VALUES_DISTRIBUTIONS[attr.NAME] = OrderedDict()
-            self.ATTRIBUTES_VALUES_PROB_DISTRIBUTIONS[attr.NAME] = OrderedDict()
-            for v in attr.POSSIBLE_VALUES:
-                self.ATTRIBUTES_VALUES_DISTRIBUTIONS[attr.NAME][v] = OrderedDict()
-                self.ATTRIBUTES_VALUES_PROB_DISTRIBUTIONS[attr.NAME][v] = OrderedDict()
-                for c in self.CLASSES:
-                    self.ATTRIBUTES_VALUES_DISTRIBUTIONS[attr.NAME][v][c] = 0
-                    self.ATTRIBUTES_VALUES_PROB_DISTRIBUTIONS[attr.NAME][v][c] = 0.0
+            values_codes = OrderedDict()
+            for i, v in enumerate(attr.POSSIBLE_VALUES):
+                values_codes[v] = i
+            self.ATTRIBUTES_VALUES_CODES.append(values_codes)
+            self.ATTRIBUTES_OFFSETS.append(offset)
+            offset += len(values_codes)
+        self.ATTRIBUTES_NUM_VALUES = numpy.array([len(v) for v in self.ATTRIBUTES_VALUES_CODES], dtype=numpy.int64)
+        self.__FACTORS = numpy.empty((len(self.ATTRIBUTES) + 1, len(self.CLASSES)))
+
+    def __initialize_counts(self):
+        num_rows = int(numpy.sum(self.ATTRIBUTES_NUM_VALUES))
+        self.CLASSES_DISTRIBUTIONS = numpy.zeros(len(self.CLASSES), dtype=numpy.int64)
+        self.ATTRIBUTES_VALUES_DISTRIBUTIONS = numpy.zeros((num_rows, len(self.CLASSES)), dtype=numpy.int64)
+        self.__DENOMINATORS_UPDATED = False
+
+    def encode(self, instance):
+        """Codes the attributes values and the class of an instance into integers."""
+        ln = len(instance)
+        codes = [self.ATTRIBUTES_VALUES_CODES[i][instance[i]] for i in range(0, ln - 1)]
+        codes.append(self.CLASSES_CODES[instance[ln - 1]])
+        return codes
 
     def train(self, instance):
+        self.train_codes(self.encode(instance))
+
+    def train_codes(self, codes):
+        """Trains the classifier with an instance already coded by the encode function."""
         self.NUMBER_OF_INSTANCES_OBSERVED += 1
-        self.__set_class_dist(instance)
-        self.__set_attr_val_dist(instance)
-
-    def __set_class_dist(self, instance):
-        y = instance[len(instance) - 1]
-        try:
-            self.CLASSES_DISTRIBUTIONS[y] += 1
-        except:
-            print("ERROR")
-        for y in self.CLASSES_DISTRIBUTIONS.keys():
-            self.CLASSES_PROB_DISTRIBUTIONS[y] = self.CLASSES_DISTRIBUTIONS[y] / self.NUMBER_OF_INSTANCES_OBSERVED
+        ln = len(codes)
+        y = codes[ln - 1]
+        self.CLASSES_DISTRIBUTIONS[y] += 1
+        for i in range(0, ln - 1):
+            self.ATTRIBUTES_VALUES_DISTRIBUTIONS[self.ATTRIBUTES_OFFSETS[i] + codes[i], y] += 1
+        self.__DENOMINATORS_UPDATED = False
 
     def get_classes_dist(self):
-        return self.CLASSES_DISTRIBUTIONS
-
-    def __set_attr_val_dist(self, instance):
-        ln = len(instance)
-        x = instance[0:ln - 1]
-        y = instance[ln - 1]
-        '''
-        for attr_index in range(0, len(x)):
-            attr = self.ATTRIBUTES_NAMES[attr_index]
-            value = x[attr_index]
-            self.ATTRIBUTES_VALUES_DISTRIBUTIONS[attr][value][y] += 1
-            for c, c_dist in self.CLASSES_DISTRIBUTIONS.items():
-                d = self.ATTRIBUTES_VALUES_DISTRIBUTIONS[attr][value][c]
-                k = len(self.ATTRIBUTES_VALUES_DISTRIBUTIONS[attr])
-                self.ATTRIBUTES_VALUES_PROB_DISTRIBUTIONS[attr][value][c] = (d + 1) / (k + c_dist)
-        '''
-        for attr_index in range(0, len(x)):
-            attr = self.ATTRIBUTES_NAMES[attr_index]
-            value = x[attr_index]
-            self.ATTRIBUTES_VALUES_DISTRIBUTIONS[attr][value][y] += 1
-
-        for c, c_dist in self.CLASSES_DISTRIBUTIONS.items():
-            for attr in self.ATTRIBUTES:
-                attr_name = attr.NAME
-                k = len(self.ATTRIBUTES_VALUES_DISTRIBUTIONS[attr_name])
-                for value in attr.POSSIBLE_VALUES:
-                    d = self.ATTRIBUTES_VALUES_DISTRIBUTIONS[attr_name][value][c]
-                    self.ATTRIBUTES_VALUES_PROB_DISTRIBUTIONS[attr_name][value][c] = (d + 1) / (k + c_dist)
+        return OrderedDict(zip(self.CLASSES, self.CLASSES_DISTRIBUTIONS.tolist()))
+
+    def __calculate_joint_probabilities(self, x_codes):
+        """Calculates P(c) * P(x_1|c) * ... * P(x_n|c) for all classes, multiplying the factors in that order."""
+        if self.NUMBER_OF_INSTANCES_OBSERVED == 0:
+            return numpy.zeros(len(self.CLASSES))
+        # THE DENOMINATORS OF P(x_i|c) ONLY CHANGE WITH THE CLASSES DISTRIBUTIONS
+        if self.__DENOMINATORS_UPDATED is False:
+            self.__DENOMINATORS = self.ATTRIBUTES_NUM_VALUES[:, None] + self.CLASSES_DISTRIBUTIONS
+            self.__DENOMINATORS_UPDATED = True
+        rows = [self.ATTRIBUTES_OFFSETS[i] + x_codes[i] for i in range(0, len(x_codes))]
+        factors = self.__FACTORS
+        numpy.divide(self.CLASSES_DISTRIBUTIONS, self.NUMBER_OF_INSTANCES_OBSERVED, out=factors[0])
+        numpy.divide(self.ATTRIBUTES_VALUES_DISTRIBUTIONS[rows] + 1, self.__DENOMINATORS, out=factors[1:])
+        return factors.prod(axis=0)
 
     def test(self, instance):
         if self._IS_READY:
-            predictions = OrderedDict()
-            x = instance[0:len(instance) - 1]
-            y = instance[len(instance) - 1]
-            for c in self.CLASSES:
-                pr = self.CLASSES_PROB_DISTRIBUTIONS[c]
-                for attr_index in range(0, len(x)):
-                    attr = self.ATTRIBUTES_NAMES[attr_index]
-                    value = x[attr_index]
-                    pr *= self.ATTRIBUTES_VALUES_PROB_DISTRIBUTIONS[attr][value][c]
-                predictions[c] = pr
-
-            predicted_class = max(predictions.items(), key=operator.itemgetter(1))[0]
+            ln = len(instance)
+            y = instance[ln - 1]
+            x_codes = [self.ATTRIBUTES_VALUES_CODES[i][instance[i]] for i in range(0, ln - 1)]
+            predictions = self.__calculate_joint_probabilities(x_codes)
+            predicted_class = self.CLASSES[int(numpy.argmax(predictions))]
             self.update_confusion_matrix(y, predicted_class)
             return predicted_class
         else:
@@ -117,25 +120,8 @@ class NaiveBayes(SuperClassifier):
             exit()
 
     def get_prediction_prob_list(self, X):
-        X = X[0:len(X) - 1]
-        prob = []
-        for c in self.CLASSES:
-            pr = self.CLASSES_PROB_DISTRIBUTIONS[c]
-            for attr_index in range(0, len(X)):
-                attr = self.ATTRIBUTES_NAMES[attr_index]
-                value = X[attr_index]
-                pr *= self.ATTRIBUTES_VALUES_PROB_DISTRIBUTIONS[attr][value][c]
-                if self.ATTRIBUTES_VALUES_PROB_DISTRIBUTIONS[attr][value][c] == 0:
-                    print("HI")
-            prob.append(pr)
-
-        '''
-        prob_x = 0.0
-        for i, c in enumerate(self.CLASSES):
-            p_c = self.CLASSES_PROB_DISTRIBUTIONS[c]
-            prob_x += (p_c * prob[i])
-        prob = [x / prob_x for x in prob]
-        '''
+        x_codes = [self.ATTRIBUTES_VALUES_CODES[i][X[i]] for i in range(0, len(X) - 1)]
+        prob = self.__calculate_joint_probabilities(x_codes).tolist()
 
         prob_sum = sum(prob)
         if prob_sum != 0.0:
@@ -155,12 +141,10 @@ class NaiveBayes(SuperClassifier):
 
         return pred_prob
 
+    def memory_footprint(self):
+        # THE COUNTS ARE KEPT IN ARRAYS, WHICH ARE ALREADY COUNTED AS ATTRIBUTES
+        return super().memory_footprint() + sum(sys.getsizeof(codes) for codes in self.ATTRIBUTES_VALUES_CODES)
+
     def reset(self):
         super()._reset_stats()
-        self.CLASSES_DISTRIBUTIONS = OrderedDict()
-        self.CLASSES_PROB_DISTRIBUTIONS = OrderedDict()
-        self.ATTRIBUTES_NAMES = []
-        self.ATTRIBUTES_VALUES_DISTRIBUTIONS = OrderedDict()
-        self.ATTRIBUTES_VALUES_PROB_DISTRIBUTIONS = OrderedDict()
-        self.__initialize_classes()
-        self.__initialize_attributes()
+        self.__initialize_counts()
@@ -13,11 +13,13 @@ URL: http://www.cs.waikato.ac.nz/~eibe/pubs/Perceptron.pdf
 import math
 import operator
 import random
+import sys
 from collections import OrderedDict
 
 from classifier.classifier import SuperClassifier
 from data_structures.attribute import Attribute
 from dictionary.tornado_dictionary import TornadoDic
+from evaluators.memory_evaluator import MemoryEvaluator
 
 
 class Perceptron(SuperClassifier):
@@ -105,6 +107,10 @@ class Perceptron(SuperClassifier):
             print("Please train a Perceptron classifier first!")
             exit()
 
+    def memory_footprint(self):
+        return super().memory_footprint() + sum(sys.getsizeof(weights) for weights in self.WEIGHTS.values()) + \
+            MemoryEvaluator.get_numbers_size(len(self.CLASSES) * len(self.ATTRIBUTES))
+
     def reset(self):
         super()._reset_stats()
         self.WEIGHTS = OrderedDict()
@@ -0,0 +1,80 @@
+from collections import OrderedDict
+
+import numpy
+
+
+class ConfusionMatrix:
+    """A confusion matrix backed by an integer array, whose rows and columns are indexed by the codes of
+    the real and the predicted classes. The numbers of all and correct predictions are kept as running totals,
+    so that accuracy and error-rate are read in constant time; the other measures are read from the array."""
+
+    def __init__(self, labels):
+        self.CLASSES = list(labels)
+        self.CLASSES_CODES = {c: i for i, c in enumerate(self.CLASSES)}
+        self.MATRIX = numpy.zeros((len(self.CLASSES), len(self.CLASSES)), dtype=numpy.int64)
+        self.TOTAL = 0
+        self.CORRECT = 0
+
+    def update(self, real_class, predicted_class):
+        i = self.CLASSES_CODES[real_class]
+        j = self.CLASSES_CODES[predicted_class]
+        self.MATRIX[i, j] += 1
+        self.TOTAL += 1
+        if i == j:
+            self.CORRECT += 1
+
+    def reset(self):
+        self.MATRIX.fill(0)
+        self.TOTAL = 0
+        self.CORRECT = 0
+
+    def get_accuracy(self):
+        return self.CORRECT / self.TOTAL
+
+    def get_error_rate(self):
+        return 1 - self.get_accuracy()
+
+    def get_precisions(self, theta):
+        true_positives = self.MATRIX.diagonal()
+        return true_positives / (self.MATRIX.sum(axis=0) + theta)
+
+    def get_recalls(self, theta):
+        true_positives = self.MATRIX.diagonal()
+        return true_positives / (self.MATRIX.sum(axis=1) + theta)
+
+    def get_specificities(self, theta):
+        true_positives = self.MATRIX.diagonal()
+        columns_sums = self.MATRIX.sum(axis=0)
+        false_positives = columns_sums - true_positives
+        true_negatives = self.TOTAL - self.MATRIX.sum(axis=1) - columns_sums + true_positives
+        return true_negatives / (true_negatives + false_positives + theta)
+
+    def get_precision(self, theta):
+        return ConfusionMatrix.__average(self.get_precisions(theta))
+
+    def get_recall(self, theta):
+        return ConfusionMatrix.__average(self.get_recalls(theta))
+
+    def get_specificity(self, theta):
+        return ConfusionMatrix.__average(self.get_specificities(theta))
+
+    @staticmethod
+    def __average(values):
+        # THE MEASURES ARE AVERAGED IN THE SAME ORDER AS PredictionEvaluator DOES, SO THAT THEY ARE THE SAME
+        average = 0
+        values = values.tolist()
+        for v in values:
+            average += (v / len(values))
+        return average
+
+    def to_dict(self):
+        confusion_matrix = OrderedDict()
+        for i, real_class in enumerate(self.CLASSES):
+            confusion_matrix[real_class] = OrderedDict(zip(self.CLASSES, self.MATRIX[i].tolist()))
+        return confusion_matrix
+
+    def items(self):
+        return self.to_dict().items()
+
+    def __getitem__(self, real_class):
+        return OrderedDict(zip(self.CLASSES, self.MATRIX[self.CLASSES_CODES[real_class]].tolist()))
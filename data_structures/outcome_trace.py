@@ -0,0 +1,40 @@
+import numpy
+
+from archiver.archiver import Archiver
+
+
+class OutcomeTrace:
+    """A trace of the prediction outcomes of a learner over a data stream, i.e. whether its predictions were
+    correct, together with the confidences of the predictions when the learner gives them. The positions are
+    the instance counters at which the predictions were made, counted as the prequential tasks count them,
+    so that the drift points located over a trace are comparable to the actual drift points of the stream."""
+
+    def __init__(self, outcomes, positions, confidences=None, metadata=None):
+        self.OUTCOMES = numpy.asarray(outcomes, dtype=bool)
+        self.POSITIONS = numpy.asarray(positions, dtype=numpy.int64)
+        self.CONFIDENCES = numpy.asarray(confidences, dtype=numpy.float64) if confidences is not None else None
+        self.METADATA = dict(metadata) if metadata is not None else {}
+
+    def __len__(self):
+        return len(self.OUTCOMES)
+
+    def has_confidences(self):
+        return self.CONFIDENCES is not None
+
+    def save(self, dir_path, name):
+        # THE OUTCOMES ARE PACKED INTO BITS, AND THE POSITIONS ARE STORED AS THEIR GAPS, WHICH COMPRESS WELL
+        arrays = {"outcomes": numpy.packbits(self.OUTCOMES),
+                  "positions_gaps": numpy.diff(self.POSITIONS, prepend=0)}
+        if self.CONFIDENCES is not None:
+            arrays["confidences"] = self.CONFIDENCES
+        metadata = dict(self.METADATA)
+        metadata["num_outcomes"] = len(self.OUTCOMES)
+        return Archiver.archive_arrays(arrays, dir_path, name, "trace", metadata)
+
+    @staticmethod
+    def load(file_path):
+        metadata, arrays = Archiver.load(file_path)
+        num_outcomes = metadata.pop("num_outcomes")
+        outcomes = numpy.unpackbits(arrays["outcomes"], count=num_outcomes).astype(bool)
+        positions = numpy.cumsum(arrays["positions_gaps"])
+        return OutcomeTrace(outcomes, positions, arrays.get("confidences"), metadata)
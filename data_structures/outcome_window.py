@@ -0,0 +1,42 @@
+class OutcomeWindow:
+    """A circular buffer of the latest prediction outcomes of a learner, which is shared by the window-based
+    detectors monitoring that learner, so that the outcomes are stored once rather than once per detector.
+    Each subscriber keeps its own running aggregates, its own step counter and the length of its own window,
+    and reads the outcomes leaving its window from this buffer. The first subscriber to see an outcome adds it;
+    the subscribers must therefore be fed the same outcomes in lockstep, i.e. each one once per step, as in
+    DetectorsTraceReplay. The detectors of the pairs in PrequentialMultiPairs cannot share a window, even if their
+    learners give the same outcomes, as the pairs are fed one chunk after another, and each learner is reset on
+    the drifts of its own detector."""
+
+    def __init__(self, size=0):
+        self.WIN = [False] * (size + 1)
+        self.WIN_INDEX = 0
+        self.TIME = 0
+        self.NUM_SUBSCRIBERS = 0
+
+    def subscribe(self, size):
+        """Makes room for a window of the given size, and returns the step counter for the new subscriber."""
+        self.NUM_SUBSCRIBERS += 1
+        if len(self.WIN) < size + 1:
+            # THE OUTCOMES ARE LAID OUT FROM THE OLDEST TO THE NEWEST, BEFORE THE BUFFER IS EXTENDED
+            win = self.WIN[self.WIN_INDEX:] + self.WIN[:self.WIN_INDEX]
+            self.WIN_INDEX = len(win)
+            self.WIN = win + [False] * (size + 1 - len(win))
+        return self.TIME
+
+    def add(self, pr, time):
+        """Adds the outcome of the step after the given one, unless another subscriber has already added it,
+        and returns the step counter of the subscriber."""
+        if time == self.TIME:
+            self.WIN[self.WIN_INDEX] = bool(pr)
+            self.WIN_INDEX = (self.WIN_INDEX + 1) % len(self.WIN)
+            self.TIME += 1
+        elif time != self.TIME - 1:
+            raise ValueError('THE SUBSCRIBERS OF AN OUTCOME WINDOW MUST BE FED IN LOCKSTEP')
+        elif bool(pr) != self.get(0):
+            raise ValueError('THE SUBSCRIBERS OF AN OUTCOME WINDOW MUST BE FED THE SAME OUTCOMES')
+        return time + 1
+
+    def get(self, age):
+        """Returns the outcome added age steps before the latest one, e.g. get(0) returns the latest outcome."""
+        return self.WIN[(self.WIN_INDEX - 1 - age) % len(self.WIN)]
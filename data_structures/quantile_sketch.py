@@ -0,0 +1,56 @@
+import math
+
+
+class QuantileSketch:
+    """A bounded-memory quantile sketch of a numeric stream, built on a hierarchy of compactors. A full compactor
+    sorts its values and promotes every other one to the next level, where each value weighs twice as much.
+    The compactors alternate the values they promote, so that the sketch is deterministic."""
+
+    def __init__(self, capacity=200):
+        self.CAPACITY = capacity
+        self.COMPACTORS = [[]]
+        self.OFFSETS = [0]
+        self.COUNT = 0
+        self.MINIMUM_VALUE = math.inf
+        self.MAXIMUM_VALUE = -math.inf
+
+    def update(self, x):
+        self.COUNT += 1
+        if x < self.MINIMUM_VALUE:
+            self.MINIMUM_VALUE = x
+        if x > self.MAXIMUM_VALUE:
+            self.MAXIMUM_VALUE = x
+        self.COMPACTORS[0].append(x)
+        level = 0
+        while len(self.COMPACTORS[level]) >= self.CAPACITY:
+            self.__compact(level)
+            level += 1
+
+    def __compact(self, level):
+        if level + 1 == len(self.COMPACTORS):
+            self.COMPACTORS.append([])
+            self.OFFSETS.append(0)
+        compactor = sorted(self.COMPACTORS[level])
+        self.COMPACTORS[level + 1].extend(compactor[self.OFFSETS[level]::2])
+        self.OFFSETS[level] = 1 - self.OFFSETS[level]
+        self.COMPACTORS[level] = []
+
+    def get_quantiles(self, fractions):
+        """Returns the approximate values below which the given fractions of the stream fall."""
+        weighted_values = []
+        for level, compactor in enumerate(self.COMPACTORS):
+            weighted_values.extend((v, 2 ** level) for v in compactor)
+        weighted_values.sort()
+        total_weight = sum(w for v, w in weighted_values)
+
+        quantiles = []
+        i, cumulative_weight = 0, 0
+        for fraction in sorted(fractions):
+            while i < len(weighted_values) - 1 and cumulative_weight + weighted_values[i][1] < fraction * total_weight:
+                cumulative_weight += weighted_values[i][1]
+                i += 1
+            quantiles.append(weighted_values[i][0] if len(weighted_values) != 0 else None)
+        return quantiles
+
+    def get_size(self):
+        return sum(len(compactor) for compactor in self.COMPACTORS)
@@ -59,6 +59,7 @@ class TornadoDic:
     TRAINABLE = "TRAINABLE"
     NUM_CLASSIFIER = "CLASSIFIER FOR NUMERIC ATTRIBUTES"
     NOM_CLASSIFIER = "CLASSIFIER FOR NOMINAL ATTRIBUTES"
+    MIX_CLASSIFIER = "CLASSIFIER FOR NUMERIC AND NOMINAL ATTRIBUTES"
 
     RUNNING_TIME = "RUNNING TIME"
     TRAINING_TIME = "TRAINING TIME"
@@ -12,122 +12,11 @@ URL: http://www.cs.upc.edu/~GAVALDA/papers/adwin06.pdf
 
 import math
 
+import numpy
+
 from dictionary.tornado_dictionary import TornadoDic
 from drift_detection.detector import SuperDetector
-
-
-class ListItem:
-
-    def __init__(self, next_node=None, previous_node=None):
-
-        self.bucket_size_row = 0
-        self.MAXBUCKETS = 5
-
-        self.bucket_total = []
-        self.bucket_variance = []
-        for i in range(0, self.MAXBUCKETS + 1):
-            self.bucket_total.append(0)
-            self.bucket_variance.append(0)
-
-        self.next = next_node
-        self.previous = previous_node
-        if next_node is not None:
-            next_node.previous = self
-        if previous_node is not None:
-            previous_node.next = self
-
-        self.clear()
-
-    def clear(self):
-        self.bucket_size_row = 0
-        for k in range(0, self.MAXBUCKETS + 1):
-            self.clear_bucket(k)
-
-    def clear_bucket(self, k):
-        self.set_total(0, k)
-        self.set_variance(0, k)
-
-    def insert_bucket(self, value, variance):
-        k = self.bucket_size_row
-        self.bucket_size_row += 1
-        self.set_total(value, k)
-        self.set_variance(variance, k)
-
-    def remove_bucket(self):
-        self.compress_buckets_row(1)
-
-    def compress_buckets_row(self, number_items_deleted):
-        for k in range(number_items_deleted, self.MAXBUCKETS + 1):
-            self.bucket_total[k - number_items_deleted] = self.bucket_total[k]
-            self.bucket_variance[k - number_items_deleted] = self.bucket_variance[k]
-        for k in range(1, number_items_deleted + 1):
-            self.clear_bucket(self.MAXBUCKETS - k + 1)
-        self.bucket_size_row -= number_items_deleted
-
-    def set_previous(self, previous_node):
-        self.previous = previous_node
-
-    def set_next(self, next_node):
-        self.next = next_node
-
-    def get_total(self, k):
-        return self.bucket_total[k]
-
-    def set_total(self, value, k):
-        self.bucket_total[k] = value
-
-    def get_variance(self, k):
-        return self.bucket_variance[k]
-
-    def set_variance(self, value, k):
-        self.bucket_variance[k] = value
-
-
-class List:
-
-    def __init__(self):
-        self.count = None
-        self.head = None
-        self.tail = None
-
-        self.clear()
-        self.add_to_head()
-
-    def is_empty(self):
-        return self.count == 0
-
-    def clear(self):
-        self.head = None
-        self.tail = None
-        self.count = 0
-
-    def add_to_head(self):
-        self.head = ListItem(self.head, None)
-        if self.tail is None:
-            self.tail = self.head
-        self.count += 1
-
-    def remove_from_head(self):
-        self.head = self.head.next
-        if self.head is not None:
-            self.head.set_previous(None)
-        else:
-            self.tail = None
-        self.count -= 1
-
-    def add_to_tail(self):
-        self.tail = ListItem(None, self.tail)
-        if self.head is None:
-            self.head = self.tail
-        self.count += 1
-
-    def remove_from_tail(self):
-        self.tail = self.tail.previous
-        if self.tail is None:
-            self.head = None
-        else:
-            self.tail.set_next(None)
-        self.count -= 1
+from evaluators.memory_evaluator import MemoryEvaluator
 
 
 class ADWINChangeDetector(SuperDetector):
@@ -146,6 +35,9 @@ class ADWINChangeDetector(SuperDetector):
         drift_status = self.adwin.set_input(pr)
         return False, drift_status
 
+    def memory_footprint(self):
+        return super().memory_footprint() + self.adwin.memory_footprint()
+
     def reset(self):
         super().reset()
         self.adwin = ADWIN(self.DELTA)
@@ -156,8 +48,14 @@ class ADWINChangeDetector(SuperDetector):
 
 
 class ADWIN:
+    """The exponential histogram of ADWIN, whose buckets are kept in preallocated arrays of totals and variances,
+    with one row per size of buckets, i.e. each bucket of row i holds 2^i elements. The newest buckets are in row 0,
+    and the oldest ones are in row last_bucket_row. Each row is a circular buffer, which starts at its oldest bucket,
+    so that buckets are removed from a row without shifting the others. The arrays grow by doubling their rows."""
+
+    COLUMNS = numpy.arange(0, 6)
 
-    def __init__(self, delta):
+    def __init__(self, delta, num_rows=8):
 
         self.DELTA = delta
 
@@ -172,77 +70,97 @@ class ADWIN:
         self.detect_twice = 0
         self.mint_min_win_length = 5
 
-        self.MAXBUCKETS = 5
+        self.MAXBUCKETS = ADWIN.COLUMNS.size - 1
         self.TOTAL = 0
         self.VARIANCE = 0
         self.WIDTH = 0
 
-        self.list_row_buckets = List()
+        self.BUCKETS_TOTALS = numpy.zeros((num_rows, self.MAXBUCKETS + 1))
+        self.BUCKETS_VARIANCES = numpy.zeros((num_rows, self.MAXBUCKETS + 1))
+        self.ROWS_STARTS = [0] * num_rows
+        self.ROWS_SIZES = [0] * num_rows
+
+    def memory_footprint(self):
+        # THE ARRAYS OF BUCKETS ARE COUNTED WITH THEIR DATA, AND THE LISTS OF ROWS HOLD SMALL INTEGERS
+        return MemoryEvaluator.get_shallow_size(self)
 
     def insert_element(self, value):
         self.WIDTH += 1
-        self.insert_element_bucket(0, value, self.list_row_buckets.head)
+        # THE ELEMENT IS INSERTED AS A NEW BUCKET OF ROW 0; THE VARIANCES OF ROW 0 ARE ALWAYS ZERO
+        k = (self.ROWS_STARTS[0] + self.ROWS_SIZES[0]) % (self.MAXBUCKETS + 1)
+        self.BUCKETS_TOTALS[0, k] = value
+        self.ROWS_SIZES[0] += 1
+        self.bucket_number += 1
         inc_variance = 0
         if self.WIDTH > 1:
             inc_variance = (self.WIDTH - 1) * (value - self.TOTAL / (self.WIDTH - 1)) * (value - self.TOTAL / (self.WIDTH - 1)) / self.WIDTH
         self.VARIANCE += inc_variance
 
         self.TOTAL += value
-        self.compress_buckets()
-
-    def insert_element_bucket(self, variance, value, node):
-        node.insert_bucket(value, variance)
-        self.bucket_number += 1
+        if self.ROWS_SIZES[0] == self.MAXBUCKETS + 1:
+            self.compress_buckets()
+
+    def remove_buckets(self, row, number_items_deleted):
+        # THE OLDEST BUCKETS OF THE ROW ARE DROPPED BY MOVING ITS START
+        self.ROWS_STARTS[row] = (self.ROWS_STARTS[row] + number_items_deleted) % (self.MAXBUCKETS + 1)
+        self.ROWS_SIZES[row] -= number_items_deleted
+
+    def add_row(self):
+        self.last_bucket_row += 1
+        if self.last_bucket_row == len(self.ROWS_SIZES):
+            num_rows = len(self.ROWS_SIZES)
+            self.BUCKETS_TOTALS = numpy.concatenate((self.BUCKETS_TOTALS, numpy.zeros_like(self.BUCKETS_TOTALS)))
+            self.BUCKETS_VARIANCES = numpy.concatenate((self.BUCKETS_VARIANCES,
+                                                        numpy.zeros_like(self.BUCKETS_VARIANCES)))
+            self.ROWS_STARTS += [0] * num_rows
+            self.ROWS_SIZES += [0] * num_rows
 
     @staticmethod
     def bucket_size(row):
-        return int(pow(2, row))
+        return 1 << row
 
     def delete_element(self):
-        node = self.list_row_buckets.tail
-        n1 = self.bucket_size(self.last_bucket_row)
+        row = self.last_bucket_row
+        k = self.ROWS_STARTS[row]
+        n1 = self.bucket_size(row)
+        total = self.BUCKETS_TOTALS.item(row, k)
         self.WIDTH -= n1
-        self.TOTAL -= node.get_total(0)
-        u1 = node.get_total(0) / n1
-        inc_variance = node.get_variance(0) + n1 * self.WIDTH * (u1 - self.TOTAL / self.WIDTH) * (u1 - self.TOTAL / self.WIDTH) / (n1 + self.WIDTH)
+        self.TOTAL -= total
+        u1 = total / n1
+        inc_variance = self.BUCKETS_VARIANCES.item(row, k) + n1 * self.WIDTH * (u1 - self.TOTAL / self.WIDTH) * (u1 - self.TOTAL / self.WIDTH) / (n1 + self.WIDTH)
         self.VARIANCE -= inc_variance
         if self.VARIANCE < 0:
             self.VARIANCE = 0
 
-        node.remove_bucket()
+        self.remove_buckets(row, 1)
         self.bucket_number -= 1
-        if node.bucket_size_row == 0:
-            self.list_row_buckets.remove_from_tail()
+        if self.ROWS_SIZES[row] == 0:
             self.last_bucket_row -= 1
         return n1
 
     def compress_buckets(self):
-        cursor = self.list_row_buckets.head
-        i = 0
-        while True:
-            k = cursor.bucket_size_row
-            if k == self.MAXBUCKETS + 1:
-                next_node = cursor.next
-                if next_node is None:
-                    self.list_row_buckets.add_to_tail()
-                    next_node = cursor.next
-                    self.last_bucket_row += 1
-                n1 = self.bucket_size(i)
-                n2 = self.bucket_size(i)
-                u1 = cursor.get_total(0) / n1
-                u2 = cursor.get_total(1) / n2
-                inc_variance = n1 * n2 * (u1 - u2) * (u1 - u2) / (n1 + n2)
-                next_node.insert_bucket(cursor.get_total(0) + cursor.get_total(1), cursor.get_variance(0) + cursor.get_variance(1) + inc_variance)
-                self.bucket_number += 1
-                cursor.compress_buckets_row(2)
-                if next_node.bucket_size_row <= self.MAXBUCKETS:
-                    break
-            else:
-                break
-            cursor = cursor.next
-            i += 1
-            if cursor is None:
-                break
+        num_buckets = self.MAXBUCKETS + 1
+        row = 0
+        while self.ROWS_SIZES[row] == num_buckets:
+            if row == self.last_bucket_row:
+                self.add_row()
+            # THE TWO OLDEST BUCKETS OF THE ROW ARE MERGED INTO A BUCKET OF THE NEXT ROW
+            k1 = self.ROWS_STARTS[row]
+            k2 = (k1 + 1) % num_buckets
+            n1 = n2 = 1 << row
+            total_1, total_2 = self.BUCKETS_TOTALS.item(row, k1), self.BUCKETS_TOTALS.item(row, k2)
+            u1 = total_1 / n1
+            u2 = total_2 / n2
+            inc_variance = n1 * n2 * (u1 - u2) * (u1 - u2) / (n1 + n2)
+            variance = self.BUCKETS_VARIANCES.item(row, k1) + self.BUCKETS_VARIANCES.item(row, k2) + inc_variance
+            k = (self.ROWS_STARTS[row + 1] + self.ROWS_SIZES[row + 1]) % num_buckets
+            self.BUCKETS_TOTALS[row + 1, k] = total_1 + total_2
+            self.BUCKETS_VARIANCES[row + 1, k] = variance
+            self.ROWS_SIZES[row + 1] += 1
+            self.bucket_number += 1
+            self.ROWS_STARTS[row] = (k1 + 2) % num_buckets
+            self.ROWS_SIZES[row] = num_buckets - 2
+            row += 1
 
     def set_input(self, pr):
         bln_change = False
@@ -250,55 +168,44 @@ class ADWIN:
         self.insert_element(pr)
 
         if self.mint_time % self.mint_clock == 0 and self.WIDTH > self.mint_minim_longitud_window:
-            bln_reduce_width = True
-            while bln_reduce_width:
-                bln_reduce_width = False
-                bln_exit = False
-                n0 = 0
-                n1 = self.WIDTH
-                u0 = 0
-                u1 = self.TOTAL
-
-                cursor = self.list_row_buckets.tail
-                i = self.last_bucket_row
-                while True:
-
-                    for k in range(0, cursor.bucket_size_row):
-
-                        n0 += self.bucket_size(i)
-                        n1 -= self.bucket_size(i)
-                        u0 += cursor.get_total(k)
-                        u1 -= cursor.get_total(k)
-
-                        if i == 0 and k == cursor.bucket_size_row - 1:
-                            bln_exit = True
-                            break
-
-                        if n1 > self.mint_min_win_length + 1 and n0 > self.mint_min_win_length + 1 and self.bln_cut_expression(n0, n1, u0, u1):
-                            self.detect = self.mint_time
-
-                            if self.detect == 0:
-                                self.detect = self.mint_time
-                            elif self.detect_twice == 0:
-                                self.detect_twice = self.mint_time
-                            bln_reduce_width = True
-                            bln_change = True
-                            if self.WIDTH > 0:
-                                n0 -= self.delete_element()
-                                bln_exit = True
-                                break
-                    cursor = cursor.previous
-                    i -= 1
-                    if not (not bln_exit and cursor is not None):
-                        break
+            while self.bln_cut_exists():
+                self.detect = self.mint_time
+
+                if self.detect == 0:
+                    self.detect = self.mint_time
+                elif self.detect_twice == 0:
+                    self.detect_twice = self.mint_time
+                bln_change = True
+                self.delete_element()
 
         return bln_change
 
+    def bln_cut_exists(self):
+        """Checks the cut expression at all split points of the window at once. The window is split after each of
+        its buckets, from the oldest to the newest, except the newest one; the sizes and the totals of the two
+        sub-windows are read from the cumulative sums of the buckets."""
+        num_buckets = self.MAXBUCKETS + 1
+        rows = numpy.arange(self.last_bucket_row, -1, -1)
+        starts, sizes = numpy.array([self.ROWS_STARTS[self.last_bucket_row::-1],
+                                     self.ROWS_SIZES[self.last_bucket_row::-1]])[:, :, None]
+        # THE INDEXES OF THE BUCKETS IN THE FLATTENED ARRAYS, FROM THE OLDEST TO THE NEWEST
+        indexes = (rows[:, None] * num_buckets + (starts + ADWIN.COLUMNS) % num_buckets)[ADWIN.COLUMNS < sizes][:-1]
+
+        totals = self.BUCKETS_TOTALS.ravel()[indexes]
+        n0 = numpy.cumsum(numpy.left_shift(1, indexes // num_buckets))
+        n1 = self.WIDTH - n0
+        u0 = numpy.cumsum(totals)
+        # THE TOTALS ARE SUBTRACTED ONE BY ONE, AS IN A SCAN OVER THE BUCKETS
+        u1 = numpy.cumsum(numpy.concatenate(([self.TOTAL], -totals)))[1:]
+
+        splits = (n1 > self.mint_min_win_length + 1) & (n0 > self.mint_min_win_length + 1)
+        return bool(self.bln_cut_expression(n0[splits], n1[splits], u0[splits], u1[splits]).any())
+
     def bln_cut_expression(self, n0, n1, u0, u1):
-        diff = math.fabs((u0 / n0) - (u1 / n1))
+        diff = numpy.fabs((u0 / n0) - (u1 / n1))
         n = self.WIDTH
         m = (1 / (n0 - self.mint_min_win_length + 1)) + (1 / (n1 - self.mint_min_win_length + 1))
         dd = math.log(2 * math.log(n) / self.DELTA)
         v = self.VARIANCE / self.WIDTH
-        e = math.sqrt(2 * m * v * dd) + 2 / 3 * dd * m
+        e = numpy.sqrt(2 * m * v * dd) + 2 / 3 * dd * m
         return diff > e
@@ -19,7 +19,9 @@ from drift_detection.detector import SuperDetector
 
 
 class BDDM(SuperDetector):
-    """Bayesian Drift Detection Method (BDDM) class."""
+    """Bayesian Drift Detection Method (BDDM) class.
+    The window keeps the prefix sums of successful and unsuccessful trials at its split points, in arrays twice
+    as long as the window, so that the log posteriors of all split points are computed at once on every input."""
 
     DETECTOR_NAME = TornadoDic.BDDM
 
@@ -32,55 +34,79 @@ class BDDM(SuperDetector):
         self.drift_rate = drift_rate
         self.win_len = n
 
-        self.a = [] # all the successful trials
-        self.b = [] # all the unsuccessful trials
+        # A DRIFT IS SIGNALLED ONCE THE POSTERIOR PROBABILITY OF NO CHANGE IN THE WINDOW FALLS BELOW A THRESHOLD
+        self.drift_threshold = drift_confidence
+        self.warning_threshold = warning_confidence
+
+        self.log_stable_rate = np.log(1 - drift_rate)
+        self.log_drift_rate = np.log(drift_rate)
+
+        capacity = 2 * (n + 1) if n else 1024
+        self.a = np.zeros(capacity) # prefix sums of the successful trials
+        self.b = np.zeros(capacity) # prefix sums of the unsuccessful trials
+        self.start = 0 # the split points of the window are at a[start:end], where a[start] is always 0
+        self.end = 1
         self.N = 0 # total number of trials
 
-    def log_prior(self, t):
-        if t==0:
-            return np.log(1-self.drift_rate)*self.N
-        else:
-            return np.log(1-self.drift_rate)*(t-1) + np.log(self.drift_rate)
+    def log_priors(self):
+        # THE PRIOR OF A CHANGE AFTER t TRIALS, WHERE THE FIRST SPLIT POINT STANDS FOR NO CHANGE AT ALL
+        t = self.a[self.start:self.end - 1] + self.b[self.start:self.end - 1]
+        log_priors = self.log_stable_rate * (t - 1) + self.log_drift_rate
+        log_priors[0] = self.log_stable_rate * self.N
+        return log_priors
 
-    def log_likelihood(self, drift_point):
-        a1 = sum(self.a[:drift_point])
-        b1 = sum(self.b[:drift_point])
-        a2 = sum(self.a[drift_point:])
-        b2 = sum(self.b[drift_point:])
-        return betaln(a1+1, b1+1) + betaln(a2+1, b2+1)
+    def log_likelihoods(self):
+        a1 = self.a[self.start:self.end - 1]
+        b1 = self.b[self.start:self.end - 1]
+        a2 = self.a[self.end - 1] - a1
+        b2 = self.b[self.end - 1] - b1
+        return betaln(np.stack((a1, a2)) + 1, np.stack((b1, b2)) + 1).sum(axis=0)
 
     def run(self, pr):
 
-        self.a.append(pr)
-        self.b.append(1-pr)
+        if self.end == len(self.a):
+            self.__move_window()
+        self.a[self.end] = self.a[self.end - 1] + pr
+        self.b[self.end] = self.b[self.end - 1] + (1 - pr)
+        self.end += 1
         self.N += 1
 
-        # if we have exceeded the window length, then combine the first two items in the window
-        if self.win_len and len(self.a) > self.win_len:
-            self.a = [sum(self.a[: 2])] + self.a[2: ]
-            self.b = [sum(self.b[: 2])] + self.b[2: ]
+        # if we have exceeded the window length, then combine the first two items in the window,
+        # i.e. remove the split point between them
+        if self.win_len and self.end - self.start - 1 > self.win_len:
+            self.start += 1
+            self.a[self.start] = 0
+            self.b[self.start] = 0
 
-        log_posteriors = []
-        for k in range(self.N):
-            log_posteriors.append( self.log_likelihood(k) + self.log_prior(k) )
-        log_posteriors -= max(log_posteriors)
-        posteriors = np.exp(log_posteriors)
+        log_posteriors = self.log_likelihoods() + self.log_priors()
+        posteriors = np.exp(log_posteriors - log_posteriors.max())
 
-
-        pr_stable = posteriors[0] / sum(posteriors)
+        pr_stable = posteriors[0] / posteriors.sum()
 
         warning_status, drift_status = False, False
-        if pr_drift < self.drift_threshold:
+        if pr_stable < self.drift_threshold:
             drift_status = True
-        elif pr_drift < self.warning_threshold:
+        elif pr_stable < self.warning_threshold:
             warning_status = True
 
         return warning_status, drift_status
 
+    def __move_window(self):
+        # THE WINDOW IS MOVED BACK TO THE BEGINNING OF THE ARRAYS, WHICH ARE DOUBLED IF IT TAKES MORE THAN HALF OF THEM
+        size = self.end - self.start
+        if 2 * size > len(self.a):
+            self.a = np.concatenate((self.a, np.zeros(len(self.a))))
+            self.b = np.concatenate((self.b, np.zeros(len(self.b))))
+        self.a[0:size] = self.a[self.start:self.end]
+        self.b[0:size] = self.b[self.start:self.end]
+        self.start, self.end = 0, size
+
     def reset(self):
         super().reset()
-        self.a = []
-        self.b = []
+        self.a.fill(0)
+        self.b.fill(0)
+        self.start = 0
+        self.end = 1
         self.N = 0
 
     def get_settings(self):
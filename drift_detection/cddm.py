@@ -17,6 +17,7 @@ import warnings
 
 from dictionary.tornado_dictionary import TornadoDic
 from drift_detection.detector import SuperDetector
+from evaluators.memory_evaluator import MemoryEvaluator
 
 
 class CDDM(SuperDetector):
@@ -57,6 +58,9 @@ class CDDM(SuperDetector):
 
         return warning_status, drift_status
 
+    def memory_footprint(self):
+        return super().memory_footprint() + MemoryEvaluator.get_numbers_size(len(self.window))
+
     def reset(self):
         super().reset()
         self.window =  []
@@ -13,8 +13,10 @@ URL: https://link.springer.com/chapter/10.1007/978-3-540-28645-5_29
 import math
 import sys
 
+import numpy
+
 from dictionary.tornado_dictionary import TornadoDic
-from drift_detection.detector import SuperDetector
+from drift_detection.detector import SuperDetector, SuperDetectorBank
 
 
 class DDM(SuperDetector):
@@ -77,3 +79,60 @@ class DDM(SuperDetector):
     def get_settings(self):
         return [str(self.MINIMUM_NUM_INSTANCES),
                 "$n_{min}$:" + str(self.MINIMUM_NUM_INSTANCES)]
+
+
+class DDMBank(SuperDetectorBank):
+    """A bank of DDM detectors, whose statistics are the same as those of DDM, for each of the detectors."""
+
+    DETECTOR_NAME = TornadoDic.DDM
+
+    def __init__(self, num_detectors, min_instance=30):
+
+        super().__init__(num_detectors)
+
+        self.MINIMUM_NUM_INSTANCES = min_instance
+        self.NUM_INSTANCES_SEEN = numpy.ones(num_detectors, dtype=numpy.int64)
+
+        self.__P = numpy.ones(num_detectors)
+        self.__S = numpy.zeros(num_detectors)
+        self.__P_min = numpy.full(num_detectors, float(sys.maxsize))
+        self.__S_min = numpy.full(num_detectors, float(sys.maxsize))
+
+    def run(self, outcomes):
+
+        pr = (~outcomes).astype(numpy.int64)
+
+        # 1. UPDATING STATS
+        self.__P += (pr - self.__P) / self.NUM_INSTANCES_SEEN
+        self.__S = numpy.sqrt(self.__P * (1 - self.__P) / self.NUM_INSTANCES_SEEN)
+
+        self.NUM_INSTANCES_SEEN += 1
+
+        active = self.NUM_INSTANCES_SEEN >= self.MINIMUM_NUM_INSTANCES
+
+        minimum = active & (self.__P + self.__S <= self.__P_min + self.__S_min)
+        self.__P_min[minimum] = self.__P[minimum]
+        self.__S_min[minimum] = self.__S[minimum]
+
+        # 2. UPDATING WARNING AND DRIFT STATUSES
+        current_level = self.__P + self.__S
+        warning_level = self.__P_min + 2 * self.__S_min
+        drift_level = self.__P_min + 3 * self.__S_min
+
+        warnings = active & (current_level > warning_level)
+        drifts = active & (current_level > drift_level)
+
+        return warnings, drifts
+
+    def reset(self, mask=None):
+        super().reset(mask)
+        mask = self.get_mask(mask)
+        self.NUM_INSTANCES_SEEN[mask] = 1
+        self.__P[mask] = 1
+        self.__S[mask] = 0
+        self.__P_min[mask] = sys.maxsize
+        self.__S_min[mask] = sys.maxsize
+
+    def get_settings(self):
+        return [str(self.MINIMUM_NUM_INSTANCES),
+                "$n_{min}$:" + str(self.MINIMUM_NUM_INSTANCES)]
@@ -5,24 +5,51 @@ University of Ottawa, Ontario, Canada
 E-mail: apesaran -at- uottawa -dot- ca / alipsgh -at- gmail -dot- com
 """
 
+import random
 import time
 
+import numpy
+
+from evaluators.memory_evaluator import MemoryEvaluator
+
+# THE STRIDES BETWEEN THE MEASURED CALLS ARE DRAWN FROM A RANDOM STATE OF THEIR OWN, AS THE GLOBAL ONE
+# IS USED BY THE LEARNERS AND THE DETECTORS, E.G. BY SEQDRIFT2
+_TIMING_RANDOM = random.Random()
+
 
 class SuperDetector:
     """A drift detector method inherits this super detector class!"""
 
+    # THE RUNTIME IS MEASURED ON ONE CALL IN TIMING_STEP CALLS, ON AVERAGE, AND EXTRAPOLATED TO THE CALLS
+    # IN BETWEEN; THE STRIDES ARE RANDOM, AND SO IS THE FIRST MEASURED CALL, SO THAT THE MEASURED CALLS DO NOT
+    # FALL IN STEP WITH ANY PERIODIC PATTERN OF THE STREAM. WITH A TIMING_STEP OF 1, EVERY CALL IS MEASURED
+    TIMING_STEP = 1
+
     def __init__(self):
         self.RUNTIME = 0
         self.TOTAL_RUNTIME = 0
+        self.__SKIPS = _TIMING_RANDOM.randrange(self.TIMING_STEP)
+        # A WINDOW-BASED DETECTOR MAY READ ITS OUTCOMES FROM AN OUTCOME WINDOW SHARED WITH OTHER DETECTORS
+        self.OUTCOME_WINDOW = None
+
+    def set_timing_step(self, timing_step):
+        self.TIMING_STEP = timing_step
+        self.__SKIPS = _TIMING_RANDOM.randrange(timing_step)
 
     def detect(self, pr, confidence=False):
-        t1 = time.perf_counter()
+        if self.__SKIPS > 0:
+            self.__SKIPS -= 1
+            return self.run(pr, confidence) if confidence else self.run(pr)
+        t1 = time.perf_counter_ns()
         if confidence:
             warning_status, drift_status = self.run(pr, confidence)
         else:
             warning_status, drift_status = self.run(pr)
-        t2 = time.perf_counter()
-        delta_t = (t2 - t1) * 1000  # in milliseconds
+        t2 = time.perf_counter_ns()
+        # A MEASURED CALL STANDS FOR ITSELF AND FOR THE CALLS SKIPPED AFTER IT, TIMING_STEP - 1 OF THEM ON AVERAGE
+        stride = 1 if self.TIMING_STEP == 1 else _TIMING_RANDOM.randint(1, 2 * self.TIMING_STEP - 1)
+        self.__SKIPS = stride - 1
+        delta_t = (t2 - t1) * stride / 1000000  # in milliseconds
         self.RUNTIME += delta_t
         self.TOTAL_RUNTIME += delta_t
         return warning_status, drift_status
@@ -30,8 +57,83 @@ class SuperDetector:
     def run(self, pr):
         return False, False
 
+    def detect_batch(self, outcomes, reset_on_drift=True):
+        """Runs the detector over an array of prediction outcomes, and returns the indexes of warnings and drifts.
+        The outcomes may be booleans or 0/1 numbers, which are converted to booleans, as the run functions expect.
+        As in the prequential tasks, the detector is reset after each drift unless reset_on_drift is False.
+        The runtime is measured once for the whole batch. A detector sharing its outcome window with others
+        must be fed in lockstep with them, one outcome at a time, e.g. by DetectorsTraceReplay."""
+        if self.OUTCOME_WINDOW is not None and self.OUTCOME_WINDOW.NUM_SUBSCRIBERS > 1:
+            raise ValueError('A DETECTOR SHARING ITS OUTCOME WINDOW MUST BE FED ONE OUTCOME AT A TIME, IN LOCKSTEP')
+        outcomes = numpy.asarray(outcomes, dtype=bool)
+        t1 = time.perf_counter_ns()
+        warning_indexes, drift_indexes = self.run_batch(outcomes, reset_on_drift)
+        t2 = time.perf_counter_ns()
+        delta_t = (t2 - t1) / 1000000  # in milliseconds
+        self.RUNTIME += delta_t
+        self.TOTAL_RUNTIME += delta_t
+        return warning_indexes, drift_indexes
+
+    def run_batch(self, outcomes, reset_on_drift=True):
+        """A detector with a closed form over its window may override this function; by default,
+        the outcomes are passed to the run function one by one."""
+        warning_indexes, drift_indexes = [], []
+        for i, pr in enumerate(outcomes.tolist()):
+            warning_status, drift_status = self.run(pr)
+            if warning_status:
+                warning_indexes.append(i)
+            if drift_status:
+                drift_indexes.append(i)
+                if reset_on_drift:
+                    self.reset()
+        return warning_indexes, drift_indexes
+
+    def memory_footprint(self):
+        """Returns an estimate of the bytes taken by the detector, from the sizes of its attributes where windows
+        are counted by their lengths. A detector whose windows hold separate objects, e.g. floats, adds them."""
+        return MemoryEvaluator.get_shallow_size(self)
+
     def reset(self):
         self.RUNTIME = 0
 
     def get_settings(self):
         raise NotImplementedError('THE RESET FUNCTION HAS NOT BEEN DEFINED IN THE CHILD')
+
+
+class SuperDetectorBank:
+    """A bank of detectors of the same type, which monitors many independent streams at once. The states of
+    the detectors are kept in arrays, with one entry per detector, and they are all updated from an array of outcomes
+    in one call. A detector bank inherits this super detector bank class!"""
+
+    def __init__(self, num_detectors):
+        self.NUM_DETECTORS = num_detectors
+        self.RUNTIME = 0
+        self.TOTAL_RUNTIME = 0
+
+    def detect(self, outcomes):
+        """Updates each detector with its own prediction outcome, and returns the masks of warnings and drifts.
+        As with a single detector, the detectors which faced drifts are not reset until reset is called."""
+        t1 = time.perf_counter_ns()
+        warnings, drifts = self.run(numpy.asarray(outcomes, dtype=bool))
+        t2 = time.perf_counter_ns()
+        delta_t = (t2 - t1) / 1000000  # in milliseconds
+        self.RUNTIME += delta_t
+        self.TOTAL_RUNTIME += delta_t
+        return warnings, drifts
+
+    def run(self, outcomes):
+        raise NotImplementedError('THE RUN FUNCTION HAS NOT BEEN DEFINED IN THE CHILD')
+
+    def memory_footprint(self):
+        return MemoryEvaluator.get_shallow_size(self)
+
+    def reset(self, mask=None):
+        """Resets the detectors selected by a mask, e.g. the mask of drifts, or all of them."""
+        self.RUNTIME = 0
+
+    @staticmethod
+    def get_mask(mask):
+        return slice(None) if mask is None else numpy.asarray(mask, dtype=bool)
+
+    def get_settings(self):
+        raise NotImplementedError('THE GET_SETTINGS FUNCTION HAS NOT BEEN DEFINED IN THE CHILD')
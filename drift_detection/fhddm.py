@@ -12,8 +12,10 @@ URL: https://link.springer.com/chapter/10.1007/978-3-319-46227-1_7
 
 import math
 
+import numpy
+
 from dictionary.tornado_dictionary import TornadoDic
-from drift_detection.detector import SuperDetector
+from drift_detection.detector import SuperDetector, SuperDetectorBank
 
 
 class FHDDM(SuperDetector):
@@ -21,7 +23,7 @@ class FHDDM(SuperDetector):
 
     DETECTOR_NAME = TornadoDic.FHDDM
 
-    def __init__(self, n=100, delta=0.000001):
+    def __init__(self, n=100, delta=0.000001, outcome_window=None):
 
         super().__init__()
 
@@ -29,28 +31,92 @@ class FHDDM(SuperDetector):
         self.__N = n
         self.__E = math.sqrt(math.log((1 / self.__DELTA), math.e) / (2 * self.__N))
 
-        self.__WIN = []
+        # THE WINDOW IS A RING BUFFER, AND THE NUMBER OF CORRECT PREDICTIONS IN IT IS KEPT AS A RUNNING SUM;
+        # WITH A SHARED OUTCOME WINDOW, ONLY THE RUNNING SUM AND THE LENGTH OF THE WINDOW ARE KEPT HERE
+        self.OUTCOME_WINDOW = outcome_window
+        self.__WIN = [False] * self.__N if outcome_window is None else None
+        self.__TIME = outcome_window.subscribe(self.__N) if outcome_window is not None else 0
+        self.__WIN_INDEX = 0
+        self.__WIN_SIZE = 0
+        self.__NUM_ONES = 0
         self.__MU_M = 0
 
     def run(self, pr):
 
         drift_status = False
 
-        if len(self.__WIN) >= self.__N:
-            self.__WIN.pop(0)
-        self.__WIN.append(pr)
-
-        if len(self.__WIN) >= self.__N:
-            mu_t = self.__WIN.count(True) / self.__N
+        if self.OUTCOME_WINDOW is None:
+            if self.__WIN_SIZE >= self.__N:
+                if self.__WIN[self.__WIN_INDEX]:
+                    self.__NUM_ONES -= 1
+            else:
+                self.__WIN_SIZE += 1
+            self.__WIN[self.__WIN_INDEX] = pr
+            self.__WIN_INDEX = (self.__WIN_INDEX + 1) % self.__N
+        else:
+            self.__TIME = self.OUTCOME_WINDOW.add(pr, self.__TIME)
+            if self.__WIN_SIZE >= self.__N:
+                if self.OUTCOME_WINDOW.get(self.__N):
+                    self.__NUM_ONES -= 1
+            else:
+                self.__WIN_SIZE += 1
+        if pr:
+            self.__NUM_ONES += 1
+
+        if self.__WIN_SIZE >= self.__N:
+            mu_t = self.__NUM_ONES / self.__N
             if self.__MU_M < mu_t:
                 self.__MU_M = mu_t
             drift_status = (self.__MU_M - mu_t) > self.__E
 
         return False, drift_status
 
+    def run_batch(self, outcomes, reset_on_drift=True):
+        # A DETECTOR WITH AN OUTCOME WINDOW, OF WHICH IT IS THE ONLY SUBSCRIBER, ADDS THE OUTCOMES TO IT ONE BY ONE
+        if self.OUTCOME_WINDOW is not None:
+            return super().run_batch(outcomes, reset_on_drift)
+
+        outcomes = outcomes.astype(bool)
+        drift_indexes = []
+        start = 0
+        while start < len(outcomes):
+            # THE CURRENT WINDOW IS PUT BEFORE THE OUTCOMES, SO THAT THE FIRST WINDOWS OF THE BATCH ARE COMPLETE
+            win = self.__get_window()
+            seq = numpy.concatenate((numpy.array(win, dtype=bool), outcomes[start:]))
+            ones = numpy.concatenate(([0], numpy.cumsum(seq)))
+            ends = numpy.arange(max(len(win), self.__N - 1), len(seq))
+            mu_t = (ones[ends + 1] - ones[ends + 1 - self.__N]) / self.__N
+            mu_m = numpy.maximum.accumulate(numpy.maximum(mu_t, self.__MU_M))
+            drifts = numpy.flatnonzero((mu_m - mu_t) > self.__E)
+            if len(drifts) == 0 or not reset_on_drift:
+                drift_indexes += (ends[drifts] - len(win) + start).tolist()
+                self.__set_window(seq[max(0, len(seq) - self.__N):].tolist())
+                if len(mu_m) != 0:
+                    self.__MU_M = float(mu_m[-1])
+                break
+            index = int(ends[drifts[0]]) - len(win) + start
+            drift_indexes.append(index)
+            self.reset()
+            start = index + 1
+        return [], drift_indexes
+
+    def __get_window(self):
+        if self.__WIN_SIZE < self.__N:
+            return self.__WIN[:self.__WIN_SIZE]
+        return self.__WIN[self.__WIN_INDEX:] + self.__WIN[:self.__WIN_INDEX]
+
+    def __set_window(self, win):
+        self.__WIN = win + [False] * (self.__N - len(win))
+        self.__WIN_INDEX = len(win) % self.__N
+        self.__WIN_SIZE = len(win)
+        self.__NUM_ONES = win.count(True)
+
     def reset(self):
         super().reset()
-        self.__WIN.clear()
+        self.__WIN = [False] * self.__N if self.OUTCOME_WINDOW is None else None
+        self.__WIN_INDEX = 0
+        self.__WIN_SIZE = 0
+        self.__NUM_ONES = 0
         self.__MU_M = 0
 
     def get_settings(self):
@@ -58,3 +124,56 @@ class FHDDM(SuperDetector):
                     "$n$:" + str(self.__N) + ", " +
                     "$\delta$:" + str(self.__DELTA).upper()]
         return settings
+
+
+class FHDDMBank(SuperDetectorBank):
+    """A bank of FHDDM detectors, whose statistics are the same as those of FHDDM, for each of the detectors.
+    The windows are the rows of a ring buffer array, each of them with its own index and size."""
+
+    DETECTOR_NAME = TornadoDic.FHDDM
+
+    def __init__(self, num_detectors, n=100, delta=0.000001):
+
+        super().__init__(num_detectors)
+
+        self.__DELTA = delta
+        self.__N = n
+        self.__E = math.sqrt(math.log((1 / self.__DELTA), math.e) / (2 * self.__N))
+
+        self.__ROWS = numpy.arange(0, num_detectors)
+        self.__WIN = numpy.zeros((num_detectors, self.__N), dtype=bool)
+        self.__WIN_INDEX = numpy.zeros(num_detectors, dtype=numpy.int64)
+        self.__WIN_SIZE = numpy.zeros(num_detectors, dtype=numpy.int64)
+        self.__NUM_ONES = numpy.zeros(num_detectors, dtype=numpy.int64)
+        self.__MU_M = numpy.zeros(num_detectors)
+
+    def run(self, outcomes):
+
+        full = self.__WIN_SIZE >= self.__N
+        self.__NUM_ONES -= full & self.__WIN[self.__ROWS, self.__WIN_INDEX]
+        self.__WIN_SIZE += ~full
+        self.__WIN[self.__ROWS, self.__WIN_INDEX] = outcomes
+        self.__NUM_ONES += outcomes
+        self.__WIN_INDEX = (self.__WIN_INDEX + 1) % self.__N
+
+        full = self.__WIN_SIZE >= self.__N
+        mu_t = self.__NUM_ONES / self.__N
+        self.__MU_M = numpy.where(full & (self.__MU_M < mu_t), mu_t, self.__MU_M)
+        drifts = full & ((self.__MU_M - mu_t) > self.__E)
+
+        return numpy.zeros(self.NUM_DETECTORS, dtype=bool), drifts
+
+    def reset(self, mask=None):
+        super().reset(mask)
+        mask = self.get_mask(mask)
+        self.__WIN[mask] = False
+        self.__WIN_INDEX[mask] = 0
+        self.__WIN_SIZE[mask] = 0
+        self.__NUM_ONES[mask] = 0
+        self.__MU_M[mask] = 0
+
+    def get_settings(self):
+        settings = [str(self.__N) + "." + str(self.__DELTA),
+                    "$n$:" + str(self.__N) + ", " +
+                    "$\delta$:" + str(self.__DELTA).upper()]
+        return settings
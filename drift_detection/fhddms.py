@@ -11,6 +11,8 @@ URL: https://arxiv.org/pdf/1709.02457.pdf
 
 import math
 
+import numpy
+
 from dictionary.tornado_dictionary import TornadoDic
 from drift_detection.detector import SuperDetector
 
@@ -20,17 +22,26 @@ class FHDDMS(SuperDetector):
 
     DETECTOR_NAME = TornadoDic.FHDDMS
 
-    def __init__(self, m=4, n=25, delta=0.000001):
+    def __init__(self, m=4, n=25, delta=0.000001, outcome_window=None):
 
         super().__init__()
 
-        self._WIN = []
         self._WIN_SIZE = m * n
 
         self._S_WIN_NUM = m
         self._S_WIN_SIZE = n
         self._DELTA = delta
 
+        # THE WINDOW IS A RING BUFFER, AND THE NUMBER OF CORRECT PREDICTIONS IN EACH SUB-WINDOW IS KEPT;
+        # AS THE WINDOW SLIDES, ONE ELEMENT CROSSES EACH BOUNDARY BETWEEN TWO NEIGHBOURING SUB-WINDOWS;
+        # WITH A SHARED OUTCOME WINDOW, THOSE ELEMENTS ARE READ FROM IT, AND ONLY THE COUNTS ARE KEPT HERE
+        self.OUTCOME_WINDOW = outcome_window
+        self._WIN = [False] * self._WIN_SIZE if outcome_window is None else None
+        self._TIME = outcome_window.subscribe(self._WIN_SIZE) if outcome_window is not None else 0
+        self._WIN_INDEX = 0
+        self._WIN_LENGTH = 0
+        self._S_WIN_ONES = [0] * m
+
         self._mu_max_short = 0
         self._mu_max_large = 0
 
@@ -41,16 +52,30 @@ class FHDDMS(SuperDetector):
         drift_status = False
         warning_status = False
 
-        if len(self._WIN) >= self._WIN_SIZE:
-            self._WIN.pop(0)
-        self._WIN.append(pr)
-
-        if len(self._WIN) == self._WIN_SIZE:
+        if self.OUTCOME_WINDOW is not None:
+            self._TIME = self.OUTCOME_WINDOW.add(pr, self._TIME)
+
+        if self._WIN_LENGTH >= self._WIN_SIZE:
+            # THE OLDEST ELEMENT IS AT THE CURRENT INDEX OF THE RING BUFFER, OR _WIN_SIZE STEPS OLD IN THE SHARED ONE
+            if self.__get_outcome(0):
+                self._S_WIN_ONES[0] -= 1
+            for i in range(1, self._S_WIN_NUM):
+                if self.__get_outcome(i * self._S_WIN_SIZE):
+                    self._S_WIN_ONES[i] -= 1
+                    self._S_WIN_ONES[i - 1] += 1
+            position = self._WIN_SIZE - 1
+        else:
+            position = self._WIN_LENGTH
+            self._WIN_LENGTH += 1
+        if self.OUTCOME_WINDOW is None:
+            self._WIN[self._WIN_INDEX] = pr
+            self._WIN_INDEX = (self._WIN_INDEX + 1) % self._WIN_SIZE
+        if pr:
+            self._S_WIN_ONES[position // self._S_WIN_SIZE] += 1
+
+        if self._WIN_LENGTH == self._WIN_SIZE:
             # TESTING THE SHORT WINDOW
-            sub_wins_mu = []
-            for i in range(0, self._S_WIN_NUM):
-                sub_win = self._WIN[i * self._S_WIN_SIZE: (i + 1) * self._S_WIN_SIZE]
-                sub_wins_mu.append(sub_win.count(True) / len(sub_win))
+            sub_wins_mu = [ones / self._S_WIN_SIZE for ones in self._S_WIN_ONES]
             if self._mu_max_short < sub_wins_mu[self._S_WIN_NUM - 1]:
                 self._mu_max_short = sub_wins_mu[self._S_WIN_NUM - 1]
             if self._mu_max_short - sub_wins_mu[self._S_WIN_NUM - 1] > self.__cal_hoeffding_bound(self._S_WIN_SIZE):
@@ -65,9 +90,70 @@ class FHDDMS(SuperDetector):
 
         return warning_status, drift_status
 
+    def __get_outcome(self, offset):
+        """Returns the outcome at the given offset from the oldest one in the full window, before the window slides."""
+        if self.OUTCOME_WINDOW is None:
+            return self._WIN[(self._WIN_INDEX + offset) % self._WIN_SIZE]
+        return self.OUTCOME_WINDOW.get(self._WIN_SIZE - offset)
+
+    def run_batch(self, outcomes, reset_on_drift=True):
+        # WITHOUT RESETS, THE LONG WINDOW IS NOT TESTED AFTER DRIFTS IN THE SHORT WINDOW, SO IT IS RUN ONE BY ONE;
+        # SO IS A DETECTOR WITH AN OUTCOME WINDOW, OF WHICH IT IS THE ONLY SUBSCRIBER
+        if not reset_on_drift or self.OUTCOME_WINDOW is not None:
+            return super().run_batch(outcomes, reset_on_drift)
+
+        outcomes = outcomes.astype(bool)
+        drift_indexes = []
+        start = 0
+        while start < len(outcomes):
+            # THE CURRENT WINDOW IS PUT BEFORE THE OUTCOMES, SO THAT THE FIRST WINDOWS OF THE BATCH ARE COMPLETE
+            win = self._get_window()
+            seq = numpy.concatenate((numpy.array(win, dtype=bool), outcomes[start:]))
+            ones = numpy.concatenate(([0], numpy.cumsum(seq)))
+            ends = numpy.arange(max(len(win), self._WIN_SIZE - 1), len(seq))
+            sub_wins_mu = []
+            for i in range(0, self._S_WIN_NUM):
+                sub_win_end = ends + 1 - self._WIN_SIZE + (i + 1) * self._S_WIN_SIZE
+                sub_wins_mu.append((ones[sub_win_end] - ones[sub_win_end - self._S_WIN_SIZE]) / self._S_WIN_SIZE)
+            mu_short = sub_wins_mu[self._S_WIN_NUM - 1]
+            mu_max_short = numpy.maximum.accumulate(numpy.maximum(mu_short, self._mu_max_short))
+            mu_long = 0
+            for sub_win_mu in sub_wins_mu:
+                mu_long = mu_long + sub_win_mu
+            mu_long = mu_long / self._S_WIN_NUM
+            mu_max_large = numpy.maximum.accumulate(numpy.maximum(mu_long, self._mu_max_large))
+            drifts = numpy.flatnonzero((mu_max_short - mu_short > self.__cal_hoeffding_bound(self._S_WIN_SIZE)) |
+                                       (mu_max_large - mu_long > self.__cal_hoeffding_bound(self._WIN_SIZE)))
+            if len(drifts) == 0:
+                self._set_window(seq[max(0, len(seq) - self._WIN_SIZE):].tolist())
+                if len(ends) != 0:
+                    self._mu_max_short = float(mu_max_short[-1])
+                    self._mu_max_large = float(mu_max_large[-1])
+                break
+            index = int(ends[drifts[0]]) - len(win) + start
+            drift_indexes.append(index)
+            self.reset()
+            start = index + 1
+        return [], drift_indexes
+
+    def _get_window(self):
+        if self._WIN_LENGTH < self._WIN_SIZE:
+            return self._WIN[:self._WIN_LENGTH]
+        return self._WIN[self._WIN_INDEX:] + self._WIN[:self._WIN_INDEX]
+
+    def _set_window(self, win):
+        self._WIN = win + [False] * (self._WIN_SIZE - len(win))
+        self._WIN_INDEX = len(win) % self._WIN_SIZE
+        self._WIN_LENGTH = len(win)
+        self._S_WIN_ONES = [win[i * self._S_WIN_SIZE: (i + 1) * self._S_WIN_SIZE].count(True)
+                            for i in range(0, self._S_WIN_NUM)]
+
     def reset(self):
         super().reset()
-        self._WIN.clear()
+        self._WIN = [False] * self._WIN_SIZE if self.OUTCOME_WINDOW is None else None
+        self._WIN_INDEX = 0
+        self._WIN_LENGTH = 0
+        self._S_WIN_ONES = [0] * self._S_WIN_NUM
         self._mu_max_short = 0
         self._mu_max_large = 0
 
@@ -13,6 +13,7 @@ import math
 
 from dictionary.tornado_dictionary import TornadoDic
 from drift_detection.detector import SuperDetector
+from evaluators.memory_evaluator import MemoryEvaluator
 
 
 class FHDDMS_add(SuperDetector):
@@ -87,6 +88,9 @@ class FHDDMS_add(SuperDetector):
 
         return warning_status, drift_status
 
+    def memory_footprint(self):
+        return super().memory_footprint() + MemoryEvaluator.get_numbers_size(len(self._stack))
+
     def reset(self):
         super().reset()
         self.init_stack(len(self._stack))
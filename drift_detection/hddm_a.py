@@ -12,8 +12,10 @@ URL: http://ieeexplore.ieee.org/abstract/document/6871418/
 
 import math
 
+import numpy
+
 from dictionary.tornado_dictionary import TornadoDic
-from drift_detection.detector import SuperDetector
+from drift_detection.detector import SuperDetector, SuperDetectorBank
 
 
 class HDDM_A_test(SuperDetector):
@@ -85,6 +87,70 @@ class HDDM_A_test(SuperDetector):
 
         return warning_status, drift_status
 
+    def run_batch(self, outcomes, reset_on_drift=True):
+        # THE STATS ARE RESET ON DRIFTS, AND ON DECREASES FOR THE TWO-SIDED TEST, WHETHER OR NOT THE DETECTOR IS;
+        # SO reset_on_drift MAKES NO DIFFERENCE, AND THE BATCH IS RUN AGAIN FROM THE STEP AFTER EACH RESET
+        warning_indexes, drift_indexes = [], []
+        log_drift_confidence = math.log(1.0 / self.drift_confidence, math.e)
+        start = 0
+        while start < len(outcomes):
+            # THE STEPS ARE TAKEN IN BLOCKS, SO THAT FREQUENT RESETS DO NOT MAKE THE RUN QUADRATIC
+            end = min(len(outcomes), start + 4096)
+            total_n = self.total_n + numpy.arange(1, end - start + 1)
+            total_c = self.total_c + numpy.cumsum(~outcomes[start:end], dtype=numpy.int64)
+            cota1 = numpy.sqrt((1.0 / (2 * total_n)) * log_drift_confidence)
+            n_min, c_min = self.__get_extremes(total_n, total_c, total_c / total_n + cota1, self.n_min, self.c_min,
+                                               log_drift_confidence, numpy.minimum, 1)
+            n_max, c_max = self.__get_extremes(total_n, total_c, total_c / total_n - cota1, self.n_max, self.c_max,
+                                               log_drift_confidence, numpy.maximum, -1)
+
+            drifts = self.__mean_incr_batch(total_n, total_c, n_min, c_min, self.drift_confidence)
+            warnings = ~drifts & self.__mean_incr_batch(total_n, total_c, n_min, c_min, self.warning_confidence)
+            resets = drifts.copy()
+            if self.test_type == 'two-sided':
+                resets |= self.__mean_decr_batch(total_n, total_c, n_max, c_max)
+
+            resets = numpy.flatnonzero(resets)
+            last = int(resets[0]) if len(resets) != 0 else len(total_n) - 1
+            warning_indexes += (numpy.flatnonzero(warnings[:last + 1]) + start).tolist()
+            if len(resets) != 0:
+                if drifts[last]:
+                    drift_indexes.append(last + start)
+                self.n_min = self.n_max = self.total_n = 0
+                self.c_min = self.c_max = self.total_c = 0
+            else:
+                self.total_n, self.total_c = int(total_n[last]), int(total_c[last])
+                self.n_min, self.c_min = int(n_min[last]), int(c_min[last])
+                self.n_max, self.c_max = int(n_max[last]), int(c_max[last])
+            start += last + 1
+        return warning_indexes, drift_indexes
+
+    @staticmethod
+    def __get_extremes(total_n, total_c, bounds, n_extreme, c_extreme, log_drift_confidence, extreme, sign):
+        # THE STATS OF n_min (n_max) ARE THOSE OF THE LATEST STEP WHOSE BOUND IS THE LOWEST (HIGHEST) SO FAR,
+        # STARTING FROM THE STEP OF THE CURRENT n_min (n_max), IF THERE IS ANY
+        offset = 0
+        if n_extreme != 0:
+            bound = c_extreme / n_extreme + sign * math.sqrt((1.0 / (2 * n_extreme)) * log_drift_confidence)
+            total_n = numpy.concatenate(([n_extreme], total_n))
+            total_c = numpy.concatenate(([c_extreme], total_c))
+            bounds = numpy.concatenate(([bound], bounds))
+            offset = 1
+        steps = numpy.where(bounds == extreme.accumulate(bounds), numpy.arange(len(bounds)), 0)
+        steps = numpy.maximum.accumulate(steps)[offset:]
+        return total_n[steps], total_c[steps]
+
+    @staticmethod
+    def __mean_incr_batch(total_n, total_c, n_min, c_min, confidence_level):
+        m = (total_n - n_min) / n_min * (1.0 / total_n)
+        cota = numpy.sqrt((m / 2) * math.log(2.0 / confidence_level, math.e))
+        return (n_min != total_n) & (total_c / total_n - c_min / n_min >= cota)
+
+    def __mean_decr_batch(self, total_n, total_c, n_max, c_max):
+        m = (total_n - n_max) / n_max * (1.0 / total_n)
+        cota = numpy.sqrt((m / 2) * math.log(2.0 / self.drift_confidence, math.e))
+        return (n_max != total_n) & (c_max / n_max - total_c / total_n >= cota)
+
     def mean_incr(self, confidence_level):
         if self.n_min == self.total_n:
             return False
@@ -112,3 +178,93 @@ class HDDM_A_test(SuperDetector):
         return [str(self.drift_confidence) + "." + str(self.warning_confidence) + "." + str(self.test_type),
                 "$\delta_d$:" + str(self.drift_confidence).upper() + ", " +
                 "$\delta_w$:" + str(self.warning_confidence).upper()]
+
+
+class HDDM_A_test_Bank(SuperDetectorBank):
+    """A bank of HDDM.A.test detectors, whose statistics are the same as those of HDDM_A_test, for each of
+    the detectors. As in HDDM_A_test, a detector resets its own stats once it faces a drift."""
+
+    DETECTOR_NAME = TornadoDic.HDDM_A_test
+
+    def __init__(self, num_detectors, drift_confidence=0.001, warning_confidence=0.005, test_type='two-sided'):
+
+        super().__init__(num_detectors)
+
+        self.drift_confidence = drift_confidence
+        self.warning_confidence = warning_confidence
+        self.test_type = test_type
+
+        self.n_min = numpy.zeros(num_detectors, dtype=numpy.int64)
+        self.c_min = numpy.zeros(num_detectors, dtype=numpy.int64)
+        self.total_n = numpy.zeros(num_detectors, dtype=numpy.int64)
+        self.total_c = numpy.zeros(num_detectors, dtype=numpy.int64)
+        self.n_max = numpy.zeros(num_detectors, dtype=numpy.int64)
+        self.c_max = numpy.zeros(num_detectors, dtype=numpy.int64)
+
+    def run(self, outcomes):
+
+        pr = (~outcomes).astype(numpy.int64)
+
+        # 1. UPDATING STATS
+        self.total_n += 1
+        self.total_c += pr
+
+        empty = self.n_min == 0
+        self.n_min[empty] = self.total_n[empty]
+        self.c_min[empty] = self.total_c[empty]
+
+        empty = self.n_max == 0
+        self.n_max[empty] = self.total_n[empty]
+        self.c_max[empty] = self.total_c[empty]
+
+        log_drift_confidence = math.log(1.0 / self.drift_confidence, math.e)
+        cota = numpy.sqrt((1.0 / (2 * self.n_min)) * log_drift_confidence)
+        cota1 = numpy.sqrt((1.0 / (2 * self.total_n)) * log_drift_confidence)
+        minimum = self.c_min / self.n_min + cota >= self.total_c / self.total_n + cota1
+        self.c_min[minimum] = self.total_c[minimum]
+        self.n_min[minimum] = self.total_n[minimum]
+
+        cota = numpy.sqrt((1.0 / (2 * self.n_max)) * log_drift_confidence)
+        maximum = self.c_max / self.n_max - cota <= self.total_c / self.total_n - cota1
+        self.c_max[maximum] = self.total_c[maximum]
+        self.n_max[maximum] = self.total_n[maximum]
+
+        drifts = self.mean_incr(self.drift_confidence)
+        warnings = ~drifts & self.mean_incr(self.warning_confidence)
+        self.reset_stats(drifts)
+
+        # 2. UPDATING WARNING AND DRIFT STATUSES
+        if self.test_type == 'two-sided':
+            self.reset_stats(self.mean_decr())
+
+        return warnings, drifts
+
+    def mean_incr(self, confidence_level):
+        # THE DETECTORS WHOSE n_min IS EQUAL TO total_n ARE MASKED OUT, AS THEIR STATS ARE NOT DEFINED
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            m = (self.total_n - self.n_min) / self.n_min * (1.0 / self.total_n)
+            cota = numpy.sqrt((m / 2) * math.log(2.0 / confidence_level, math.e))
+            return (self.n_min != self.total_n) & (self.total_c / self.total_n - self.c_min / self.n_min >= cota)
+
+    def mean_decr(self):
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            m = (self.total_n - self.n_max) / self.n_max * (1.0 / self.total_n)
+            cota = numpy.sqrt((m / 2) * math.log(2.0 / self.drift_confidence, math.e))
+            return (self.n_max != self.total_n) & (self.c_max / self.n_max - self.total_c / self.total_n >= cota)
+
+    def reset_stats(self, mask):
+        self.n_min[mask] = 0
+        self.c_min[mask] = 0
+        self.total_n[mask] = 0
+        self.total_c[mask] = 0
+        self.n_max[mask] = 0
+        self.c_max[mask] = 0
+
+    def reset(self, mask=None):
+        super().reset(mask)
+        self.reset_stats(self.get_mask(mask))
+
+    def get_settings(self):
+        return [str(self.drift_confidence) + "." + str(self.warning_confidence) + "." + str(self.test_type),
+                "$\delta_d$:" + str(self.drift_confidence).upper() + ", " +
+                "$\delta_w$:" + str(self.warning_confidence).upper()]
@@ -15,6 +15,7 @@ import sys
 
 from dictionary.tornado_dictionary import TornadoDic
 from drift_detection.detector import SuperDetector
+from evaluators.memory_evaluator import MemoryEvaluator
 
 
 class SampleInfo:
@@ -128,6 +129,11 @@ class HDDM_W_test(SuperDetector):
     def monitor_mean_decr(self, confidence_level):
         return self.detect_mean_increment(self.sample2_decr_monitoring, self.sample1_decr_monitoring, confidence_level)
 
+    def memory_footprint(self):
+        samples = [self.total, self.sample1_decr_monitoring, self.sample1_incr_monitoring,
+                   self.sample2_decr_monitoring, self.sample2_incr_monitoring]
+        return super().memory_footprint() + sum(MemoryEvaluator.get_shallow_size(s) for s in samples)
+
     def reset_parameters(self):
         self.total = SampleInfo()
         self.sample1_decr_monitoring = SampleInfo()
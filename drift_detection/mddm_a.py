@@ -12,6 +12,8 @@ URL: https://arxiv.org/abs/1710.02030
 
 import math
 
+import numpy
+
 from dictionary.tornado_dictionary import TornadoDic
 from drift_detection.detector import SuperDetector
 
@@ -21,11 +23,16 @@ class MDDM_A(SuperDetector):
 
     DETECTOR_NAME = TornadoDic.MDDM_A
 
-    def __init__(self, n=100, difference=0.01, delta=0.000001):
+    def __init__(self, n=100, difference=0.01, delta=0.000001, outcome_window=None):
 
         super().__init__()
 
-        self.win = []
+        # WITH A SHARED OUTCOME WINDOW, ONLY THE WEIGHTED SUM AND THE LENGTH OF THE WINDOW ARE KEPT HERE
+        self.OUTCOME_WINDOW = outcome_window
+        self.win = [0] * n if outcome_window is None else None
+        self.time = outcome_window.subscribe(n) if outcome_window is not None else 0
+        self.win_index = 0
+        self.win_length = 0
         self.n = n
         self.difference = difference
         self.delta = delta
@@ -33,26 +40,92 @@ class MDDM_A(SuperDetector):
         self.e = math.sqrt(0.5 * self.cal_sigma() * (math.log(1 / self.delta, math.e)))
         self.u_max = 0
 
+        # THE WEIGHTED MEAN IS KEPT WITH THE NUMBER OF ONES AND THE SUM OF THEIR POSITIONS IN THE WINDOW, I.E. THE
+        # WEIGHTED SUM IS win_sum + difference * win_positions_sum; WHEN THE WINDOW SLIDES EVERY POSITION DROPS BY ONE
+        self.total_sum = self.cal_total_sum()
+        self.win_sum = 0
+        self.win_positions_sum = 0
+
         self.DETECTOR_NAME += "." + str(n)
 
     def run(self, pr):
 
         drift_status = False
 
-        if len(self.win) == self.n:
-            self.win.pop(0)
-        self.win.append(pr)
-
-        if len(self.win) == self.n:
-            u = self.cal_w_sigma()
+        if self.OUTCOME_WINDOW is not None:
+            self.time = self.OUTCOME_WINDOW.add(pr, self.time)
+
+        if self.win_length == self.n:
+            # THE OLDEST ELEMENT IS AT THE CURRENT INDEX OF THE RING BUFFER, OR n STEPS OLD IN THE SHARED ONE
+            oldest = self.win[self.win_index] if self.OUTCOME_WINDOW is None else self.OUTCOME_WINDOW.get(self.n)
+            self.win_sum -= oldest
+            self.win_positions_sum -= self.win_sum
+        else:
+            self.win_length += 1
+        if self.OUTCOME_WINDOW is None:
+            self.win[self.win_index] = pr
+            self.win_index = (self.win_index + 1) % self.n
+        self.win_sum += pr
+        self.win_positions_sum += (self.win_length - 1) * pr
+
+        if self.win_length == self.n:
+            u = (self.win_sum + self.difference * self.win_positions_sum) / self.total_sum
             self.u_max = u if u > self.u_max else self.u_max
             drift_status = True if (self.u_max - u > self.e) else False
 
         return False, drift_status
 
+    def run_batch(self, outcomes, reset_on_drift=True):
+        # A DETECTOR WITH AN OUTCOME WINDOW, OF WHICH IT IS THE ONLY SUBSCRIBER, ADDS THE OUTCOMES TO IT ONE BY ONE
+        if self.OUTCOME_WINDOW is not None:
+            return super().run_batch(outcomes, reset_on_drift)
+
+        outcomes = outcomes.astype(numpy.int64)
+        drift_indexes = []
+        start = 0
+        while start < len(outcomes):
+            # THE CURRENT WINDOW IS PUT BEFORE THE OUTCOMES, SO THAT THE FIRST WINDOWS OF THE BATCH ARE COMPLETE
+            win = self.get_window()
+            seq = numpy.concatenate((numpy.array(win, dtype=numpy.int64), outcomes[start:]))
+            ones = numpy.concatenate(([0], numpy.cumsum(seq)))
+            positions = numpy.concatenate(([0], numpy.cumsum(seq * numpy.arange(0, len(seq)))))
+            ends = numpy.arange(max(len(win), self.n - 1), len(seq))
+            win_sum = ones[ends + 1] - ones[ends + 1 - self.n]
+            win_positions_sum = positions[ends + 1] - positions[ends + 1 - self.n] - (ends + 1 - self.n) * win_sum
+            u = (win_sum + self.difference * win_positions_sum) / self.total_sum
+            u_max = numpy.maximum.accumulate(numpy.maximum(u, self.u_max))
+            drifts = numpy.flatnonzero(u_max - u > self.e)
+            if len(drifts) == 0 or not reset_on_drift:
+                drift_indexes += (ends[drifts] - len(win) + start).tolist()
+                self.set_window(seq[max(0, len(seq) - self.n):].tolist())
+                if len(u_max) != 0:
+                    self.u_max = float(u_max[-1])
+                break
+            index = int(ends[drifts[0]]) - len(win) + start
+            drift_indexes.append(index)
+            self.reset()
+            start = index + 1
+        return [], drift_indexes
+
+    def get_window(self):
+        if self.win_length < self.n:
+            return self.win[:self.win_length]
+        return self.win[self.win_index:] + self.win[:self.win_index]
+
+    def set_window(self, win):
+        self.win = win + [0] * (self.n - len(win))
+        self.win_index = len(win) % self.n
+        self.win_length = len(win)
+        self.win_sum = sum(win)
+        self.win_positions_sum = sum(i * x for i, x in enumerate(win))
+
     def reset(self):
         super().reset()
-        self.win.clear()
+        self.win = [0] * self.n if self.OUTCOME_WINDOW is None else None
+        self.win_index = 0
+        self.win_length = 0
+        self.win_sum = 0
+        self.win_positions_sum = 0
         self.u_max = 0
 
     def cal_sigma(self):
@@ -63,12 +136,21 @@ class MDDM_A(SuperDetector):
             sigma += math.pow((1 + i * self.difference) / sum_, 2)
         return sigma
 
-    def cal_w_sigma(self):
-        total_sum, win_sum = 0, 0
+    def cal_total_sum(self):
+        total_sum = 0
         for i in range(self.n):
             total_sum += 1 + i * self.difference
-            win_sum += self.win[i] * (1 + i * self.difference)
-        return win_sum / total_sum
+        return total_sum
+
+    def cal_w_sigma(self):
+        """Calculates the weighted mean of the window from scratch."""
+        win_sum = 0
+        for i in range(self.n):
+            if self.OUTCOME_WINDOW is None:
+                win_sum += self.win[(self.win_index + i) % self.n] * (1 + i * self.difference)
+            else:
+                win_sum += self.OUTCOME_WINDOW.get(self.n - 1 - i) * (1 + i * self.difference)
+        return win_sum / self.total_sum
 
     def get_settings(self):
         settings = [str(self.n) + "." + str(self.delta),
@@ -14,6 +14,7 @@ import math
 
 from dictionary.tornado_dictionary import TornadoDic
 from drift_detection.detector import SuperDetector
+from evaluators.memory_evaluator import MemoryEvaluator
 
 
 class MDDM_E(SuperDetector):
@@ -21,38 +22,73 @@ class MDDM_E(SuperDetector):
 
     DETECTOR_NAME = TornadoDic.MDDM_E
 
-    def __init__(self, n=100, lambda_=0.01, delta=0.000001):
+    def __init__(self, n=100, lambda_=0.01, delta=0.000001, outcome_window=None):
 
         super().__init__()
 
-        self.win = []
+        # WITH A SHARED OUTCOME WINDOW, ONLY THE WEIGHTED SUM AND THE LENGTH OF THE WINDOW ARE KEPT HERE
+        self.OUTCOME_WINDOW = outcome_window
+        self.win = [0] * n if outcome_window is None else None
+        self.time = outcome_window.subscribe(n) if outcome_window is not None else 0
+        self.win_index = 0
+        self.win_length = 0
         self.n = n
         self.lambda_ = lambda_
         self.delta = delta
+        self.weights_ratio = math.pow(math.e, self.lambda_)
 
         self.e = math.sqrt(0.5 * self.cal_sigma() * (math.log(1 / self.delta, math.e)))
         self.u_max = 0
 
+        # THE WEIGHTS GROW GEOMETRICALLY, SO WHEN THE WINDOW SLIDES, THE WEIGHTED SUM OF THE REMAINING ELEMENTS IS
+        # DIVIDED BY THE RATIO; IT IS RECALCULATED FROM SCRATCH EVERY n ELEMENTS TO DROP ACCUMULATED ROUNDING ERRORS
+        self.weights = self.cal_weights()
+        self.total_sum = sum(self.weights)
+        self.win_sum = 0
+        self.num_updates = 0
+
         self.DETECTOR_NAME += "." + str(n)
 
     def run(self, pr):
 
         drift_status = False
 
-        if len(self.win) == self.n:
-            self.win.pop(0)
-        self.win.append(pr)
-
-        if len(self.win) == self.n:
-            u = self.cal_w_sigma()
+        if self.OUTCOME_WINDOW is not None:
+            self.time = self.OUTCOME_WINDOW.add(pr, self.time)
+
+        if self.win_length == self.n:
+            # THE OLDEST ELEMENT IS AT THE CURRENT INDEX OF THE RING BUFFER, OR n STEPS OLD IN THE SHARED ONE
+            oldest = self.win[self.win_index] if self.OUTCOME_WINDOW is None else self.OUTCOME_WINDOW.get(self.n)
+            self.win_sum = (self.win_sum - oldest * self.weights[0]) / self.weights_ratio
+        else:
+            self.win_length += 1
+        if self.OUTCOME_WINDOW is None:
+            self.win[self.win_index] = pr
+            self.win_index = (self.win_index + 1) % self.n
+        self.win_sum += pr * self.weights[self.win_length - 1]
+
+        self.num_updates += 1
+        if self.num_updates == self.n:
+            self.num_updates = 0
+            self.win_sum = self.cal_win_sum()
+
+        if self.win_length == self.n:
+            u = self.win_sum / self.total_sum
             self.u_max = u if u > self.u_max else self.u_max
             drift_status = True if (self.u_max - u > self.e) else False
 
         return False, drift_status
 
+    def memory_footprint(self):
+        return super().memory_footprint() + MemoryEvaluator.get_numbers_size(len(self.weights))
+
     def reset(self):
         super().reset()
-        self.win.clear()
+        self.win = [0] * self.n if self.OUTCOME_WINDOW is None else None
+        self.win_index = 0
+        self.win_length = 0
+        self.win_sum = 0
+        self.num_updates = 0
         self.u_max = 0
 
     def cal_sigma(self):
@@ -66,13 +102,25 @@ class MDDM_E(SuperDetector):
             r *= ratio
         return bound_sum
 
-    def cal_w_sigma(self):
-        total_sum, win_sum, r, ratio = 0, 0, 1, math.pow(math.e, self.lambda_)
+    def cal_weights(self):
+        weights, r = [], 1
         for i in range(self.n):
-            total_sum += r
-            win_sum += self.win[i] * r
-            r *= ratio
-        return win_sum / total_sum
+            weights.append(r)
+            r *= self.weights_ratio
+        return weights
+
+    def cal_win_sum(self):
+        """Calculates the weighted sum of the window from scratch."""
+        win_sum = 0
+        for i in range(0, self.win_length):
+            if self.OUTCOME_WINDOW is None:
+                win_sum += self.win[(self.win_index - self.win_length + i) % self.n] * self.weights[i]
+            else:
+                win_sum += self.OUTCOME_WINDOW.get(self.win_length - 1 - i) * self.weights[i]
+        return win_sum
+
+    def cal_w_sigma(self):
+        return self.cal_win_sum() / self.total_sum
 
     def get_settings(self):
         settings = [str(self.n) + "." + str(self.delta),
@@ -16,6 +16,7 @@ import sys
 
 from dictionary.tornado_dictionary import TornadoDic
 from drift_detection.detector import SuperDetector
+from evaluators.memory_evaluator import MemoryEvaluator
 
 
 class SeqDrift2ChangeDetector(SuperDetector):
@@ -33,6 +34,9 @@ class SeqDrift2ChangeDetector(SuperDetector):
         drift_status = self.seq_drift2.setInput(pr)
         return False, drift_status
 
+    def memory_footprint(self):
+        return super().memory_footprint() + self.seq_drift2.memory_footprint()
+
     def reset(self):
         super().reset()
         self.seq_drift2 = SeqDrift2(self.DELTA, self.BLOCK_SIZE)
@@ -67,6 +71,10 @@ class SeqDrift2:
         self.rightRepository = Reservoir(self.leftReservoirSize, self.blockSize)
         self.leftReservoir = Reservoir(self.rightRepositorySize, self.blockSize)
 
+    def memory_footprint(self):
+        return MemoryEvaluator.get_shallow_size(self) + \
+            self.rightRepository.memory_footprint() + self.leftReservoir.memory_footprint()
+
     def setInput(self, _inputValue):
         self.instanceCount += 1
         self.addToRightReservoir(_inputValue)
@@ -197,6 +205,9 @@ class Reservoir:
         self.instanceCount = 0
         self.MAX_SIZE = _iSize
 
+    def memory_footprint(self):
+        return MemoryEvaluator.get_shallow_size(self) + self.dataContainer.memory_footprint()
+
     def getSampleMean(self):
         return self.total / self.size
 
@@ -248,6 +259,14 @@ class Repository:
         self.instanceCount = 0
         self.total = 0
 
+    def memory_footprint(self):
+        # ALL THE BLOCKS ARE OF THE SAME LENGTH
+        block_size = 0
+        if len(self.blocks) != 0:
+            block_size = MemoryEvaluator.get_shallow_size(self.blocks[0]) + \
+                MemoryEvaluator.get_numbers_size(len(self.blocks[0].data))
+        return MemoryEvaluator.get_shallow_size(self) + len(self.blocks) * block_size
+
     def add(self, _dValue, _isTested):
         if self.instanceCount % self.blockSize == 0:
             self.blocks.append(Block(self.blockSize, _isTested))
@@ -7,11 +7,13 @@ E-mail: apesaran -at- uottawa -dot- ca / alipsgh -at- gmail -dot- com
 
 import math
 
+from data_structures.confusion_matrix import ConfusionMatrix
 from dictionary.tornado_dictionary import TornadoDic
 
 
 class PredictionEvaluator:
-    """This class is used to evaluate a classifier."""
+    """This class is used to evaluate a classifier. A confusion matrix is either a ConfusionMatrix,
+    whose measures are read from its array and running totals, or nested dictionaries of counts."""
 
     @staticmethod
     def calculate(measure, confusion_matrix, theta=0.000001):
@@ -32,6 +34,8 @@ class PredictionEvaluator:
 
     @staticmethod
     def print_confusion_matrix(confusion_matrix):
+        if isinstance(confusion_matrix, ConfusionMatrix):
+            confusion_matrix = confusion_matrix.to_dict()
         for k1, v1 in confusion_matrix.items():
             for k2, v2 in confusion_matrix[k1].items():
                 print(confusion_matrix[k1][k2], end="\t")
@@ -39,6 +43,8 @@ class PredictionEvaluator:
 
     @staticmethod
     def calculate_accuracy(confusion_matrix):
+        if isinstance(confusion_matrix, ConfusionMatrix):
+            return confusion_matrix.get_accuracy()
         total_sum = 0
         diagonal_sum = 0
         for k1, v1 in confusion_matrix.items():
@@ -51,11 +57,15 @@ class PredictionEvaluator:
 
     @staticmethod
     def calculate_error_rate(confusion_matrix):
+        if isinstance(confusion_matrix, ConfusionMatrix):
+            return confusion_matrix.get_error_rate()
         error_rate = 1 - PredictionEvaluator.calculate_accuracy(confusion_matrix)
         return error_rate
 
     @staticmethod
     def calculate_precision(confusion_matrix, theta):
+        if isinstance(confusion_matrix, ConfusionMatrix):
+            return confusion_matrix.get_precision(theta)
         precisions = []
         for k1, v1 in confusion_matrix.items():
             true_positive = 0
@@ -74,6 +84,8 @@ class PredictionEvaluator:
 
     @staticmethod
     def calculate_recall(confusion_matrix, theta):
+        if isinstance(confusion_matrix, ConfusionMatrix):
+            return confusion_matrix.get_recall(theta)
         recalls = []
         for k1, v1 in confusion_matrix.items():
             true_positive = 0
@@ -92,6 +104,8 @@ class PredictionEvaluator:
 
     @staticmethod
     def calculate_specificity(confusion_matrix, theta):
+        if isinstance(confusion_matrix, ConfusionMatrix):
+            return confusion_matrix.get_specificity(theta)
         true_negatives = []
         false_positives = []
         specificities = []
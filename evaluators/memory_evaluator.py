@@ -0,0 +1,36 @@
+"""
+The Tornado Framework
+By Ali Pesaranghader
+University of Ottawa, Ontario, Canada
+E-mail: apesaran -at- uottawa -dot- ca / alipsgh -at- gmail -dot- com
+"""
+
+import sys
+
+
+class MemoryEvaluator:
+    """This class is used to measure the memory usages of classifiers and detectors, in bytes. By default,
+    a classifier or a detector reports its own footprint, which is estimated from the sizes of its tables,
+    nodes and windows. Optionally, the memory usage is measured by pympler, which walks the whole object graph;
+    it is much slower, and is meant for validating the footprints."""
+
+    NUMBER_SIZE = sys.getsizeof(0.0)
+
+    @staticmethod
+    def calculate(obj, use_asizeof=False):
+        if use_asizeof:
+            from pympler import asizeof
+            return asizeof.asizeof(obj, limit=20)
+        return obj.memory_footprint()
+
+    @staticmethod
+    def get_shallow_size(obj):
+        """Returns the size of an object together with the sizes of its attributes, without following
+        the items of containers; for lists this is their array of references, and for arrays their data."""
+        attributes = vars(obj)
+        return sys.getsizeof(obj) + sys.getsizeof(attributes) + sum(sys.getsizeof(v) for v in attributes.values())
+
+    @staticmethod
+    def get_numbers_size(n):
+        """Returns the size of n numbers held by containers, where each number is a separate object."""
+        return n * MemoryEvaluator.NUMBER_SIZE
@@ -6,17 +6,17 @@ E-mail: apesaran -at- uottawa -dot- ca / alipsgh -at- gmail -dot- com
 """
 
 
-from pympler import asizeof
-
 from dictionary.tornado_dictionary import TornadoDic
 from evaluators.classifier_evaluator import PredictionEvaluator
+from evaluators.memory_evaluator import MemoryEvaluator
 
 
 class LearnersScoreCalculator:
     """This class is used to calculate scores of (classifier, detector) pairs."""
 
     @staticmethod
-    def calculate_emr(learners, error_weight=1, memory_weight=1, runtime_weight=1, lb=1, ub=10):
+    def calculate_emr(learners, error_weight=1, memory_weight=1, runtime_weight=1, lb=1, ub=10,
+                       use_asizeof=False):
 
         learners_names = []
         learners_errors = []
@@ -29,7 +29,7 @@ class LearnersScoreCalculator:
             learners_errors.append(PredictionEvaluator.calculate(TornadoDic.ERROR_RATE, learner.get_confusion_matrix()))
             learners_runtime.append(learner.get_total_running_time())
             if memory_weight != -1:
-                learners_memory_usages.append(asizeof.asizeof(learner))
+                learners_memory_usages.append(MemoryEvaluator.calculate(learner, use_asizeof))
             else:
                 learners_memory_usages.append(0)
 
@@ -5,9 +5,13 @@ University of Ottawa, Ontario, Canada
 E-mail: apesaran -at- uottawa -dot- ca / alipsgh -at- gmail -dot- com
 """
 
+import copy
+import itertools
+import math
 import operator
 from collections import OrderedDict
 
+from data_structures.quantile_sketch import QuantileSketch
 from dictionary.tornado_dictionary import TornadoDic
 
 
@@ -80,3 +84,71 @@ class Discretizer:
                 x = v
                 break
         return x
+
+
+class OnlineDiscretizer:
+    """The single-pass discretizer. It keeps a quantile sketch for each numeric attribute over the first records
+    of a stream, i.e. the warm-up period, and then emits equal-frequency bins; so that the bounds of attributes
+    need not be known in advance. The first and the last bins are open, and the bins are in the same format as
+    the ones of the bin-based discretizer, so Discretizer.find_bin is used for both."""
+
+    def __init__(self, attributes, num_of_bins=10, warm_up=1000, sketch_capacity=200):
+        self.ATTRIBUTES = attributes
+        self.NUM_OF_BINS = num_of_bins
+        self.WARM_UP = warm_up
+        self.SKETCHES = [QuantileSketch(sketch_capacity) if a.TYPE == TornadoDic.NUMERIC_ATTRIBUTE else None
+                         for a in attributes]
+        self.NUMBER_OF_INSTANCES_OBSERVED = 0
+
+    def update(self, record):
+        self.NUMBER_OF_INSTANCES_OBSERVED += 1
+        for k, sketch in enumerate(self.SKETCHES):
+            if sketch is not None and record[k] != "?":
+                sketch.update(record[k])
+
+    def is_ready(self):
+        return self.NUMBER_OF_INSTANCES_OBSERVED >= self.WARM_UP
+
+    def get_scheme(self):
+        """Returns the attributes scheme, where numeric attributes are discretized by equal-frequency bins and
+        their bounds are the ones observed so far."""
+        numeric_attribute_scheme = []
+        nominal_attribute_scheme = []
+        for a, sketch in zip(self.ATTRIBUTES, self.SKETCHES):
+            if sketch is not None:
+                numeric_a = copy.copy(a)
+                numeric_a.set_bounds_values(sketch.MINIMUM_VALUE, sketch.MAXIMUM_VALUE)
+                numeric_attribute_scheme.append(numeric_a)
+                discretized_a = copy.copy(numeric_a)
+                self.bin_attribute(discretized_a, sketch)
+                nominal_attribute_scheme.append(discretized_a)
+            else:
+                nominal_attribute_scheme.append(copy.copy(a))
+                numeric_a = copy.copy(a)
+                NominalToNumericTransformer.convert_attribute_scheme(numeric_a)
+                numeric_attribute_scheme.append(numeric_a)
+        return {'numeric': numeric_attribute_scheme, 'nominal': nominal_attribute_scheme}
+
+    def bin_attribute(self, attribute, sketch):
+        fractions = [k / self.NUM_OF_BINS for k in range(1, self.NUM_OF_BINS)]
+        # REPEATED QUANTILES, E.G. OF DISCRETE ATTRIBUTES, WOULD MAKE EMPTY BINS
+        edges = sorted(set(round(q, 10) for q in sketch.get_quantiles(fractions) if q is not None))
+        edges = [-math.inf] + edges + [math.inf]
+        bins = []
+        for k in range(0, len(edges) - 1):
+            bins.append(str(edges[k]) + '..' + str(edges[k + 1]))
+        attribute.TYPE = TornadoDic.NOMINAL_ATTRIBUTE
+        attribute.set_possible_values(bins)
+
+    def warm_up(self, records):
+        """Observes the first records of a stream, and returns the attributes scheme together with all the records,
+        i.e. the observed ones followed by the rest of the stream."""
+        records = iter(records)
+        observed_records = []
+        for record in records:
+            observed_records.append(record)
+            self.update(record)
+            if self.is_ready():
+                break
+        return self.get_scheme(), itertools.chain(observed_records, records)
+
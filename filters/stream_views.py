@@ -0,0 +1,186 @@
+"""
+The Tornado Framework
+By Ali Pesaranghader
+University of Ottawa, Ontario, Canada
+E-mail: apesaran -at- uottawa -dot- ca / alipsgh -at- gmail -dot- com
+"""
+
+import os
+
+import numpy
+
+from data_structures.attribute_scheme import AttributeScheme
+from dictionary.tornado_dictionary import TornadoDic
+from streams.readers.arff_cache import ARFFCache
+
+
+class StreamViews:
+    """This class transforms a whole data stream at once, instead of record by record. The numeric values are
+    discretized by searching the upper bounds of the bins, and the values of all attributes are normalized,
+    in one vectorized pass each. Then the prequential tasks only pick the transformed records from the views."""
+
+    @staticmethod
+    def read(file_path, cache_dir=None, batch_size=1000):
+        """Returns the labels, the attributes, the attributes scheme, and the viewed records of a .arff file.
+        The views are cached next to the binary columnar cache of the file, and are rebuilt if the scheme changes."""
+        labels, attributes, stream = ARFFCache.read(file_path, cache_dir, batch_size)
+        attributes_scheme = AttributeScheme.get_scheme(attributes)
+
+        views_path = ARFFCache.get_cache_path(file_path, cache_dir) + ".views.npz"
+        views = None
+        if os.path.exists(views_path):
+            views = StreamViews.load(views_path, attributes, attributes_scheme)
+        if views is None:
+            views = StreamViews.build(stream, labels, attributes, attributes_scheme)
+            StreamViews.save(views_path, views)
+
+        return labels, attributes, attributes_scheme, ViewedStream(stream, labels, attributes_scheme, *views)
+
+    @staticmethod
+    def build(records, labels, attributes, attributes_scheme):
+        """Returns the raw values, the bin codes, the normalized values, and the class codes of the records."""
+        num_attributes = len(attributes)
+        classes_codes = {c: i for i, c in enumerate(labels)}
+
+        columns = [[] for _ in range(0, num_attributes)]
+        classes = []
+        missing = []
+        value_codes = [StreamViews.__get_value_codes(a) for a in attributes]
+        for record in records:
+            missing.append(record.__contains__("?"))
+            for k in range(0, num_attributes):
+                v = record[k]
+                if v == "?":
+                    columns[k].append(numpy.nan)
+                elif value_codes[k] is None:
+                    columns[k].append(v)
+                else:
+                    columns[k].append(value_codes[k][v])
+            classes.append(-1 if record[num_attributes] == "?" else classes_codes[record[num_attributes]])
+
+        raw = numpy.array(columns, dtype=float).T.reshape(len(classes), num_attributes)
+        return StreamViews.transform(raw, attributes, attributes_scheme) + \
+            (numpy.array(classes, dtype=numpy.int64), numpy.array(missing, dtype=bool))
+
+    @staticmethod
+    def transform(raw, attributes, attributes_scheme):
+        """Discretizes and normalizes the raw values, where nominal values are given by their numeric codes."""
+        nominal = numpy.empty(raw.shape, dtype=numpy.int64)
+        for k, attribute in enumerate(attributes):
+            if attribute.TYPE == TornadoDic.NUMERIC_ATTRIBUTE:
+                # THE FIRST BIN WHOSE UPPER BOUND IS NOT LESS THAN THE VALUE, AS Discretizer.find_bin DOES;
+                # VALUES BEYOND THE LAST BIN ARE KEPT AS THEY ARE, WHICH IS MARKED BY -1
+                edges = StreamViews.get_bins_upper_bounds(attributes_scheme['nominal'][k])
+                codes = numpy.searchsorted(edges, raw[:, k], side="left")
+                codes[codes == len(edges)] = -1
+                nominal[:, k] = codes
+            else:
+                nominal[:, k] = numpy.nan_to_num(raw[:, k], nan=0) - 1
+
+        minimums, maximums = StreamViews.get_bounds(attributes_scheme)
+        numeric = (raw - minimums) / (maximums - minimums)
+
+        return raw, nominal, numeric
+
+    @staticmethod
+    def get_bins_upper_bounds(attribute):
+        return numpy.array([float(v.split("..")[1]) for v in attribute.POSSIBLE_VALUES])
+
+    @staticmethod
+    def get_bounds(attributes_scheme):
+        minimums = numpy.array([a.MINIMUM_VALUE for a in attributes_scheme['numeric']], dtype=float)
+        maximums = numpy.array([a.MAXIMUM_VALUE for a in attributes_scheme['numeric']], dtype=float)
+        return minimums, maximums
+
+    @staticmethod
+    def save(views_path, views):
+        raw, nominal, numeric, classes, missing = views
+        os.makedirs(os.path.dirname(views_path), exist_ok=True)
+        # THE FILE IS WRITTEN UNDER A TEMPORARY NAME FIRST, SO READERS NEVER SEE A HALF-WRITTEN FILE
+        temp_path = views_path + "." + str(os.getpid()) + ".tmp.npz"
+        numpy.savez(temp_path, raw=raw, nominal=nominal, numeric=numeric, classes=classes, missing=missing)
+        os.replace(temp_path, views_path)
+
+    @staticmethod
+    def load(views_path, attributes, attributes_scheme):
+        """Returns the cached views, or None if they were built with another attributes scheme."""
+        with numpy.load(views_path) as views:
+            raw, nominal, numeric = views["raw"], views["nominal"], views["numeric"]
+            classes, missing = views["classes"], views["missing"]
+        # THE VIEWS ARE CHECKED AGAINST THE SCHEME BY TRANSFORMING THEIR FIRST RECORDS AGAIN
+        _, expected_nominal, expected_numeric = StreamViews.transform(raw[:100], attributes, attributes_scheme)
+        if not numpy.array_equal(expected_nominal, nominal[:100]) or \
+                not numpy.array_equal(expected_numeric, numeric[:100], equal_nan=True):
+            return None
+        return raw, nominal, numeric, classes, missing
+
+    @staticmethod
+    def __get_value_codes(attribute):
+        # NOMINAL VALUES ARE CODED AS NominalToNumericTransformer DOES, I.E. FROM 1
+        if attribute.TYPE == TornadoDic.NUMERIC_ATTRIBUTE:
+            return None
+        return {v: i + 1 for i, v in enumerate(attribute.POSSIBLE_VALUES)}
+
+
+class ViewedStream:
+    """This class is a data stream together with its precomputed views. Iterating over it yields the records
+    as they are, while get_transformed_records returns the records as a learner of a category expects them."""
+
+    BLOCK_SIZE = 1000
+
+    def __init__(self, records, labels, attributes_scheme, raw, nominal, numeric, classes, missing):
+        self.RECORDS = records
+        self.CLASSES = labels
+        self.RAW = raw
+        self.NOMINAL = nominal
+        self.NUMERIC = numeric
+        self.CLASSES_CODES = classes
+        self.MISSING = missing
+
+        # FOR EACH ATTRIBUTE, THE NOMINAL VALUES ARE LOOKED UP BY THEIR CODES
+        self.__LOOKUPS = [list(a.POSSIBLE_VALUES) for a in attributes_scheme['nominal']]
+        self.__BLOCKS = {}
+
+    def __len__(self):
+        return len(self.CLASSES_CODES)
+
+    def __iter__(self):
+        return iter(self.RECORDS)
+
+    def get_transformed_records(self, start, end, category):
+        """Returns the records from start to end, transformed for a learner category. Records with missing values
+        are left as None, since they are skipped."""
+        if category == TornadoDic.NOM_CLASSIFIER:
+            columns = []
+            for k, lookup in enumerate(self.__LOOKUPS):
+                raw_values = self.RAW[start:end, k].tolist()
+                columns.append([raw_values[i] if c == -1 else lookup[c]
+                                for i, c in enumerate(self.NOMINAL[start:end, k].tolist())])
+            rows = zip(*columns) if len(columns) != 0 else [()] * (end - start)
+        elif category == TornadoDic.NUM_CLASSIFIER:
+            rows = self.NUMERIC[start:end].tolist()
+        else:
+            rows = None
+
+        records = []
+        classes = self.CLASSES_CODES[start:end].tolist()
+        missing = self.MISSING[start:end].tolist()
+        if rows is None:
+            records = [None if m else list(r) for m, r in zip(missing, self.__get_records(start, end))]
+            return records
+        for row, c, m in zip(rows, classes, missing):
+            records.append(None if m else list(row) + [self.CLASSES[c]])
+        return records
+
+    def get_transformed_record(self, index, category):
+        # THE RECORDS ARE TRANSFORMED BLOCK BY BLOCK, AS THE TASKS ASK FOR THEM ONE BY ONE
+        start, records = self.__BLOCKS.get(category, (0, []))
+        if not start <= index < start + len(records):
+            start, records = index, self.get_transformed_records(index, min(index + self.BLOCK_SIZE, len(self)), category)
+            self.__BLOCKS[category] = (start, records)
+        return records[index - start]
+
+    def __get_records(self, start, end):
+        if hasattr(self.RECORDS, "get_records"):
+            return self.RECORDS.get_records(start, end)
+        return self.RECORDS[start:end]
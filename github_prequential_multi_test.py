@@ -18,7 +18,13 @@ project = Project("projects/multi", "sine1")
 
 # 2. Loading an arff file
 labels, attributes, stream_records = ARFFReader.read("data_streams/sine1_w_50_n_0.1/sine1_w_50_n_0.1_101.arff")
+# Parsed streams may also be cached in a binary format, which later runs reload without parsing:
+# from streams.readers.arff_cache import ARFFCache
+# labels, attributes, stream_records = ARFFCache.read("data_streams/sine1_w_50_n_0.1/sine1_w_50_n_0.1_101.arff")
 attributes_scheme = AttributeScheme.get_scheme(attributes)
+# Or, the records may be transformed for all learners at once, beforehand:
+# from filters.stream_views import StreamViews
+# labels, attributes, attributes_scheme, stream_records = StreamViews.read("data_streams/sine1_w_50_n_0.1/sine1_w_50_n_0.1_101.arff")
 
 # 3. Initializing a Classifier-Detector Pairs
 pairs = [[NaiveBayes(labels, attributes_scheme['nominal']), FHDDM()],
@@ -71,3 +77,21 @@ prequential = PrequentialMultiPairs(pairs, attributes, attributes_scheme,
                                     w_vec, project, color_set=colors, legend_param=False)
 
 prequential.run(stream_records, 1)
+
+# The pairs may be spread across several worker processes, e.g.
+# prequential.run(stream_records, 1, num_workers=4)
+
+# A long run may be checkpointed every k instances, and resumed from its last checkpoint after a crash, e.g.
+# prequential.run(stream_records, 1, checkpoint_interval=100000, resume=True)
+
+# The repetitions of several streams may be run in a pool of processes, where the pairs are built in each process:
+# from tasks.repeated_multi_pairs import RepeatedMultiPairs
+#
+# def create_pairs(labels, attributes_scheme):
+#     return [[NaiveBayes(labels, attributes_scheme['nominal']), FHDDM()],
+#             [NaiveBayes(labels, attributes_scheme['nominal']), DDM()]]
+#
+# streams_paths = ["data_streams/sine1_w_50_n_0.1/sine1_w_50_n_0.1_" + str(i) + ".arff" for i in range(101, 106)]
+# repeated = RepeatedMultiPairs(streams_paths, create_pairs, actual_drift_points, drift_acceptance_interval,
+#                               w_vec, "projects/repeated")
+# repeated.run(num_workers=5)
@@ -18,7 +18,15 @@ project = Project("projects/single", "sine1")
 
 # 2. Loading an arff file
 labels, attributes, stream_records = ARFFReader.read("data_streams/sine1_w_50_n_0.1/sine1_w_50_n_0.1_101.arff")
+# For large files, the records may be read lazily while the stream is processed:
+# labels, attributes, stream_records = ARFFReader.read_lazily("data_streams/sine1_w_50_n_0.1/sine1_w_50_n_0.1_101.arff")
 attributes_scheme = AttributeScheme.get_scheme(attributes)
+# Or, without scanning the file for the bounds of attributes, equal-frequency bins are learnt from its first records:
+# from filters.attribute_handlers import OnlineDiscretizer
+# from streams.readers.arff_reader import ARFFStream
+# labels, attributes = ARFFReader.read_header("data_streams/sine1_w_50_n_0.1/sine1_w_50_n_0.1_101.arff")
+# stream_records = ARFFStream("data_streams/sine1_w_50_n_0.1/sine1_w_50_n_0.1_101.arff", attributes)
+# attributes_scheme, stream_records = OnlineDiscretizer(attributes, warm_up=1000).warm_up(stream_records)
 
 # 3. Initializing a Learner
 learner = NaiveBayes(labels, attributes_scheme['nominal'])
@@ -37,3 +45,9 @@ prequential = PrequentialDriftEvaluator(learner, detector, attributes, attribute
 # prequential = Prequential(learner, attributes, attributes_scheme, project)
 
 prequential.run(stream_records, 1)
+
+# Or, the outcomes of the learner may be recorded once, and replayed through several detectors:
+# trace = PrequentialTraceRecorder(learner, attributes, attributes_scheme, project).run(stream_records, 1)
+# replay = DetectorsTraceReplay([FHDDM(), DDM(), ADWINChangeDetector()],
+#                               actual_drift_points, drift_acceptance_interval, project)
+# replay.run(trace)
@@ -0,0 +1,205 @@
+"""
+The Tornado Framework
+By Ali Pesaranghader
+University of Ottawa, Ontario, Canada
+E-mail: apesaran -at- uottawa -dot- ca / alipsgh -at- gmail -dot- com
+"""
+
+import hashlib
+import json
+import os
+import struct
+
+import numpy
+
+from data_structures.attribute import Attribute
+from dictionary.tornado_dictionary import TornadoDic
+from streams.readers.arff_reader import ARFFReader
+
+
+class ARFFCache:
+    """This class keeps parsed .arff files in a binary columnar format, so that repeated runs skip text parsing.
+    A cache file has a header, followed by one column per attribute: numeric columns are stored as float arrays,
+    and nominal columns, including the class, as small integer codes. Cache files are keyed by the hash of their
+    source files, and are reloaded by memory mapping so that several processes share the same pages."""
+
+    MAGIC = b"TRNDARFF"
+    ALIGNMENT = 8
+
+    @staticmethod
+    def read(file_path, cache_dir=None, batch_size=1000):
+        """Returns the labels, the attributes, and the records of a .arff file; the cache is built on first use."""
+        cache_path = ARFFCache.get_cache_path(file_path, cache_dir)
+        if not os.path.exists(cache_path):
+            ARFFCache.write(file_path, cache_path, batch_size)
+        return ARFFCache.load(cache_path, batch_size)
+
+    @staticmethod
+    def get_cache_path(file_path, cache_dir=None):
+        if cache_dir is None:
+            cache_dir = os.path.join(os.path.dirname(file_path), "__tornado_cache__")
+        return os.path.join(cache_dir, os.path.basename(file_path) + "." + ARFFCache.hash_file(file_path) + ".cache")
+
+    @staticmethod
+    def hash_file(file_path):
+        sha1 = hashlib.sha1()
+        with open(file_path, "rb") as reader:
+            for block in iter(lambda: reader.read(1 << 20), b""):
+                sha1.update(block)
+        return sha1.hexdigest()[:16]
+
+    @staticmethod
+    def write(file_path, cache_path, batch_size=1000):
+
+        labels, attributes, stream = ARFFReader.read_lazily(file_path, batch_size, use_bounds_file=False)
+        num_instances = len(stream)
+
+        # THE CLASS IS STORED AS THE LAST NOMINAL COLUMN
+        columns = []
+        offset = 0
+        for attribute in attributes + [None]:
+            if attribute is None:
+                column = {"name": "class", "type": TornadoDic.NOMINAL_ATTRIBUTE, "values": labels}
+            elif attribute.TYPE == TornadoDic.NUMERIC_ATTRIBUTE:
+                column = {"name": attribute.NAME, "type": attribute.TYPE,
+                          "min": attribute.MINIMUM_VALUE, "max": attribute.MAXIMUM_VALUE}
+            else:
+                column = {"name": attribute.NAME, "type": attribute.TYPE, "values": attribute.POSSIBLE_VALUES}
+            column["dtype"] = ARFFCache.__get_dtype(column)
+            column["offset"] = offset
+            offset += ARFFCache.__align(num_instances * numpy.dtype(column["dtype"]).itemsize)
+            columns.append(column)
+
+        header = json.dumps({"num_instances": num_instances, "columns": columns}).encode("utf-8")
+        data_start = ARFFCache.__align(len(ARFFCache.MAGIC) + 8 + len(header))
+
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        # THE CACHE FILE IS WRITTEN UNDER A TEMPORARY NAME FIRST, SO READERS NEVER SEE A HALF-WRITTEN FILE
+        temp_path = cache_path + "." + str(os.getpid()) + ".tmp"
+        with open(temp_path, "wb") as writer:
+            writer.write(ARFFCache.MAGIC)
+            writer.write(struct.pack("<Q", len(header)))
+            writer.write(header)
+            writer.truncate(data_start + offset)
+
+        if num_instances != 0:
+            arrays = ARFFCache.__map_columns(temp_path, columns, num_instances, data_start, "r+")
+            codes = []
+            for column in columns:
+                if column["type"] == TornadoDic.NOMINAL_ATTRIBUTE:
+                    code_map = {v: c for c, v in enumerate(column["values"])}
+                    code_map["?"] = numpy.iinfo(column["dtype"]).max
+                    codes.append(code_map)
+                else:
+                    codes.append(None)
+
+            start = 0
+            for batch in stream.batches():
+                end = start + len(batch)
+                for i in range(0, len(columns)):
+                    if codes[i] is None:
+                        arrays[i][start:end] = [numpy.nan if r[i] == "?" else r[i] for r in batch]
+                    else:
+                        arrays[i][start:end] = [codes[i][r[i]] for r in batch]
+                start = end
+
+            for array in arrays:
+                array.flush()
+            del arrays
+
+        os.replace(temp_path, cache_path)
+
+    @staticmethod
+    def load(cache_path, batch_size=1000):
+
+        with open(cache_path, "rb") as reader:
+            if reader.read(len(ARFFCache.MAGIC)) != ARFFCache.MAGIC:
+                raise ValueError('"' + cache_path + '" IS NOT A TORNADO CACHE FILE')
+            header_length = struct.unpack("<Q", reader.read(8))[0]
+            header = json.loads(reader.read(header_length).decode("utf-8"))
+        data_start = ARFFCache.__align(len(ARFFCache.MAGIC) + 8 + header_length)
+
+        num_instances = header["num_instances"]
+        columns = header["columns"]
+
+        attributes = []
+        for column in columns[:-1]:
+            attribute = Attribute()
+            attribute.set_name(column["name"])
+            attribute.set_type(column["type"])
+            if column["type"] == TornadoDic.NUMERIC_ATTRIBUTE:
+                attribute.set_possible_values([])
+                attribute.set_bounds_values(column["min"], column["max"])
+            else:
+                attribute.set_possible_values(column["values"])
+            attributes.append(attribute)
+        labels = columns[len(columns) - 1]["values"]
+
+        arrays = ARFFCache.__map_columns(cache_path, columns, num_instances, data_start, "r")
+
+        return labels, attributes, ColumnarStream(columns, arrays, num_instances, batch_size)
+
+    @staticmethod
+    def __map_columns(path, columns, num_instances, data_start, mode):
+        arrays = []
+        for column in columns:
+            if num_instances == 0:
+                arrays.append(numpy.empty(0, dtype=column["dtype"]))
+            else:
+                arrays.append(numpy.memmap(path, dtype=column["dtype"], mode=mode,
+                                           offset=data_start + column["offset"], shape=(num_instances,)))
+        return arrays
+
+    @staticmethod
+    def __get_dtype(column):
+        if column["type"] == TornadoDic.NUMERIC_ATTRIBUTE:
+            return "<f8"
+        # THE LARGEST CODE IS KEPT FOR MISSING VALUES
+        return "<u1" if len(column["values"]) < 255 else "<u2"
+
+    @staticmethod
+    def __align(n):
+        return (n + ARFFCache.ALIGNMENT - 1) // ARFFCache.ALIGNMENT * ARFFCache.ALIGNMENT
+
+
+class ColumnarStream:
+    """This class is a data stream backed by columns, e.g. memory-mapped columns of a cache file.
+    Iterating over it yields records in the same form as ARFFReader.read does."""
+
+    def __init__(self, columns, arrays, num_instances, batch_size=1000):
+        self.COLUMNS = columns
+        self.ARRAYS = arrays
+        self.NUM_INSTANCES = num_instances
+        self.BATCH_SIZE = batch_size
+
+        # FOR EACH NOMINAL COLUMN, CODES ARE LOOKED UP IN A LIST OF VALUES, WHERE THE LAST CODE STANDS FOR "?"
+        self.__LOOKUPS = []
+        for column in columns:
+            if column["type"] == TornadoDic.NOMINAL_ATTRIBUTE:
+                lookup = list(column["values"])
+                lookup += ["?"] * (int(numpy.iinfo(column["dtype"]).max) + 1 - len(lookup))
+                self.__LOOKUPS.append(lookup)
+            else:
+                self.__LOOKUPS.append(None)
+
+    def __len__(self):
+        return self.NUM_INSTANCES
+
+    def __iter__(self):
+        for batch in self.batches():
+            yield from batch
+
+    def batches(self):
+        for start in range(0, self.NUM_INSTANCES, self.BATCH_SIZE):
+            yield self.get_records(start, min(start + self.BATCH_SIZE, self.NUM_INSTANCES))
+
+    def get_records(self, start, end):
+        columns = []
+        for array, lookup in zip(self.ARRAYS, self.__LOOKUPS):
+            values = array[start:end].tolist()
+            if lookup is None:
+                values = ["?" if v != v else v for v in values]
+            else:
+                values = [lookup[v] for v in values]
+            columns.append(values)
+        return [list(record) for record in zip(*columns)]
@@ -5,6 +5,8 @@ University of Ottawa, Ontario, Canada
 E-mail: apesaran -at- uottawa -dot- ca / alipsgh -at- gmail -dot- com
 """
 
+import itertools
+import os
 import re
 
 from data_structures.attribute import Attribute
@@ -29,27 +31,11 @@ class ARFFReader:
             
             if line.startswith("@attribute") or line.startswith("@ATTRIBUTE"):
 
-                line = line.strip('\n\r\t')
-                line = line.split(' ')
-
-                attribute_name = line[1]
-                attribute_value_range = line[2]
-
-                attribute = Attribute()
-                attribute.set_name(attribute_name)
-                if attribute_value_range.lower() in ['numeric', 'real', 'integer']:
-                    attribute_type = TornadoDic.NUMERIC_ATTRIBUTE
-                    attribute_value_range = []
+                attributes.append(ARFFReader.parse_attribute(line))
+                if attributes[len(attributes) - 1].TYPE == TornadoDic.NUMERIC_ATTRIBUTE:
                     attributes_min_max.append([0, 0])
                 else:
-                    attribute_type = TornadoDic.NOMINAL_ATTRIBUTE
-                    attribute_value_range = attribute_value_range.strip('{}').replace("'", "")
-                    attribute_value_range = attribute_value_range.split(',')
                     attributes_min_max.append([None, None])
-                attribute.set_type(attribute_type)
-                attribute.set_possible_values(attribute_value_range)
-
-                attributes.append(attribute)
 
             elif line.startswith("@data") or line.startswith("@DATA"):
                 data_flag = True
@@ -77,3 +63,168 @@ class ARFFReader:
                 attributes[i].set_bounds_values(attributes_min_max[i][0], attributes_min_max[i][1])
 
         return labels, attributes, records
+
+    @staticmethod
+    def parse_attribute(line):
+
+        line = line.strip('\n\r\t')
+        line = line.split(' ')
+
+        attribute_name = line[1]
+        attribute_value_range = line[2]
+
+        attribute = Attribute()
+        attribute.set_name(attribute_name)
+        if attribute_value_range.lower() in ['numeric', 'real', 'integer']:
+            attribute_type = TornadoDic.NUMERIC_ATTRIBUTE
+            attribute_value_range = []
+        else:
+            attribute_type = TornadoDic.NOMINAL_ATTRIBUTE
+            attribute_value_range = attribute_value_range.strip('{}').replace("'", "")
+            attribute_value_range = attribute_value_range.split(',')
+        attribute.set_type(attribute_type)
+        attribute.set_possible_values(attribute_value_range)
+
+        return attribute
+
+    @staticmethod
+    def read_header(file_path):
+        """Reads the attributes and the labels of a .arff file, and stops at its @data line."""
+        labels = []
+        attributes = []
+        reader = open(file_path, "r")
+        for line in reader:
+            if line.startswith("@attribute") or line.startswith("@ATTRIBUTE"):
+                attributes.append(ARFFReader.parse_attribute(line))
+            elif line.startswith("@data") or line.startswith("@DATA"):
+                labels = attributes[len(attributes) - 1].POSSIBLE_VALUES
+                attributes.pop(len(attributes) - 1)
+                break
+        reader.close()
+        return labels, attributes
+
+    @staticmethod
+    def read_lazily(file_path, batch_size=1000, use_bounds_file=True):
+        """Reads a .arff file as a stream whose records are parsed batch by batch while iterating, instead of
+        being loaded all at once. The bounds of numeric attributes are found by a pre-pass over the file, and
+        they are kept in a "<file_path>.bounds" side file so that the next reads skip the pre-pass."""
+
+        labels, attributes = ARFFReader.read_header(file_path)
+
+        bounds_path = file_path + ".bounds"
+        if use_bounds_file and os.path.exists(bounds_path) and \
+                os.path.getmtime(bounds_path) >= os.path.getmtime(file_path):
+            num_instances, bounds = ARFFReader.read_bounds_file(bounds_path)
+        else:
+            num_instances, bounds = ARFFReader.scan_bounds(file_path, attributes)
+            if use_bounds_file:
+                ARFFReader.write_bounds_file(bounds_path, num_instances, bounds)
+
+        for attribute in attributes:
+            if attribute.TYPE == TornadoDic.NUMERIC_ATTRIBUTE:
+                attribute.set_bounds_values(bounds[attribute.NAME][0], bounds[attribute.NAME][1])
+
+        return labels, attributes, ARFFStream(file_path, attributes, num_instances, batch_size)
+
+    @staticmethod
+    def get_num_instances(stream):
+        """Returns the number of records of a stream, or None if it is unknown, e.g. for a generator, or for
+        a lazily read stream built without any number of instances."""
+        try:
+            return len(stream)
+        except TypeError:
+            return None
+
+    @staticmethod
+    def scan_bounds(file_path, attributes):
+        """Finds the number of records and the bounds of numeric attributes the same way the read function does."""
+        numeric_indexes = [i for i in range(0, len(attributes)) if attributes[i].TYPE == TornadoDic.NUMERIC_ATTRIBUTE]
+        minimums = [0] * len(attributes)
+        maximums = [0] * len(attributes)
+        num_instances = 0
+        for line in ARFFStream.data_lines(file_path):
+            elements = line.split(',')
+            for i in numeric_indexes:
+                if elements[i] == "?":
+                    continue
+                v = float(elements[i])
+                if v < minimums[i]:
+                    minimums[i] = v
+                elif v > maximums[i]:
+                    maximums[i] = v
+            num_instances += 1
+        bounds = {}
+        for i in numeric_indexes:
+            bounds[attributes[i].NAME] = [minimums[i], maximums[i]]
+        return num_instances, bounds
+
+    @staticmethod
+    def write_bounds_file(bounds_path, num_instances, bounds):
+        writer = open(bounds_path, "w")
+        writer.write("@instances," + str(num_instances) + "\n")
+        for name, [min_value, max_value] in bounds.items():
+            writer.write(name + "," + repr(min_value) + "," + repr(max_value) + "\n")
+        writer.close()
+
+    @staticmethod
+    def read_bounds_file(bounds_path):
+        num_instances = None
+        bounds = {}
+        reader = open(bounds_path, "r")
+        for line in reader:
+            elements = line.strip().split(',')
+            if elements[0] == "@instances":
+                num_instances = int(elements[1])
+            elif len(elements) == 3:
+                bounds[elements[0]] = [float(elements[1]), float(elements[2])]
+        reader.close()
+        return num_instances, bounds
+
+
+class ARFFStream:
+    """This class is a lazily read .arff data stream. Iterating over it yields typed records one by one,
+    while the lines of the file are parsed in batches of batch_size."""
+
+    def __init__(self, file_path, attributes, num_instances=None, batch_size=1000):
+        self.FILE_PATH = file_path
+        self.ATTRIBUTES = attributes
+        self.NUM_INSTANCES = num_instances
+        self.BATCH_SIZE = batch_size
+        self.__NUMERIC_INDEXES = [i for i in range(0, len(attributes))
+                                  if attributes[i].TYPE == TornadoDic.NUMERIC_ATTRIBUTE]
+
+    def __len__(self):
+        if self.NUM_INSTANCES is None:
+            raise TypeError("THE NUMBER OF INSTANCES OF THE STREAM IS UNKNOWN")
+        return self.NUM_INSTANCES
+
+    def __iter__(self):
+        for batch in self.batches():
+            yield from batch
+
+    def batches(self):
+        lines = ARFFStream.data_lines(self.FILE_PATH)
+        while True:
+            batch = [self.parse_record(line) for line in itertools.islice(lines, self.BATCH_SIZE)]
+            if len(batch) == 0:
+                break
+            yield batch
+
+    def parse_record(self, line):
+        elements = line.split(',')
+        for i in self.__NUMERIC_INDEXES:
+            if elements[i] != "?":
+                elements[i] = float(elements[i])
+        return elements
+
+    @staticmethod
+    def data_lines(file_path):
+        """Yields the lines of the @data section, with all whitespaces removed."""
+        with open(file_path, "r") as reader:
+            for line in reader:
+                if line.startswith("@data") or line.startswith("@DATA"):
+                    break
+            for line in reader:
+                line = "".join(line.split())
+                if line != "":
+                    yield line
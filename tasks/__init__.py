@@ -1,4 +1,7 @@
 from tasks.prequential import Prequential
 from tasks.prequential_drift import PrequentialDrift
 from tasks.prequential_drift_evaluator import PrequentialDriftEvaluator
-from tasks.prequential_learner_detector_pairs import PrequentialMultiPairs
\ No newline at end of file
+from tasks.prequential_learner_detector_pairs import PrequentialMultiPairs
+from tasks.prequential_trace_recorder import PrequentialTraceRecorder
+from tasks.detectors_trace_replay import DetectorsTraceReplay
+from tasks.repeated_multi_pairs import RepeatedMultiPairs
\ No newline at end of file
@@ -0,0 +1,101 @@
+"""
+The Tornado Framework
+By Ali Pesaranghader
+University of Ottawa, Ontario, Canada
+E-mail: apesaran -at- uottawa -dot- ca / alipsgh -at- gmail -dot- com
+"""
+
+from dictionary.tornado_dictionary import TornadoDic
+from evaluators.detector_evaluator import DriftDetectionEvaluator
+from evaluators.memory_evaluator import MemoryEvaluator
+
+
+class DetectorsTraceReplay:
+    """This class lets one replay an outcome trace, recorded by PrequentialTraceRecorder, through various
+    drift detectors, and evaluate their detection delays, true positives, false positives and false negatives.
+    As in the prequential tasks, a detector is reset after each drift; the classifier, however, is not,
+    since its outcomes are fixed by the trace. The detectors sharing an outcome window are replayed together,
+    one outcome at a time, as they must be fed in lockstep."""
+
+    def __init__(self, detectors, actual_drift_points, drift_acceptance_interval, project=None):
+
+        self.detectors = detectors
+
+        self.__actual_drift_points = actual_drift_points
+        self.__drift_acceptance_interval = drift_acceptance_interval
+
+        self.__project = project
+
+        self.stats = []
+
+    def run(self, trace):
+
+        located = {}
+        shared = {}
+        for detector in self.detectors:
+            if detector.OUTCOME_WINDOW is None:
+                located[id(detector)] = self.__replay(detector, trace)
+            else:
+                shared.setdefault(id(detector.OUTCOME_WINDOW), []).append(detector)
+        for detectors in shared.values():
+            located.update(zip(map(id, detectors), self.__replay_lockstep(detectors, trace)))
+
+        self.stats = []
+        for detector in self.detectors:
+            located_drift_points = located[id(detector)]
+            dl, tp, fp, fn = DriftDetectionEvaluator.calculate_dl_tp_fp_fn(located_drift_points,
+                                                                           list(self.__actual_drift_points),
+                                                                           self.__drift_acceptance_interval)
+            detector_name = detector.DETECTOR_NAME + "." + detector.get_settings()[0]
+            self.stats.append([detector_name, dl, tp, fp, fn, MemoryEvaluator.calculate(detector),
+                               detector.TOTAL_RUNTIME, located_drift_points])
+
+        self.__store_stats(trace)
+        return self.stats
+
+    @staticmethod
+    def __replay(detector, trace):
+
+        # A DETECTOR WHICH USES CONFIDENCES IS FED ONE OUTCOME AT A TIME, AND THE OTHERS TAKE THE WHOLE TRACE AT ONCE
+        if detector.DETECTOR_NAME.startswith("CDDM") and trace.has_confidences():
+            drift_indexes = []
+            for i, (pr, confidence) in enumerate(zip(trace.OUTCOMES.tolist(), trace.CONFIDENCES.tolist())):
+                warning_status, drift_status = detector.detect(pr, confidence)
+                if drift_status:
+                    drift_indexes.append(i)
+                    detector.reset()
+        else:
+            warning_indexes, drift_indexes = detector.detect_batch(trace.OUTCOMES)
+
+        return trace.POSITIONS[drift_indexes].tolist()
+
+    @staticmethod
+    def __replay_lockstep(detectors, trace):
+
+        drift_indexes = [[] for _ in detectors]
+        for i, pr in enumerate(trace.OUTCOMES.tolist()):
+            for detector, indexes in zip(detectors, drift_indexes):
+                warning_status, drift_status = detector.detect(pr)
+                if drift_status:
+                    indexes.append(i)
+                    detector.reset()
+
+        return [trace.POSITIONS[indexes].tolist() for indexes in drift_indexes]
+
+    def __store_stats(self, trace):
+
+        learner_name = TornadoDic.get_short_names(trace.METADATA.get("learner", ""))
+
+        stats = ""
+        for detector_name, dl, tp, fp, fn, mem, runtime, located_drift_points in self.stats:
+            stats += learner_name + " + " + detector_name + ": " + "\n\t" + \
+                     "Detection Delay: " + "%0.2f" % dl + " TP: " + str(tp) + " FP: " + str(fp) + " FN: " + str(fn) + "," + "\n\t" + \
+                     "Detection Memory Usage (bytes): " + "%0.2f" % mem + "," + "\n\t" + \
+                     "Total Detection Runtime (ms): " + "%0.2f" % runtime + "," + "\n\t" + \
+                     "Drift Points detected: " + str(located_drift_points) + "\n"
+
+        print(stats)
+        if self.__project is not None:
+            st_wr = open(self.__project.get_path() + (self.__project.get_name() + "_replay").lower() + ".txt", "w")
+            st_wr.write(stats)
+            st_wr.close()
@@ -9,10 +9,10 @@ import copy
 import random
 
 import numpy
-from pympler import asizeof
 
 from archiver.archiver import Archiver
 from evaluators.classifier_evaluator import PredictionEvaluator
+from evaluators.memory_evaluator import MemoryEvaluator
 from plotter.performance_plotter import *
 from filters.attribute_handlers import *
 from streams.readers.arff_reader import *
@@ -21,7 +21,7 @@ from streams.readers.arff_reader import *
 class Prequential:
     """This class lets one run a classifier against a data stream, and evaluate it prequentially over time."""
 
-    def __init__(self, learner, attributes, attributes_scheme, project):
+    def __init__(self, learner, attributes, attributes_scheme, project, use_asizeof=False):
 
         self.learner = learner
 
@@ -36,17 +36,27 @@ class Prequential:
 
         self.__project_path = project.get_path()
         self.__project_name = project.get_name()
+        self.__use_asizeof = use_asizeof
+
+        self.__random_seed = None
 
     def run(self, stream, random_seed=1):
 
         random.seed(random_seed)
+        self.__random_seed = random_seed
+
+        # THE STREAM MAY BE AN ITERATOR WITHOUT ANY LENGTH, E.G. A GENERATOR, OR A LAZY STREAM OF UNKNOWN LENGTH
+        num_instances = ARFFReader.get_num_instances(stream)
 
         for record in stream:
 
             self.__instance_counter += 1
 
-            percentage = (self.__instance_counter / len(stream)) * 100
-            print("%0.2f" % percentage + "% of instances are prequentially processed!", end="\r")
+            if num_instances is not None:
+                progress = "%0.2f" % ((self.__instance_counter / num_instances) * 100) + "% of instances"
+            else:
+                progress = str(self.__instance_counter) + " instances"
+            print(progress + " are prequentially processed!", end="\r")
 
             if record.__contains__("?"):
                 self.__num_rubbish += 1
@@ -55,15 +65,19 @@ class Prequential:
             # ---------------------
             #  Data Transformation
             # ---------------------
-            r = copy.copy(record)
-            for k in range(0, len(r) - 1):
-                if self.learner.LEARNER_CATEGORY == TornadoDic.NOM_CLASSIFIER and self.__attributes[k].TYPE == TornadoDic.NUMERIC_ATTRIBUTE:
-                    r[k] = Discretizer.find_bin(r[k], self.__nominal_attribute_scheme[k])
-                elif self.learner.LEARNER_CATEGORY == TornadoDic.NUM_CLASSIFIER and self.__attributes[k].TYPE == TornadoDic.NOMINAL_ATTRIBUTE:
-                    r[k] = NominalToNumericTransformer.map_attribute_value(r[k], self.__numeric_attribute_scheme[k])
-            # NORMALIZING NUMERIC DATA
-            if self.learner.LEARNER_CATEGORY == TornadoDic.NUM_CLASSIFIER:
-                r[0:len(r) - 1] = Normalizer.normalize(r[0:len(r) - 1], self.__numeric_attribute_scheme)
+            if hasattr(stream, "get_transformed_record"):
+                # THE STREAM HAS PRECOMPUTED VIEWS
+                r = stream.get_transformed_record(self.__instance_counter - 1, self.learner.LEARNER_CATEGORY)
+            else:
+                r = copy.copy(record)
+                for k in range(0, len(r) - 1):
+                    if self.learner.LEARNER_CATEGORY == TornadoDic.NOM_CLASSIFIER and self.__attributes[k].TYPE == TornadoDic.NUMERIC_ATTRIBUTE:
+                        r[k] = Discretizer.find_bin(r[k], self.__nominal_attribute_scheme[k])
+                    elif self.learner.LEARNER_CATEGORY == TornadoDic.NUM_CLASSIFIER and self.__attributes[k].TYPE == TornadoDic.NOMINAL_ATTRIBUTE:
+                        r[k] = NominalToNumericTransformer.map_attribute_value(r[k], self.__numeric_attribute_scheme[k])
+                # NORMALIZING NUMERIC DATA
+                if self.learner.LEARNER_CATEGORY == TornadoDic.NUM_CLASSIFIER:
+                    r[0:len(r) - 1] = Normalizer.normalize(r[0:len(r) - 1], self.__numeric_attribute_scheme)
 
             # ----------------------
             #  Prequential Learning
@@ -100,7 +114,7 @@ class Prequential:
         st_wr = open(self.__project_path + TornadoDic.get_short_names(self.learner.LEARNER_NAME).lower() + ".txt", "w")
 
         lrn_error_rate = PredictionEvaluator.calculate_error_rate(self.learner.get_global_confusion_matrix())
-        lrn_mem = asizeof.asizeof(self.learner, limit=20)
+        lrn_mem = MemoryEvaluator.calculate(self.learner, self.__use_asizeof)
         lrn_runtime = self.learner.get_total_running_time()
 
         stats = self.learner.LEARNER_NAME + "\n\t" + \
@@ -123,6 +137,7 @@ class Prequential:
 
         Plotter.plot_single(pair_name, self.__learner_error_rate_array, "Error-rate",
                             self.__project_name, self.__project_path, file_name, [0, up_range], 'upper right', 200)
+        metadata = {"learner": self.learner.LEARNER_NAME, "random_seed": self.__random_seed}
         Archiver.archive_single(pair_name, self.__learner_error_rate_array,
-                                self.__project_path, self.__project_name, 'Error-rate')
+                                self.__project_path, self.__project_name, 'Error-rate', metadata)
 
@@ -9,10 +9,10 @@ import copy
 import random
 
 import numpy
-from pympler import asizeof
 
 from archiver.archiver import Archiver
 from evaluators.classifier_evaluator import PredictionEvaluator
+from evaluators.memory_evaluator import MemoryEvaluator
 from plotter.performance_plotter import *
 from filters.attribute_handlers import *
 from streams.readers.arff_reader import *
@@ -22,7 +22,8 @@ class PrequentialDrift:
     """This class lets one run a classifier with a drift detector against a data stream,
     and evaluate it prequentially over time."""
 
-    def __init__(self, learner, drift_detector, attributes, attributes_scheme, project, memory_check_step=-1):
+    def __init__(self, learner, drift_detector, attributes, attributes_scheme, project, memory_check_step=-1,
+                 use_asizeof=False):
 
         self.learner = learner
         self.drift_detector = drift_detector
@@ -46,17 +47,27 @@ class PrequentialDrift:
         self.__project_name = project.get_name()
 
         self.__memory_check_step = memory_check_step
+        self.__use_asizeof = use_asizeof
+
+        self.__random_seed = None
 
     def run(self, stream, random_seed=1):
 
         random.seed(random_seed)
+        self.__random_seed = random_seed
+
+        # THE STREAM MAY BE AN ITERATOR WITHOUT ANY LENGTH, E.G. A GENERATOR, OR A LAZY STREAM OF UNKNOWN LENGTH
+        num_instances = ARFFReader.get_num_instances(stream)
 
         for record in stream:
 
             self.__instance_counter += 1
 
-            percentage = (self.__instance_counter / len(stream)) * 100
-            print("%0.2f" % percentage + "% of instances are prequentially processed!", end="\r")
+            if num_instances is not None:
+                progress = "%0.2f" % ((self.__instance_counter / num_instances) * 100) + "% of instances"
+            else:
+                progress = str(self.__instance_counter) + " instances"
+            print(progress + " are prequentially processed!", end="\r")
 
             if record.__contains__("?"):
                 self.__num_rubbish += 1
@@ -65,15 +76,19 @@ class PrequentialDrift:
             # ---------------------
             #  Data Transformation
             # ---------------------
-            r = copy.copy(record)
-            for k in range(0, len(r) - 1):
-                if self.learner.LEARNER_CATEGORY == TornadoDic.NOM_CLASSIFIER and self.__attributes[k].TYPE == TornadoDic.NUMERIC_ATTRIBUTE:
-                    r[k] = Discretizer.find_bin(r[k], self.__nominal_attribute_scheme[k])
-                elif self.learner.LEARNER_CATEGORY == TornadoDic.NUM_CLASSIFIER and self.__attributes[k].TYPE == TornadoDic.NOMINAL_ATTRIBUTE:
-                    r[k] = NominalToNumericTransformer.map_attribute_value(r[k], self.__numeric_attribute_scheme[k])
-            # NORMALIZING NUMERIC DATA
-            if self.learner.LEARNER_CATEGORY == TornadoDic.NUM_CLASSIFIER:
-                r[0:len(r) - 1] = Normalizer.normalize(r[0:len(r) - 1], self.__numeric_attribute_scheme)
+            if hasattr(stream, "get_transformed_record"):
+                # THE STREAM HAS PRECOMPUTED VIEWS
+                r = stream.get_transformed_record(self.__instance_counter - 1, self.learner.LEARNER_CATEGORY)
+            else:
+                r = copy.copy(record)
+                for k in range(0, len(r) - 1):
+                    if self.learner.LEARNER_CATEGORY == TornadoDic.NOM_CLASSIFIER and self.__attributes[k].TYPE == TornadoDic.NUMERIC_ATTRIBUTE:
+                        r[k] = Discretizer.find_bin(r[k], self.__nominal_attribute_scheme[k])
+                    elif self.learner.LEARNER_CATEGORY == TornadoDic.NUM_CLASSIFIER and self.__attributes[k].TYPE == TornadoDic.NOMINAL_ATTRIBUTE:
+                        r[k] = NominalToNumericTransformer.map_attribute_value(r[k], self.__numeric_attribute_scheme[k])
+                # NORMALIZING NUMERIC DATA
+                if self.learner.LEARNER_CATEGORY == TornadoDic.NUM_CLASSIFIER:
+                    r[0:len(r) - 1] = Normalizer.normalize(r[0:len(r) - 1], self.__numeric_attribute_scheme)
 
             # ----------------------
             #  Prequential Learning
@@ -103,15 +118,16 @@ class PrequentialDrift:
                     self.__located_drift_points.append(self.__instance_counter)
                     print("\n ->>> " + self.learner.LEARNER_NAME.title() + " faced a drift at instance " +
                           str(self.__instance_counter) + ".")
-                    print("%0.2f" % percentage, " of instances are prequentially processed!", end="\r")
+                    print(progress + " are prequentially processed!", end="\r")
 
                     learner_error_rate = PredictionEvaluator.calculate(TornadoDic.ERROR_RATE,
                                                                        self.learner.get_global_confusion_matrix())
                     self.__learner_error_rate_array.append(round(learner_error_rate, 4))
-                    self.__learner_memory_usage.append(asizeof.asizeof(self.learner, limit=20))
+                    self.__learner_memory_usage.append(MemoryEvaluator.calculate(self.learner, self.__use_asizeof))
                     self.__learner_runtime.append(self.learner.get_running_time())
 
-                    self.__drift_detection_memory_usage.append(asizeof.asizeof(self.drift_detector, limit=20))
+                    detector_mem = MemoryEvaluator.calculate(self.drift_detector, self.__use_asizeof)
+                    self.__drift_detection_memory_usage.append(detector_mem)
                     self.__drift_detection_runtime.append(self.drift_detector.RUNTIME)
 
                     self.learner.reset()
@@ -139,7 +155,8 @@ class PrequentialDrift:
 
             if self.__memory_check_step != -1:
                 if self.__instance_counter % self.__memory_check_step == 0:
-                    self.__drift_detection_memory_usage.append(asizeof.asizeof(self.drift_detector, limit=20))
+                    detector_mem = MemoryEvaluator.calculate(self.drift_detector, self.__use_asizeof)
+                    self.__drift_detection_memory_usage.append(detector_mem)
 
         print("\n" + "The stream is completely processed.")
         self.__store_stats()
@@ -168,10 +185,10 @@ class PrequentialDrift:
             ddm_avg_runtime = numpy.mean(self.__drift_detection_runtime)
             ddm_total_runtime = self.drift_detector.TOTAL_RUNTIME
         else:
-            lrn_mem = asizeof.asizeof(self.learner, limit=20)
+            lrn_mem = MemoryEvaluator.calculate(self.learner, self.__use_asizeof)
             lrn_ave_runtime = self.learner.get_total_running_time()
             lrn_total_runtime = lrn_ave_runtime
-            ddm_mem = asizeof.asizeof(self.drift_detector, limit=20)
+            ddm_mem = MemoryEvaluator.calculate(self.drift_detector, self.__use_asizeof)
             ddm_avg_runtime = self.drift_detector.TOTAL_RUNTIME
             ddm_total_runtime = ddm_avg_runtime
 
@@ -204,5 +221,7 @@ class PrequentialDrift:
         pair_name = learner_name + ' + ' + detector_name + "(" + detector_setting[1] + ")"
         Plotter.plot_single(pair_name, self.__learner_error_rate_array, "Error-rate",
                             self.__project_name, self.__project_path, file_name, [0, up_range], 'upper right', 200)
+        metadata = {"learner": self.learner.LEARNER_NAME, "detector": detector_name,
+                    "detector_settings": detector_setting[0], "random_seed": self.__random_seed}
         Archiver.archive_single(pair_name, self.__learner_error_rate_array,
-                                self.__project_path, self.__project_name, 'Error-rate')
+                                self.__project_path, self.__project_name, 'Error-rate', metadata)
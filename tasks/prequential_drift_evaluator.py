@@ -9,10 +9,10 @@ import copy
 import random
 
 import numpy
-from pympler import asizeof
 
 from archiver.archiver import Archiver
 from evaluators.classifier_evaluator import PredictionEvaluator
+from evaluators.memory_evaluator import MemoryEvaluator
 from evaluators.detector_evaluator import DriftDetectionEvaluator
 from plotter.performance_plotter import *
 from filters.attribute_handlers import *
@@ -27,7 +27,8 @@ class PrequentialDriftEvaluator:
     false positive as well as false negative rates."""
 
     def __init__(self, learner, drift_detector, attributes, attributes_scheme,
-                 actual_drift_points, drift_acceptance_interval, project, memory_check_step=-1):
+                 actual_drift_points, drift_acceptance_interval, project, memory_check_step=-1,
+                 use_asizeof=False):
 
         self.learner = learner
         self.drift_detector = drift_detector
@@ -55,17 +56,27 @@ class PrequentialDriftEvaluator:
         self.__project_name = project.get_name()
 
         self.__memory_check_step = memory_check_step
+        self.__use_asizeof = use_asizeof
+
+        self.__random_seed = None
 
     def run(self, stream, random_seed=1):
 
         random.seed(random_seed)
+        self.__random_seed = random_seed
+
+        # THE STREAM MAY BE AN ITERATOR WITHOUT ANY LENGTH, E.G. A GENERATOR, OR A LAZY STREAM OF UNKNOWN LENGTH
+        num_instances = ARFFReader.get_num_instances(stream)
 
         for record in stream:
 
             self.__instance_counter += 1
 
-            percentage = (self.__instance_counter / len(stream)) * 100
-            print("%0.2f" % percentage + "% of instances are prequentially processed!", end="\r")
+            if num_instances is not None:
+                progress = "%0.2f" % ((self.__instance_counter / num_instances) * 100) + "% of instances"
+            else:
+                progress = str(self.__instance_counter) + " instances"
+            print(progress + " are prequentially processed!", end="\r")
 
             if record.__contains__("?"):
                 self.__num_rubbish += 1
@@ -74,15 +85,19 @@ class PrequentialDriftEvaluator:
             # ---------------------
             #  Data Transformation
             # ---------------------
-            r = copy.copy(record)
-            for k in range(0, len(r) - 1):
-                if self.learner.LEARNER_CATEGORY == TornadoDic.NOM_CLASSIFIER and self.__attributes[k].TYPE == TornadoDic.NUMERIC_ATTRIBUTE:
-                    r[k] = Discretizer.find_bin(r[k], self.__nominal_attribute_scheme[k])
-                elif self.learner.LEARNER_CATEGORY == TornadoDic.NUM_CLASSIFIER and self.__attributes[k].TYPE == TornadoDic.NOMINAL_ATTRIBUTE:
-                    r[k] = NominalToNumericTransformer.map_attribute_value(r[k], self.__numeric_attribute_scheme[k])
-            # NORMALIZING NUMERIC DATA
-            if self.learner.LEARNER_CATEGORY == TornadoDic.NUM_CLASSIFIER:
-                r[0:len(r) - 1] = Normalizer.normalize(r[0:len(r) - 1], self.__numeric_attribute_scheme)
+            if hasattr(stream, "get_transformed_record"):
+                # THE STREAM HAS PRECOMPUTED VIEWS
+                r = stream.get_transformed_record(self.__instance_counter - 1, self.learner.LEARNER_CATEGORY)
+            else:
+                r = copy.copy(record)
+                for k in range(0, len(r) - 1):
+                    if self.learner.LEARNER_CATEGORY == TornadoDic.NOM_CLASSIFIER and self.__attributes[k].TYPE == TornadoDic.NUMERIC_ATTRIBUTE:
+                        r[k] = Discretizer.find_bin(r[k], self.__nominal_attribute_scheme[k])
+                    elif self.learner.LEARNER_CATEGORY == TornadoDic.NUM_CLASSIFIER and self.__attributes[k].TYPE == TornadoDic.NOMINAL_ATTRIBUTE:
+                        r[k] = NominalToNumericTransformer.map_attribute_value(r[k], self.__numeric_attribute_scheme[k])
+                # NORMALIZING NUMERIC DATA
+                if self.learner.LEARNER_CATEGORY == TornadoDic.NUM_CLASSIFIER:
+                    r[0:len(r) - 1] = Normalizer.normalize(r[0:len(r) - 1], self.__numeric_attribute_scheme)
 
             # ----------------------
             #  Prequential Learning
@@ -113,15 +128,16 @@ class PrequentialDriftEvaluator:
                     self.__located_drift_points.append(self.__instance_counter)
                     print("\n ->>> " + self.learner.LEARNER_NAME.title() + " faced a drift at instance " +
                           str(self.__instance_counter) + ".")
-                    print("%0.2f" % percentage, " of instances are prequentially processed!", end="\r")
+                    print(progress + " are prequentially processed!", end="\r")
 
                     learner_error_rate = PredictionEvaluator.calculate(TornadoDic.ERROR_RATE,
                                                                        self.learner.get_global_confusion_matrix())
                     self.__learner_error_rate_array.append(round(learner_error_rate, 4))
-                    self.__learner_memory_usage.append(asizeof.asizeof(self.learner, limit=20))
+                    self.__learner_memory_usage.append(MemoryEvaluator.calculate(self.learner, self.__use_asizeof))
                     self.__learner_runtime.append(self.learner.get_running_time())
 
-                    self.__drift_detection_memory_usage.append(asizeof.asizeof(self.drift_detector, limit=20))
+                    detector_mem = MemoryEvaluator.calculate(self.drift_detector, self.__use_asizeof)
+                    self.__drift_detection_memory_usage.append(detector_mem)
                     self.__drift_detection_runtime.append(self.drift_detector.RUNTIME)
 
                     self.learner.reset()
@@ -149,7 +165,8 @@ class PrequentialDriftEvaluator:
 
             if self.__memory_check_step != -1:
                 if self.__instance_counter % self.__memory_check_step == 0:
-                    self.__drift_detection_memory_usage.append(asizeof.asizeof(self.drift_detector, limit=20))
+                    detector_mem = MemoryEvaluator.calculate(self.drift_detector, self.__use_asizeof)
+                    self.__drift_detection_memory_usage.append(detector_mem)
 
             self.__drift_points_boolean.append(0)
 
@@ -183,10 +200,10 @@ class PrequentialDriftEvaluator:
             ddm_avg_runtime = numpy.mean(self.__drift_detection_runtime)
             ddm_total_runtime = self.drift_detector.TOTAL_RUNTIME
         else:
-            lrn_mem = asizeof.asizeof(self.learner, limit=20)
+            lrn_mem = MemoryEvaluator.calculate(self.learner, self.__use_asizeof)
             lrn_ave_runtime = self.learner.get_total_running_time()
             lrn_total_runtime = lrn_ave_runtime
-            ddm_mem = asizeof.asizeof(self.drift_detector, limit=20)
+            ddm_mem = MemoryEvaluator.calculate(self.drift_detector, self.__use_asizeof)
             ddm_avg_runtime = self.drift_detector.TOTAL_RUNTIME
             ddm_total_runtime = ddm_avg_runtime
 
@@ -218,7 +235,11 @@ class PrequentialDriftEvaluator:
         pair_name = learner_name + ' + ' + detector_name + "(" + detector_setting[1] + ")"
         Plotter.plot_single(pair_name, self.__learner_error_rate_array, "Error-rate",
                             self.__project_name, self.__project_path, file_name, [0, up_range], 'upper right', 200)
+        metadata = {"learner": self.learner.LEARNER_NAME, "detector": detector_name,
+                    "detector_settings": detector_setting[0], "random_seed": self.__random_seed,
+                    "actual_drift_points": list(self.__actual_drift_points),
+                    "drift_acceptance_interval": self.__drift_acceptance_interval}
         Archiver.archive_single(pair_name, self.__learner_error_rate_array,
-                                self.__project_path, self.__project_name, 'Error-rate')
+                                self.__project_path, self.__project_name, 'Error-rate', metadata)
         Plotter.plot_single_ddm_points(pair_name, self.__drift_points_boolean,
                                        self.__project_name, self.__project_path, file_name)
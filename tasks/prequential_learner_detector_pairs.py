@@ -5,19 +5,26 @@ University of Ottawa, Ontario, Canada
 E-mail: apesaran -at- uottawa -dot- ca / alipsgh -at- gmail -dot- com
 """
 
+import copy
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
 import random
+import shutil
+import traceback
 
 import numpy
-from pympler import asizeof
-
-import copy
 
 from archiver.archiver import Archiver
 from evaluators.classifier_evaluator import PredictionEvaluator
+from evaluators.memory_evaluator import MemoryEvaluator
 from plotter.performance_plotter import *
 from plotter.optimal_plotter import OptimalPairPlotter
 from filters.score_processor import ScoreProcessor
 from filters.attribute_handlers import *
+from streams.readers.arff_reader import ARFFReader
 
 # fp_level = 10
 # fn_level = 2
@@ -25,10 +32,13 @@ from filters.attribute_handlers import *
 
 class PrequentialMultiPairs:
     """This lets one run various pairs of (classifier, detector) against a data stream;
-    and evaluate them prequentially, and calculated score of each pair."""
+    and evaluate them prequentially, and calculated score of each pair.
+    The stats of the pairs are kept in a preallocated array, with one block of rows per pair and one column per
+    metric, as given by PairProcessor. With a record_step of k, the stats are recorded for every k-th instance."""
 
     def __init__(self, pairs, attributes, attributes_scheme,
-                 actual_drift_points, drift_acceptance_interval, w_vec, project, color_set=None, legend_param=False):
+                 actual_drift_points, drift_acceptance_interval, w_vec, project, color_set=None, legend_param=False,
+                 use_asizeof=False, record_step=1):
 
         self.__instance_counter = 0
         self.__num_rubbish = 0
@@ -39,20 +49,30 @@ class PrequentialMultiPairs:
 
         self.pairs_names = []
         self.unique_learners_names = []
-        self.learners_stats = []
-        self.detectors_stats = []
-        self.pair_located_drift_points = []
 
-        self.er = []
+        self.record_step = record_step
+        self.random_seed = None
+        self.stats = None
+        self.pair_located_drift_points = None
+        self.num_records = [0] * len(pairs)
+        self.num_located_points = [0] * len(pairs)
+        self.last_stats = [None] * len(pairs)
+
+        self.er = None
         self.dl_tp_fp_fn = []
-        self.mu = []
-        self.rt = []
-        self.sc = []
+        self.mu = None
+        self.rt = None
+        self.sc = None
+
+        # THE DETECTORS OF THE PAIRS CANNOT SHARE AN OUTCOME WINDOW, EVEN IF THEIR LEARNERS GIVE THE SAME OUTCOMES:
+        # THE PAIRS ARE FED ONE CHUNK AFTER ANOTHER RATHER THAN IN LOCKSTEP, POSSIBLY IN DIFFERENT WORKERS, AND EACH
+        # LEARNER IS RESET ON THE DRIFTS OF ITS OWN DETECTOR, AFTER WHICH THE OUTCOMES OF THE LEARNERS DIFFER
+        outcome_windows = [id(pair[1].OUTCOME_WINDOW) for pair in pairs if pair[1].OUTCOME_WINDOW is not None]
+        if len(set(outcome_windows)) != len(outcome_windows):
+            raise ValueError('THE DETECTORS OF DIFFERENT PAIRS CANNOT SHARE AN OUTCOME WINDOW; '
+                             'THE DETECTORS SHARING A WINDOW MAY BE REPLAYED TOGETHER BY DetectorsTraceReplay')
 
         for pair in pairs:
-            self.learners_stats.append([])
-            self.detectors_stats.append([])
-            self.pair_located_drift_points.append([])
             if legend_param is True:
                 self.pairs_names.append(TornadoDic.get_short_names(pair[0].LEARNER_NAME) + " + " +
                                         pair[1].DETECTOR_NAME + "(" + pair[1].get_settings()[1] + ")")
@@ -60,18 +80,11 @@ class PrequentialMultiPairs:
                 self.pairs_names.append(TornadoDic.get_short_names(pair[0].LEARNER_NAME) + " + " + pair[1].DETECTOR_NAME)
             if self.unique_learners_names.__contains__(pair[0].LEARNER_NAME) is False:
                 self.unique_learners_names.append(pair[0].LEARNER_NAME)
-            self.er.append([])
-            self.mu.append([])
-            self.rt.append([])
-            self.sc.append([])
 
         self.actual_drift_points = actual_drift_points
         self.drift_acceptance_interval = drift_acceptance_interval
         self.w_vec = w_vec
 
-        self.drift_loc_index = 0
-        self.drift_current_context = 0
-
         self.__project_path = project.get_path()
         self.__project_name = project.get_name()
 
@@ -80,201 +93,300 @@ class PrequentialMultiPairs:
         self.nominal_attribute_scheme = attributes_scheme['nominal']
 
         self.feedback_interval = 200
-        self.feedback_counter = 0
 
         self.score_interval = 62
         self.score_counter = 0
 
         self.color_set = color_set
-
-    def run(self, stream_records, random_seed=1):
-
-        random.seed(random_seed)
-
-        for record in stream_records:
-
-            self.__instance_counter += 1
-
-            if self.drift_loc_index < len(self.actual_drift_points) - 1:
-                if self.__instance_counter > self.actual_drift_points[self.drift_loc_index] + self.drift_acceptance_interval:
-                    self.drift_loc_index += 1
-
-            if self.drift_current_context < len(self.actual_drift_points):
-                if self.__instance_counter > self.actual_drift_points[self.drift_current_context]:
-                    self.drift_current_context += 1
-
-            percentage = (self.__instance_counter / len(stream_records)) * 100
-            print("%0.2f" % percentage + "% of instances are processed!", end="\r")
-
-            if record.__contains__("?"):
-                self.__num_rubbish += 1
-                continue
-
-            for pair in self.pairs:
-                learner = pair[0]
-                detector = pair[1]
-                index = self.pairs.index(pair)
-
-                # ---------------------
-                #  DATA TRANSFORMATION
-                # ---------------------
-                r = copy.copy(record)
-                for k in range(0, len(r) - 1):
-                    if learner.LEARNER_CATEGORY == TornadoDic.NOM_CLASSIFIER and self.attributes[k].TYPE == TornadoDic.NUMERIC_ATTRIBUTE:
-                        r[k] = Discretizer.find_bin(r[k], self.nominal_attribute_scheme[k])
-                    elif learner.LEARNER_CATEGORY == TornadoDic.NUM_CLASSIFIER and self.attributes[k].TYPE == TornadoDic.NOMINAL_ATTRIBUTE:
-                        r[k] = NominalToNumericTransformer.map_attribute_value(r[k], self.numeric_attribute_scheme[k])
-                # NORMALIZING NUMERIC DATA
-                if learner.LEARNER_CATEGORY == TornadoDic.NUM_CLASSIFIER:
-                    r[0:len(r) - 1] = Normalizer.normalize(r[0:len(r) - 1], self.numeric_attribute_scheme)
-
-                # ----------------------
-                #  PREQUENTIAL LEARNING
-                # ----------------------
-                if learner.is_ready():
-
-                    real_class = r[len(r) - 1]
-                    predicted_class = learner.do_testing(r)
-
-                    prediction_status = True
-                    if real_class != predicted_class:
-                        prediction_status = False
-
-                    if detector.DETECTOR_NAME.startswith("CDDM"):
-                        confidence = max( learner.get_prediction_prob_list(r) )
-                        warning_status, drift_status = detector.detect(prediction_status, confidence)
-                    else:
-                        warning_status, drift_status = detector.detect(prediction_status)
-
-                    # -----------------------
-                    #  ANY DRIFTS DETECTED?
-                    # -----------------------
-                    if drift_status:
-
-                        # APPEND 1 INTO LOCATED DRIFT POINTS
-                        self.pair_located_drift_points[index].append(1)
-
-                        # APPENDING ERROR-RATE, MEMORY USAGE, AND RUNTIME OF CLASSIFIER
-                        learner_error_rate = PredictionEvaluator.calculate(TornadoDic.ERROR_RATE, learner.get_confusion_matrix())
-                        learner_error_rate = round(learner_error_rate, 4)
-                        learner_runtime = learner.get_running_time()
-                        learner_mem_use = asizeof.asizeof(learner, limit=20) / 1000
-                        self.learners_stats[index].append([learner_error_rate, learner_mem_use, learner_runtime])
-
-                        # APPENDING FP, FN, MEMORY USAGE, AND RUNTIME OF DETECTOR
-                        delay, [tp_loc, tp], fp, fn, mem, runtime = self.detectors_stats[index][len(self.detectors_stats[index]) - 1]
-                        actual_drift_loc = self.actual_drift_points[self.drift_loc_index]
-                        if actual_drift_loc <= self.__instance_counter <= actual_drift_loc + self.drift_acceptance_interval:
-                            if self.__instance_counter - tp_loc < self.drift_acceptance_interval:
-                                fp += 1
-                            else:
-                                tp += 1
-                                tp_loc = self.__instance_counter
-                        else:
-                            fp += 1
-                        mem = asizeof.asizeof(detector) / 1000
-                        runtime = detector.RUNTIME
-                        self.detectors_stats[index].append([delay, [tp_loc, tp], fp, fn, mem, runtime])
-
-                        learner.reset()
-                        detector.reset()
-                        continue
-
-                    if learner.LEARNER_TYPE == TornadoDic.TRAINABLE:
-                        learner.do_training(r)
-                    else:
-                        learner.do_loading(r)
-                else:
-                    if learner.LEARNER_TYPE == TornadoDic.TRAINABLE:
-                        learner.do_training(r)
-                    else:
-                        learner.do_loading(r)
-
-                    learner.set_ready()
-                    learner.update_confusion_matrix(r[len(r) - 1], r[len(r) - 1])
-
-                self.pair_located_drift_points[index].append(0)
-
-                # APPENDING ERROR-RATE, MEMORY USAGE, AND RUNTIME OF CLASSIFIERS
-                learner_error_rate = PredictionEvaluator.calculate(TornadoDic.ERROR_RATE, learner.get_confusion_matrix())
-                learner_error_rate = round(learner_error_rate, 4)
-                if self.feedback_counter % self.feedback_interval == 0 or self.__instance_counter == len(stream_records):
-                    learner_mem_use = asizeof.asizeof(learner, limit=20) / 1000
+        self.use_asizeof = use_asizeof
+
+        self.num_checkpoints = 0
+        self.__checkpointed = [0, 0, 0]
+        self.__checkpoint_dir = None
+        self.__stream_identity = None
+
+    def run(self, stream_records, random_seed=1, num_workers=1, chunk_size=1000, checkpoint_interval=None,
+            resume=False):
+        """Runs the pairs against the stream. With num_workers > 1, the pairs are spread across worker processes,
+        and each chunk of chunk_size records is sent to all of them. Scoring is done here, in the main process.
+        Each pair has its own random state, seeded from random_seed and the index of the pair, and the choice among
+        tied optimal pairs has another one; so the results do not depend on num_workers, but they differ from those
+        of the runs where all pairs drew from the global random state seeded by random_seed, for the pairs whose
+        learners or detectors draw random numbers, e.g. Perceptron or SeqDrift2, and for the optimal pairs.
+        With a checkpoint_interval of k, the state of the run is checkpointed at the end of the chunk reaching
+        every k-th instance. With resume, the run continues from the last checkpoint, if there is any, and gives
+        the same stats as an uninterrupted run, apart from the runtimes, which are measured as the run goes.
+        The checkpoints are kept in the folder of the project, above its timestamped runs, in a folder of their own
+        for each stream, random seed and pairs, where a new run of the same project finds them. They are cleared
+        by a checkpointed run which does not resume, and removed once a checkpointed or resumed run completes."""
+
+        self.__random = random.Random(random_seed)
+        self.random_seed = random_seed
+
+        # THE STREAM MAY BE AN ITERATOR WITHOUT ANY LENGTH, E.G. A GENERATOR, OR A LAZY STREAM OF UNKNOWN LENGTH
+        num_instances = ARFFReader.get_num_instances(stream_records)
+
+        self.pair_processors = []
+        for index, pair in enumerate(self.pairs):
+            self.pair_processors.append(PairProcessor(index, pair[0], pair[1], self.attributes,
+                                                      self.numeric_attribute_scheme, self.nominal_attribute_scheme,
+                                                      self.actual_drift_points, self.drift_acceptance_interval,
+                                                      self.feedback_interval, num_instances,
+                                                      str(random_seed) + "." + str(index), self.use_asizeof,
+                                                      self.record_step))
+
+        # THE ARRAYS ARE ALLOCATED FOR THE WHOLE STREAM; FOR A STREAM WITHOUT ANY LENGTH, THEY GROW AS NEEDED
+        capacity = num_instances if num_instances is not None else chunk_size
+        self.stats = numpy.zeros((len(self.pairs), -(-capacity // self.record_step), PairProcessor.NUM_COLUMNS))
+        self.pair_located_drift_points = numpy.zeros((len(self.pairs), capacity), dtype=numpy.int8)
+
+        # THE CHECKPOINTS ARE LOOKED FOR ONLY IF THE RUN IS CHECKPOINTED OR RESUMED, AS A STREAM WHICH IS NOT READ
+        # FROM A FILE IS IDENTIFIED BY A HASH OF ITS RECORDS, AND A GENERATOR CANNOT BE IDENTIFIED AT ALL
+        self.__checkpoint_dir = None
+        if checkpoint_interval is not None or resume:
+            self.__stream_identity = PrequentialMultiPairs.get_stream_identity(stream_records, num_instances)
+            key = json.dumps([self.__stream_identity, self.random_seed, self.pairs_names])
+            self.__checkpoint_dir = self.__get_checkpoints_root() + hashlib.sha1(key.encode()).hexdigest()[:16] + "/"
+            if resume and os.path.exists(self.__get_checkpoint_path()):
+                self.__load_checkpoint()
+            else:
+                self.__remove_checkpoints()
+
+        workers = []
+        # THE WORKERS ARE STOPPED IF ANYTHING FAILS, AS THEY WOULD OTHERWISE WAIT FOR CHUNKS FOREVER
+        try:
+            if num_workers > 1:
+                num_workers = min(num_workers, len(self.pairs))
+                for w in range(0, num_workers):
+                    connection, worker_connection = multiprocessing.Pipe()
+                    processors = self.pair_processors[w::num_workers]
+                    worker = multiprocessing.Process(target=run_pairs_worker, args=(worker_connection, processors))
+                    worker.start()
+                    # THE WORKER'S END IS CLOSED HERE, SO THAT RECEIVING FROM A WORKER WHICH HAS DIED RAISES EOFError
+                    worker_connection.close()
+                    workers.append([worker, connection, [processor.index for processor in processors]])
+
+            # THE STREAM MAY HAVE PRECOMPUTED VIEWS, FROM WHICH THE TRANSFORMED RECORDS ARE PICKED
+            views = stream_records if hasattr(stream_records, "get_transformed_records") else None
+
+            # A RESUMED RUN SKIPS THE RECORDS PROCESSED BEFORE ITS CHECKPOINT
+            records = itertools.islice(iter(stream_records), self.__instance_counter, None)
+            while True:
+                chunk = list(itertools.islice(records, chunk_size))
+                if len(chunk) == 0:
+                    break
+
+                start = self.__instance_counter
+                self.__instance_counter += len(chunk)
+                self.__num_rubbish += sum(1 for record in chunk if record.__contains__("?"))
+
+                if len(workers) == 0:
+                    transformed_chunks = transform_chunk(chunk, self.pair_processors, self.attributes,
+                                                         self.numeric_attribute_scheme, self.nominal_attribute_scheme,
+                                                         views, start)
+                    for processor in self.pair_processors:
+                        processor.process(chunk, transformed_chunks[processor.learner.LEARNER_CATEGORY])
+                        self.__append_stats(processor.index, processor.collect_stats())
                 else:
-                    learner_mem_use = self.learners_stats[index][len(self.learners_stats[index]) - 1][1]
-                learner_runtime = learner.get_running_time()
-                self.learners_stats[index].append([learner_error_rate, learner_mem_use, learner_runtime])
-
-                # APPENDING FP, FN, MEMORY USAGE, AND RUNTIME OF DRIFT DETECTORS
-                if self.__instance_counter == 1:
-                    delay, [tp_loc, tp], fp, fn, mem, runtime = [0, [0, 0], 0, 0, 0, 0]
+                    for worker, connection, indexes in workers:
+                        transformed_chunks = None
+                        if views is not None:
+                            processors = [self.pair_processors[index] for index in indexes]
+                            transformed_chunks = transform_chunk(chunk, processors, self.attributes,
+                                                                 self.numeric_attribute_scheme,
+                                                                 self.nominal_attribute_scheme, views, start)
+                        connection.send([chunk, transformed_chunks])
+                    for worker, connection, indexes in workers:
+                        for index, stats in zip(indexes, receive_from_worker(connection)):
+                            self.__append_stats(index, stats)
+
+                # CALCULATE SCORES & OPTIMAL CHOICE
+                while self.score_counter < self.num_records[0]:
+                    if self.__is_scored(self.score_counter):
+                        self.__score(self.score_counter)
+                    self.score_counter += 1
+
+                if checkpoint_interval is not None:
+                    if self.__instance_counter // checkpoint_interval != start // checkpoint_interval:
+                        self.__save_checkpoint(workers)
+
+                if num_instances is not None:
+                    percentage = (self.__instance_counter / num_instances) * 100
+                    print("%0.2f" % percentage + "% of instances are processed!", end="\r")
                 else:
-                    delay, [tp_loc, tp], fp, fn, mem, runtime = self.detectors_stats[index][len(self.detectors_stats[index]) - 1]
-                    runtime = detector.RUNTIME
-                    # print(runtime)
-                    if self.feedback_counter % self.feedback_interval == 0 or self.__instance_counter == len(stream_records):
-                        mem = asizeof.asizeof(detector) / 1000
-                    if self.drift_current_context >= 1:
-                        if self.__instance_counter >= self.actual_drift_points[self.drift_current_context - 1]:
-                            fn = self.drift_current_context - tp
-                            if self.__instance_counter <= self.actual_drift_points[self.drift_current_context - 1] + self.drift_acceptance_interval:
-                                if tp_loc < self.actual_drift_points[self.drift_current_context - 1] or tp_loc > self.actual_drift_points[self.drift_current_context - 1] + self.drift_acceptance_interval:
-                                    delay += 1
-                self.detectors_stats[index].append([delay, [tp_loc, tp], fp, fn, mem, runtime])
-                # print(instance_counter, detectors_stats[index][len(detectors_stats[index]) - 1])
-
-            # CALCULATE SCORES & OPTIMAL CHOICE
-            if self.score_counter % self.score_interval == 0:
-
-                current_stats = []
-                for i in range(0, len(self.pairs)):
-                    ce, cm, cr = self.learners_stats[i][len(self.learners_stats[i]) - 1]
-                    dd, [dtp_loc, dtp], dfp, dfn, dm, dr = self.detectors_stats[i][len(self.detectors_stats[i]) - 1]
-                    current_stats.append([ce, dd, dfp, dfn, cm + dm, cr + dr])
-
-                # current_stats = ScoreProcessor.penalize_high_dfp(fp_level, 2, 1, current_stats)
-                # ranked_current_stats = ScoreProcessor.rank_matrix(current_stats)
-                scaled_current_stats = ScoreProcessor.normalize_matrix(current_stats)
-                scaled_current_scores = ScoreProcessor.calculate_weighted_scores(scaled_current_stats, self.w_vec)
-                self.pairs_scores.append(scaled_current_scores)
-                # print(scaled_current_scores)
-                max_score = max(scaled_current_scores)
-                indexes = numpy.argwhere(numpy.array(scaled_current_scores) == max_score).flatten().tolist()
-                optimal_index = random.choice(indexes)
-                # index = scaled_current_scores.index(max(scaled_current_scores))
-                learner_name = self.pairs[optimal_index][0].LEARNER_NAME.upper()
-                detector_name = self.pairs[optimal_index][1].DETECTOR_NAME.upper()
-                optimal = learner_name + " + " + detector_name
-                self.optimal_pair.append([optimal_index, optimal])
-                # print(optimal)
-                # for i in range(0, len(learners_detectors)):
-                #    ce, cm, cr = learners_stats[i][len(learners_stats[i]) - 1]
-                #    dd, [dtp_loc, dtp], dfp, dfn, dm, dr = detectors_stats[i][len(detectors_stats[i]) - 1]
-                #    print("\t", learners_detectors_names[i], [ce, dd, dfp, dfn, cm + dm, cr + dr])
-
-            self.feedback_counter += 1
-            self.score_counter += 1
+                    print(str(self.__instance_counter) + " instances are processed!", end="\r")
+
+            for worker, connection, indexes in workers:
+                connection.send(None)
+                for processor in receive_from_worker(connection):
+                    self.pair_processors[processor.index] = processor
+                    self.pairs[processor.index][0] = processor.learner
+                    self.pairs[processor.index][1] = processor.detector
+                worker.join()
+        finally:
+            for worker, connection, indexes in workers:
+                if worker.is_alive():
+                    worker.terminate()
+                worker.join()
+                connection.close()
 
         self.store_stats()
         self.plot()
         self.archive()
         self.print_stats()
 
+        if self.__checkpoint_dir is not None:
+            self.__remove_checkpoints()
+
         print("THE END")
         print("\a")
 
-    def store_stats(self):
+    def __append_stats(self, index, stats):
+        records, located_drift_points, last_stats = stats
+
+        start = self.num_records[index]
+        self.num_records[index] += len(records)
+        self.stats = PrequentialMultiPairs.__grow(self.stats, self.num_records[index])
+        self.stats[index, start:self.num_records[index]] = records
+
+        start = self.num_located_points[index]
+        self.num_located_points[index] += len(located_drift_points)
+        self.pair_located_drift_points = PrequentialMultiPairs.__grow(self.pair_located_drift_points,
+                                                                      self.num_located_points[index])
+        self.pair_located_drift_points[index, start:self.num_located_points[index]] = located_drift_points
+
+        self.last_stats[index] = last_stats
+
+    @staticmethod
+    def get_stream_identity(stream_records, num_instances):
+        """Returns what tells a stream apart for its checkpoints: the path, the size, and the modification time
+        of its file, if it is read from a file, or else a hash of its records, together with its length."""
+        if hasattr(stream_records, "FILE_PATH"):
+            file_path = os.path.abspath(stream_records.FILE_PATH)
+            return [file_path, os.path.getsize(file_path), os.path.getmtime(file_path), num_instances]
+        if iter(stream_records) is stream_records:
+            raise ValueError('A CHECKPOINTED RUN NEEDS A STREAM WHICH CAN BE ITERATED OVER AGAIN, E.G. A LIST')
+        digest = hashlib.sha1()
+        for record in stream_records:
+            digest.update(repr(record).encode())
+        return [digest.hexdigest(), num_instances]
+
+    def __get_checkpoints_root(self):
+        return os.path.dirname(os.path.dirname(self.__project_path)) + "/checkpoints/"
+
+    def __get_checkpoint_path(self, k=None):
+        sub_name = "checkpoint" if k is None else "checkpoint_" + str(k)
+        extension = ".pkl" if k is None else ".npz"
+        return (self.__checkpoint_dir + self.__project_name + "_" + sub_name).lower() + extension
+
+    def __remove_checkpoints(self):
+        shutil.rmtree(self.__checkpoint_dir, ignore_errors=True)
+        if os.path.exists(self.__get_checkpoints_root()) and len(os.listdir(self.__get_checkpoints_root())) == 0:
+            os.rmdir(self.__get_checkpoints_root())
+
+    def __save_checkpoint(self, workers):
+
+        # THE PROCESSORS IN WORKER PROCESSES ARE SENT BACK, WHILE THE WORKERS KEEP RUNNING THEIR OWN COPIES
+        pair_processors = list(self.pair_processors)
+        for worker, connection, indexes in workers:
+            connection.send("checkpoint")
+            for processor in receive_from_worker(connection):
+                pair_processors[processor.index] = processor
+
+        # THE STATS RECORDED SINCE THE LAST CHECKPOINT ARE WRITTEN TO A FILE OF THEIR OWN, AND THE STATE OF THE RUN,
+        # WHICH COUNTS THOSE FILES, IS REPLACED LAST; A RUN STOPPED IN BETWEEN THUS RESUMES FROM THE LAST CHECKPOINT
+        os.makedirs(self.__checkpoint_dir, exist_ok=True)
+        num_records, num_located_points, num_scores = self.__checkpointed
+        arrays = {"stats": self.stats[:, num_records:self.num_records[0]],
+                  "located_drift_points": self.pair_located_drift_points[:, num_located_points:self.num_located_points[0]],
+                  "scores": numpy.array(self.pairs_scores[num_scores:], dtype=float).reshape(-1, len(self.pairs))}
+        Archiver.archive_arrays(arrays, self.__checkpoint_dir, self.__project_name,
+                                "checkpoint_" + str(self.num_checkpoints),
+                                {"optimal_pair": self.optimal_pair[num_scores:]})
+        self.num_checkpoints += 1
+        self.__checkpointed = [self.num_records[0], self.num_located_points[0], len(self.pairs_scores)]
+
+        state = {"pairs_names": self.pairs_names, "random_seed": self.random_seed, "stream": self.__stream_identity,
+                 "num_checkpoints": self.num_checkpoints,
+                 "instance_counter": self.__instance_counter, "num_rubbish": self.__num_rubbish,
+                 "random_state": self.__random.getstate(), "score_counter": self.score_counter,
+                 "last_stats": self.last_stats, "pair_processors": pair_processors}
+        Archiver.archive_object(state, self.__checkpoint_dir, self.__project_name, "checkpoint")
+
+    def __load_checkpoint(self):
+
+        state = Archiver.load_object(self.__get_checkpoint_path())
+        if state["pairs_names"] != self.pairs_names or state["random_seed"] != self.random_seed or \
+                state["stream"] != self.__stream_identity:
+            raise ValueError('THE CHECKPOINT HAS BEEN MADE BY ANOTHER RUN')
+
+        # THE ARRAYS OF UNPICKLED OBJECTS DO NOT OWN THEIR DATA; THEY ARE COPIED, SO THAT THE MEMORY ESTIMATES
+        # COUNT THEIR DATA AS BEFORE
+        self.pair_processors = copy.deepcopy(state["pair_processors"])
+        for processor in self.pair_processors:
+            self.pairs[processor.index][0] = processor.learner
+            self.pairs[processor.index][1] = processor.detector
+
+        for k in range(0, state["num_checkpoints"]):
+            metadata, arrays = Archiver.load(self.__get_checkpoint_path(k))
+            for index in range(0, len(self.pairs)):
+                self.__append_stats(index, [arrays["stats"][index], arrays["located_drift_points"][index], None])
+            self.pairs_scores += arrays["scores"].tolist()
+            self.optimal_pair += metadata["optimal_pair"]
+
+        self.num_checkpoints = state["num_checkpoints"]
+        self.__checkpointed = [self.num_records[0], self.num_located_points[0], len(self.pairs_scores)]
+        self.__instance_counter = state["instance_counter"]
+        self.__num_rubbish = state["num_rubbish"]
+        self.__random.setstate(state["random_state"])
+        self.score_counter = state["score_counter"]
+        self.last_stats = state["last_stats"]
+
+    @staticmethod
+    def __grow(array, length):
+        if length <= array.shape[1]:
+            return array
+        grown = numpy.zeros((array.shape[0], max(length, 2 * array.shape[1])) + array.shape[2:], dtype=array.dtype)
+        grown[:, :array.shape[1]] = array
+        return grown
+
+    def __is_scored(self, j):
+        # A RECORD IS SCORED IF IT IS THE FIRST ONE SINCE THE LAST MULTIPLE OF THE SCORE INTERVAL
+        step, interval = self.record_step, self.score_interval
+        return j == 0 or j * step // interval != (j - 1) * step // interval
+
+    def __score(self, j):
+
+        records = self.stats[:, j]
+        current_stats = numpy.column_stack((records[:, PairProcessor.ERROR_RATE], records[:, PairProcessor.DELAY],
+                                            records[:, PairProcessor.FP], records[:, PairProcessor.FN],
+                                            records[:, PairProcessor.LEARNER_MEMORY] +
+                                            records[:, PairProcessor.DETECTOR_MEMORY],
+                                            records[:, PairProcessor.LEARNER_RUNTIME] +
+                                            records[:, PairProcessor.DETECTOR_RUNTIME]))
+
+        # current_stats = ScoreProcessor.penalize_high_dfp(fp_level, 2, 1, current_stats)
+        # ranked_current_stats = ScoreProcessor.rank_matrix(current_stats)
+        scaled_current_stats = ScoreProcessor.normalize_matrix(current_stats)
+        scaled_current_scores = ScoreProcessor.calculate_weighted_scores(scaled_current_stats, self.w_vec)
+        self.pairs_scores.append(scaled_current_scores)
+        max_score = max(scaled_current_scores)
+        indexes = numpy.argwhere(numpy.array(scaled_current_scores) == max_score).flatten().tolist()
+        optimal_index = self.__random.choice(indexes)
+        learner_name = self.pairs[optimal_index][0].LEARNER_NAME.upper()
+        detector_name = self.pairs[optimal_index][1].DETECTOR_NAME.upper()
+        optimal = learner_name + " + " + detector_name
+        self.optimal_pair.append([optimal_index, optimal])
 
-        for i in range(0, len(self.er)):
-            for j in range(0, len(self.learners_stats[i])):
-                self.er[i].append(self.learners_stats[i][j][0])
-                self.mu[i].append(self.learners_stats[i][j][1] + self.detectors_stats[i][j][4])
-                self.rt[i].append(self.learners_stats[i][j][2] + self.detectors_stats[i][j][5])
-            self.dl_tp_fp_fn.append(self.detectors_stats[i][len(self.detectors_stats[i]) - 1][0:4])
+    def store_stats(self):
 
-        for i in range(0, len(self.pairs_scores)):
-            for j in range(0, len(self.sc)):
-                self.sc[j].append(self.pairs_scores[i][j])
+        # THE SERIES ARE VIEWS OF, OR SUMS OVER, THE COLUMNS OF THE STATS
+        stats = self.stats[:, :self.num_records[0]]
+        self.er = stats[:, :, PairProcessor.ERROR_RATE]
+        self.mu = stats[:, :, PairProcessor.LEARNER_MEMORY] + stats[:, :, PairProcessor.DETECTOR_MEMORY]
+        self.rt = stats[:, :, PairProcessor.LEARNER_RUNTIME] + stats[:, :, PairProcessor.DETECTOR_RUNTIME]
+        self.sc = numpy.array(self.pairs_scores).reshape(-1, len(self.pairs)).T
+        self.dl_tp_fp_fn = [PairProcessor.get_detector_stats(last_stats)[0:4] for last_stats in self.last_stats]
 
         stats_writer = open(self.__project_path + self.__project_name + ".txt", "w")
         stats_writer.write("[Name, Avg. Error-rate, Drift Detector Stats, Avg. Total Memory, Avg. Total Runtime, Avg. Score]" + "\n")
@@ -317,7 +429,8 @@ class PrequentialMultiPairs:
                               len(self.unique_learners_names), 14, self.color_set, z_orders, print_legend=True)
 
         # === Plotting Drift Points
-        Plotter.plot_multi_ddms_points(self.pairs_names, self.pair_located_drift_points,
+        located_drift_points = self.pair_located_drift_points[:, :self.num_located_points[0]]
+        Plotter.plot_multi_ddms_points(self.pairs_names, located_drift_points,
                                        self.__project_name, self.__project_path, self.__project_name, self.color_set)
 
         OptimalPairPlotter.plot_circles(self.optimal_pair, self.pairs_names, len(self.unique_learners_names),
@@ -326,23 +439,328 @@ class PrequentialMultiPairs:
 
     def archive(self):
 
-        Archiver.archive_multiple(self.pairs_names, self.er,
-                                  self.__project_path, self.__project_name, 'Error-rate')
-        Archiver.archive_multiple(self.pairs_names, self.mu,
-                                  self.__project_path, self.__project_name, 'Memory Usage (Kilobytes)')
-        Archiver.archive_multiple(self.pairs_names, self.rt,
-                                  self.__project_path, self.__project_name, 'Runtime (Milliseconds)')
-        Archiver.archive_multiple(self.pairs_names, self.sc,
-                                  self.__project_path, self.__project_name, 'Score')
-        Archiver.archive_multiple(self.pairs_names, self.learners_stats,
-                                  self.__project_path, self.__project_name, 'learners_stats')
-        Archiver.archive_multiple(self.pairs_names, self.detectors_stats,
-                                  self.__project_path, self.__project_name, 'detectors_stats')
+        # EACH SERIES IS AN ARRAY WITH ONE ROW PER PAIR; THE COUNTS OF THE DETECTORS ARE STORED AS INTEGERS
+        stats = self.stats[:, :self.num_records[0]]
+        arrays = {"error_rate": self.er, "memory_usage": self.mu, "runtime": self.rt, "score": self.sc,
+                  "located_drift_points": self.pair_located_drift_points[:, :self.num_located_points[0]]}
+        for k, column in enumerate(PairProcessor.COLUMNS_NAMES):
+            if k in PairProcessor.COUNTS_COLUMNS:
+                arrays[column] = stats[:, :, k].astype(numpy.int64)
+            elif k != PairProcessor.ERROR_RATE:
+                arrays[column] = stats[:, :, k]
+
+        metadata = {"pairs_names": self.pairs_names,
+                    "learners": [pair[0].LEARNER_NAME for pair in self.pairs],
+                    "detectors": [pair[1].DETECTOR_NAME for pair in self.pairs],
+                    "detectors_settings": [pair[1].get_settings()[0] for pair in self.pairs],
+                    "random_seed": self.random_seed, "record_step": self.record_step,
+                    "score_interval": self.score_interval, "w_vec": list(self.w_vec),
+                    "actual_drift_points": list(self.actual_drift_points),
+                    "drift_acceptance_interval": self.drift_acceptance_interval}
+
+        Archiver.archive_arrays(arrays, self.__project_path, self.__project_name, 'stats', metadata)
+
+    def get_learners_stats(self):
+        """Returns the recorded stats of the learners as lists of [error-rate, memory usage, runtime]."""
+        learners_stats = []
+        for i in range(0, len(self.pairs)):
+            records = self.stats[i, :self.num_records[i]].tolist()
+            learners_stats.append([PairProcessor.get_learner_stats(record) for record in records])
+        return learners_stats
+
+    def get_detectors_stats(self):
+        """Returns the recorded stats of the detectors as lists of [delay, [tp_loc, tp], fp, fn, memory, runtime]."""
+        detectors_stats = []
+        for i in range(0, len(self.pairs)):
+            records = self.stats[i, :self.num_records[i]].tolist()
+            detectors_stats.append([PairProcessor.get_detector_stats(record) for record in records])
+        return detectors_stats
 
     def print_stats(self):
 
         for learner_detector in self.pairs_names:
             index = self.pairs_names.index(learner_detector)
-            learner_stats = self.learners_stats[index][len(self.learners_stats[index]) - 1]
-            detector_stats = self.detectors_stats[index][len(self.detectors_stats[index]) - 1]
+            learner_stats = PairProcessor.get_learner_stats(self.last_stats[index])
+            detector_stats = PairProcessor.get_detector_stats(self.last_stats[index])
             print(learner_detector, learner_stats, detector_stats)
+
+
+class PairProcessor:
+    """This class runs a single (classifier, detector) pair against chunks of a data stream. It keeps the pair's
+    own counters and random state, so the pair gives the same stats in the main process or in a worker process.
+    The stats of an instance are a flat record, whose columns are given below."""
+
+    ERROR_RATE = 0
+    LEARNER_MEMORY = 1
+    LEARNER_RUNTIME = 2
+    DELAY = 3
+    TP_LOCATION = 4
+    TP = 5
+    FP = 6
+    FN = 7
+    DETECTOR_MEMORY = 8
+    DETECTOR_RUNTIME = 9
+    NUM_COLUMNS = 10
+
+    COLUMNS_NAMES = ["error_rate", "learner_memory", "learner_runtime", "delay", "tp_location", "tp", "fp", "fn",
+                     "detector_memory", "detector_runtime"]
+    COUNTS_COLUMNS = [DELAY, TP_LOCATION, TP, FP, FN]
+
+    def __init__(self, index, learner, detector, attributes, numeric_attribute_scheme, nominal_attribute_scheme,
+                 actual_drift_points, drift_acceptance_interval, feedback_interval, num_instances, random_seed,
+                 use_asizeof=False, record_step=1):
+
+        self.index = index
+        self.learner = learner
+        self.detector = detector
+
+        self.attributes = attributes
+        self.numeric_attribute_scheme = numeric_attribute_scheme
+        self.nominal_attribute_scheme = nominal_attribute_scheme
+
+        self.actual_drift_points = actual_drift_points
+        self.drift_acceptance_interval = drift_acceptance_interval
+
+        self.drift_loc_index = 0
+        self.drift_current_context = 0
+
+        self.instance_counter = 0
+        self.num_instances = num_instances
+
+        self.feedback_interval = feedback_interval
+        self.feedback_counter = 0
+
+        self.record_step = record_step
+        self.records = []
+        self.located_drift_points = []
+        self.last_stats = None
+
+        self.random_state = random.Random(random_seed).getstate()
+        self.use_asizeof = use_asizeof
+
+    def process(self, records, transformed_records=None):
+        """Runs the pair against the records; the records transformed for the learner category may be given,
+        as they are shared by all the pairs whose learners are of the same category."""
+
+        if transformed_records is None:
+            transformed_records = transform_chunk(records, [self], self.attributes, self.numeric_attribute_scheme,
+                                                  self.nominal_attribute_scheme)[self.learner.LEARNER_CATEGORY]
+
+        random.setstate(self.random_state)
+
+        for record, r in zip(records, transformed_records):
+
+            self.instance_counter += 1
+
+            if self.drift_loc_index < len(self.actual_drift_points) - 1:
+                if self.instance_counter > self.actual_drift_points[self.drift_loc_index] + self.drift_acceptance_interval:
+                    self.drift_loc_index += 1
+
+            if self.drift_current_context < len(self.actual_drift_points):
+                if self.instance_counter > self.actual_drift_points[self.drift_current_context]:
+                    self.drift_current_context += 1
+
+            if record.__contains__("?"):
+                continue
+
+            self.__process_record(r)
+            self.feedback_counter += 1
+
+        self.random_state = random.getstate()
+
+    def __process_record(self, r):
+
+        learner = self.learner
+        detector = self.detector
+
+        # ----------------------
+        #  PREQUENTIAL LEARNING
+        # ----------------------
+        if learner.is_ready():
+
+            real_class = r[len(r) - 1]
+            predicted_class = learner.do_testing(r)
+
+            prediction_status = True
+            if real_class != predicted_class:
+                prediction_status = False
+
+            if detector.DETECTOR_NAME.startswith("CDDM"):
+                confidence = max(learner.get_prediction_prob_list(r))
+                warning_status, drift_status = detector.detect(prediction_status, confidence)
+            else:
+                warning_status, drift_status = detector.detect(prediction_status)
+
+            # -----------------------
+            #  ANY DRIFTS DETECTED?
+            # -----------------------
+            if drift_status:
+
+                # APPENDING ERROR-RATE, MEMORY USAGE, AND RUNTIME OF CLASSIFIER
+                learner_error_rate = PredictionEvaluator.calculate(TornadoDic.ERROR_RATE, learner.get_confusion_matrix())
+                learner_error_rate = round(learner_error_rate, 4)
+                learner_runtime = learner.get_running_time()
+                learner_mem_use = MemoryEvaluator.calculate(learner, self.use_asizeof) / 1000
+
+                # APPENDING FP, FN, MEMORY USAGE, AND RUNTIME OF DETECTOR
+                delay, tp_loc, tp, fp, fn, mem, runtime = self.last_stats[PairProcessor.DELAY:]
+                actual_drift_loc = self.actual_drift_points[self.drift_loc_index]
+                if actual_drift_loc <= self.instance_counter <= actual_drift_loc + self.drift_acceptance_interval:
+                    if self.instance_counter - tp_loc < self.drift_acceptance_interval:
+                        fp += 1
+                    else:
+                        tp += 1
+                        tp_loc = self.instance_counter
+                else:
+                    fp += 1
+                mem = MemoryEvaluator.calculate(detector, self.use_asizeof) / 1000
+                runtime = detector.RUNTIME
+
+                # APPEND 1 INTO LOCATED DRIFT POINTS
+                self.__append_stats([learner_error_rate, learner_mem_use, learner_runtime,
+                                     delay, tp_loc, tp, fp, fn, mem, runtime], 1)
+
+                learner.reset()
+                detector.reset()
+                return
+
+            if learner.LEARNER_TYPE == TornadoDic.TRAINABLE:
+                learner.do_training(r)
+            else:
+                learner.do_loading(r)
+        else:
+            if learner.LEARNER_TYPE == TornadoDic.TRAINABLE:
+                learner.do_training(r)
+            else:
+                learner.do_loading(r)
+
+            learner.set_ready()
+            learner.update_confusion_matrix(r[len(r) - 1], r[len(r) - 1])
+
+        # APPENDING ERROR-RATE, MEMORY USAGE, AND RUNTIME OF CLASSIFIERS
+        learner_error_rate = PredictionEvaluator.calculate(TornadoDic.ERROR_RATE, learner.get_confusion_matrix())
+        learner_error_rate = round(learner_error_rate, 4)
+        if self.feedback_counter % self.feedback_interval == 0 or self.instance_counter == self.num_instances:
+            learner_mem_use = MemoryEvaluator.calculate(learner, self.use_asizeof) / 1000
+        else:
+            learner_mem_use = self.last_stats[PairProcessor.LEARNER_MEMORY]
+        learner_runtime = learner.get_running_time()
+
+        # APPENDING FP, FN, MEMORY USAGE, AND RUNTIME OF DRIFT DETECTORS
+        if self.instance_counter == 1:
+            delay, tp_loc, tp, fp, fn, mem, runtime = [0, 0, 0, 0, 0, 0, 0]
+        else:
+            delay, tp_loc, tp, fp, fn, mem, runtime = self.last_stats[PairProcessor.DELAY:]
+            runtime = detector.RUNTIME
+            if self.feedback_counter % self.feedback_interval == 0 or self.instance_counter == self.num_instances:
+                mem = MemoryEvaluator.calculate(detector, self.use_asizeof) / 1000
+            if self.drift_current_context >= 1:
+                if self.instance_counter >= self.actual_drift_points[self.drift_current_context - 1]:
+                    fn = self.drift_current_context - tp
+                    if self.instance_counter <= self.actual_drift_points[self.drift_current_context - 1] + self.drift_acceptance_interval:
+                        if tp_loc < self.actual_drift_points[self.drift_current_context - 1] or tp_loc > self.actual_drift_points[self.drift_current_context - 1] + self.drift_acceptance_interval:
+                            delay += 1
+        self.__append_stats([learner_error_rate, learner_mem_use, learner_runtime,
+                             delay, tp_loc, tp, fp, fn, mem, runtime], 0)
+
+    def __append_stats(self, record, located_drift_point):
+        # THE FEEDBACK COUNTER IS THE NUMBER OF INSTANCES PROCESSED BEFORE THIS ONE
+        if self.feedback_counter % self.record_step == 0:
+            self.records.append(record)
+        self.located_drift_points.append(located_drift_point)
+        self.last_stats = record
+
+    def collect_stats(self):
+        """Returns the stats recorded since the last call as an array, together with the located drift points
+        and the stats of the last instance, and clears them."""
+        stats = [numpy.array(self.records, dtype=float).reshape(-1, PairProcessor.NUM_COLUMNS),
+                 numpy.array(self.located_drift_points, dtype=numpy.int8), self.last_stats]
+        self.records = []
+        self.located_drift_points = []
+        return stats
+
+    @staticmethod
+    def get_learner_stats(record):
+        return record[PairProcessor.ERROR_RATE:PairProcessor.LEARNER_RUNTIME + 1]
+
+    @staticmethod
+    def get_detector_stats(record):
+        delay, tp_loc, tp, fp, fn, mem, runtime = record[PairProcessor.DELAY:]
+        return [int(delay), [int(tp_loc), int(tp)], int(fp), int(fn), mem, runtime]
+
+
+def transform_chunk(records, processors, attributes, numeric_attribute_scheme, nominal_attribute_scheme,
+                    views=None, start=0):
+    """Transforms the records once for each learner category among the processors. All the learners of a category
+    share the same transformed records, so learners must not modify records in place. Records with missing values
+    are left as None, since they are skipped. If the views of the stream are given, the records are picked from
+    them, where start is the index of the first record in the stream."""
+    transformed_chunks = {}
+    for processor in processors:
+        category = processor.learner.LEARNER_CATEGORY
+        if transformed_chunks.__contains__(category):
+            continue
+        if views is not None:
+            transformed_chunks[category] = views.get_transformed_records(start, start + len(records), category)
+            continue
+        transformed_records = []
+        for record in records:
+            if record.__contains__("?"):
+                transformed_records.append(None)
+                continue
+            # ---------------------
+            #  DATA TRANSFORMATION
+            # ---------------------
+            r = copy.copy(record)
+            for k in range(0, len(r) - 1):
+                if category == TornadoDic.NOM_CLASSIFIER and attributes[k].TYPE == TornadoDic.NUMERIC_ATTRIBUTE:
+                    r[k] = Discretizer.find_bin(r[k], nominal_attribute_scheme[k])
+                elif category == TornadoDic.NUM_CLASSIFIER and attributes[k].TYPE == TornadoDic.NOMINAL_ATTRIBUTE:
+                    r[k] = NominalToNumericTransformer.map_attribute_value(r[k], numeric_attribute_scheme[k])
+            # NORMALIZING NUMERIC DATA
+            if category == TornadoDic.NUM_CLASSIFIER:
+                r[0:len(r) - 1] = Normalizer.normalize(r[0:len(r) - 1], numeric_attribute_scheme)
+            transformed_records.append(r)
+        transformed_chunks[category] = transformed_records
+    return transformed_chunks
+
+
+def run_pairs_worker(connection, processors):
+    """The loop of a worker process. It runs its pairs against every chunk received, sends back their stats,
+    and finally sends back the processors themselves once it receives None, or a copy of them for a checkpoint.
+    If anything fails, the exception is sent back instead, to be raised again in the main process."""
+    try:
+        while True:
+            message = connection.recv()
+            if message is None:
+                connection.send(processors)
+                break
+            if message == "checkpoint":
+                connection.send(processors)
+                continue
+            records, transformed_chunks = message
+            if transformed_chunks is None:
+                transformed_chunks = transform_chunk(records, processors, processors[0].attributes,
+                                                     processors[0].numeric_attribute_scheme,
+                                                     processors[0].nominal_attribute_scheme)
+            stats = []
+            for processor in processors:
+                processor.process(records, transformed_chunks[processor.learner.LEARNER_CATEGORY])
+                stats.append(processor.collect_stats())
+            connection.send(stats)
+    except Exception as exception:
+        traceback.print_exc()
+        try:
+            connection.send(exception)
+        except Exception:
+            # THE EXCEPTION MAY NOT BE PICKLED, E.G. IF IT HOLDS A LEARNER
+            connection.send(RuntimeError(repr(exception)))
+    connection.close()
+
+
+def receive_from_worker(connection):
+    """Returns the message of a worker, or raises the exception which the worker has sent back."""
+    message = connection.recv()
+    if isinstance(message, Exception):
+        raise message
+    return message
@@ -0,0 +1,119 @@
+"""
+The Tornado Framework
+By Ali Pesaranghader
+University of Ottawa, Ontario, Canada
+E-mail: apesaran -at- uottawa -dot- ca / alipsgh -at- gmail -dot- com
+"""
+
+import copy
+import random
+
+from data_structures.outcome_trace import OutcomeTrace
+from filters.attribute_handlers import *
+from streams.readers.arff_reader import ARFFReader
+
+
+class PrequentialTraceRecorder:
+    """This class lets one run a classifier against a data stream prequentially, and record whether
+    each of its predictions was correct, together with the confidence of the prediction if asked for,
+    into an outcome trace. The trace may then be replayed through drift detectors by DetectorsTraceReplay.
+    The classifier is never reset, as there is no detector in the loop; the trace is thus the outcomes
+    of the classifier as it learns the whole stream."""
+
+    def __init__(self, learner, attributes, attributes_scheme, project=None):
+
+        self.learner = learner
+
+        self.__instance_counter = 0
+        self.__num_rubbish = 0
+
+        self.__outcomes = []
+        self.__positions = []
+        self.__confidences = []
+
+        self.__attributes = attributes
+        self.__numeric_attribute_scheme = attributes_scheme['numeric']
+        self.__nominal_attribute_scheme = attributes_scheme['nominal']
+
+        self.__project = project
+
+    def run(self, stream, random_seed=1, record_confidences=False):
+
+        random.seed(random_seed)
+
+        # THE CONFIDENCES ARE ONLY RECORDED FOR LEARNERS WHICH GIVE PROBABILITIES OF CLASSES
+        record_confidences = record_confidences and hasattr(self.learner, "get_prediction_prob_list")
+
+        # THE STREAM MAY BE AN ITERATOR WITHOUT ANY LENGTH, E.G. A GENERATOR, OR A LAZY STREAM OF UNKNOWN LENGTH
+        num_instances = ARFFReader.get_num_instances(stream)
+
+        for record in stream:
+
+            self.__instance_counter += 1
+
+            if num_instances is not None:
+                progress = "%0.2f" % ((self.__instance_counter / num_instances) * 100) + "% of instances"
+            else:
+                progress = str(self.__instance_counter) + " instances"
+            print(progress + " are prequentially processed!", end="\r")
+
+            if record.__contains__("?"):
+                self.__num_rubbish += 1
+                continue
+
+            # ---------------------
+            #  Data Transformation
+            # ---------------------
+            if hasattr(stream, "get_transformed_record"):
+                # THE STREAM HAS PRECOMPUTED VIEWS
+                r = stream.get_transformed_record(self.__instance_counter - 1, self.learner.LEARNER_CATEGORY)
+            else:
+                r = copy.copy(record)
+                for k in range(0, len(r) - 1):
+                    if self.learner.LEARNER_CATEGORY == TornadoDic.NOM_CLASSIFIER and self.__attributes[k].TYPE == TornadoDic.NUMERIC_ATTRIBUTE:
+                        r[k] = Discretizer.find_bin(r[k], self.__nominal_attribute_scheme[k])
+                    elif self.learner.LEARNER_CATEGORY == TornadoDic.NUM_CLASSIFIER and self.__attributes[k].TYPE == TornadoDic.NOMINAL_ATTRIBUTE:
+                        r[k] = NominalToNumericTransformer.map_attribute_value(r[k], self.__numeric_attribute_scheme[k])
+                # NORMALIZING NUMERIC DATA
+                if self.learner.LEARNER_CATEGORY == TornadoDic.NUM_CLASSIFIER:
+                    r[0:len(r) - 1] = Normalizer.normalize(r[0:len(r) - 1], self.__numeric_attribute_scheme)
+
+            # ----------------------
+            #  Prequential Learning
+            # ----------------------
+            if self.learner.is_ready():
+
+                real_class = r[len(r) - 1]
+                predicted_class = self.learner.do_testing(r)
+
+                self.__outcomes.append(real_class == predicted_class)
+                self.__positions.append(self.__instance_counter)
+                if record_confidences:
+                    self.__confidences.append(max(self.learner.get_prediction_prob_list(r)))
+
+                if self.learner.LEARNER_TYPE == TornadoDic.TRAINABLE:
+                    self.learner.do_training(r)
+                else:
+                    self.learner.do_loading(r)
+            else:
+                if self.learner.LEARNER_TYPE == TornadoDic.TRAINABLE:
+                    self.learner.do_training(r)
+                else:
+                    self.learner.do_loading(r)
+
+                self.learner.set_ready()
+                self.learner.update_confusion_matrix(r[len(r) - 1], r[len(r) - 1])
+
+        print("\n" + "The stream is completely processed.")
+
+        metadata = {"learner": self.learner.LEARNER_NAME,
+                    "random_seed": random_seed,
+                    "num_instances": self.__instance_counter}
+        trace = OutcomeTrace(self.__outcomes, self.__positions,
+                             self.__confidences if record_confidences else None, metadata)
+
+        if self.__project is not None:
+            learner_name = TornadoDic.get_short_names(self.learner.LEARNER_NAME)
+            trace.save(self.__project.get_path(), self.__project.get_name() + "_" + learner_name)
+
+        return trace
@@ -0,0 +1,146 @@
+"""
+The Tornado Framework
+By Ali Pesaranghader
+University of Ottawa, Ontario, Canada
+E-mail: apesaran -at- uottawa -dot- ca / alipsgh -at- gmail -dot- com
+"""
+
+import multiprocessing
+import os
+
+import numpy
+
+from archiver.archiver import Archiver
+from data_structures.attribute_scheme import AttributeScheme
+from filters.project_creator import Project
+from streams.readers.arff_reader import ARFFReader
+from tasks.prequential_learner_detector_pairs import PrequentialMultiPairs
+
+
+class RepeatedMultiPairs:
+    """This lets one run the same pairs of (classifier, detector) against several streams, each of them
+    with several random seeds, where every (stream, seed) job is a PrequentialMultiPairs run in a pool of processes.
+    The repetitions of a stream are the files whose names only differ in their last suffix, e.g. _101 to _105;
+    for each stream, the mean and the standard deviation of the measures of the pairs over its runs are stored.
+    The pairs are built in each job by pairs_creator(labels, attributes_scheme), which thus must be a function
+    defined at the top level of a module, so that it can be sent to the processes."""
+
+    MEASURES_NAMES = ["Error-rate", "Delay", "TP", "FP", "FN", "Memory", "Runtime"]
+
+    def __init__(self, streams_paths, pairs_creator, actual_drift_points, drift_acceptance_interval, w_vec,
+                 project_folder, random_seeds=None, record_step=1):
+
+        self.streams_paths = streams_paths
+        self.pairs_creator = pairs_creator
+
+        self.actual_drift_points = actual_drift_points
+        self.drift_acceptance_interval = drift_acceptance_interval
+        self.w_vec = w_vec
+
+        self.project_folder = project_folder
+        self.random_seeds = random_seeds if random_seeds is not None else [1]
+        self.record_step = record_step
+
+        self.pairs_names = []
+        self.runs = {}
+        self.mean = {}
+        self.std = {}
+
+    def run(self, num_workers=None):
+        """Runs all jobs, with as many processes as CPUs by default, and returns the mean and the standard deviation
+        of the measures, for each stream, as arrays with one row per pair and one column per measure."""
+
+        jobs = []
+        for stream_path in self.streams_paths:
+            for random_seed in self.random_seeds:
+                jobs.append([stream_path, random_seed, self.pairs_creator, self.actual_drift_points,
+                             self.drift_acceptance_interval, self.w_vec, self.project_folder, self.record_step])
+
+        num_workers = num_workers if num_workers is not None else os.cpu_count()
+        num_workers = min(num_workers, len(jobs))
+        if num_workers > 1:
+            pool = multiprocessing.Pool(num_workers)
+            results = pool.map(run_multi_pairs_job, jobs, chunksize=1)
+            pool.close()
+            pool.join()
+        else:
+            results = [run_multi_pairs_job(job) for job in jobs]
+
+        # THE RUNS ARE GROUPED BY THEIR STREAMS, IN THE ORDER OF THE JOBS
+        self.runs = {}
+        for stream_path, random_seed, pairs_names, measures in results:
+            self.pairs_names = pairs_names
+            self.runs.setdefault(RepeatedMultiPairs.get_stream_name(stream_path), []).append(measures)
+
+        self.store_stats()
+
+        print("THE END")
+        print("\a")
+
+        return self.mean, self.std
+
+    @staticmethod
+    def get_stream_name(stream_path):
+        file_name = os.path.splitext(os.path.basename(stream_path))[0]
+        return file_name.rsplit("_", 1)[0]
+
+    def store_stats(self):
+
+        project = Project(self.project_folder, "repeated")
+        for stream_name, runs in self.runs.items():
+            runs = numpy.array(runs)
+            self.mean[stream_name] = numpy.mean(runs, axis=0)
+            self.std[stream_name] = numpy.std(runs, axis=0)
+
+            for sub_name, table in [["mean", self.mean[stream_name]], ["std", self.std[stream_name]]]:
+                stats_writer = open(project.get_path() + (stream_name + "_" + sub_name).lower() + ".txt", "w")
+                stats_writer.write("[Name, " + ", ".join(RepeatedMultiPairs.MEASURES_NAMES) + "]" + "\n")
+                for name, row in zip(self.pairs_names, table):
+                    stats_writer.write(name + ":\t" + "\t".join("%0.4f" % v for v in row) + "\n")
+                stats_writer.close()
+
+            metadata = {"pairs_names": self.pairs_names,
+                        "measures_names": RepeatedMultiPairs.MEASURES_NAMES,
+                        "num_runs": len(runs),
+                        "random_seeds": self.random_seeds}
+            Archiver.archive_arrays({"runs": runs, "mean": self.mean[stream_name], "std": self.std[stream_name]},
+                                    project.get_path(), stream_name, "repeated", metadata)
+
+        self.print_stats()
+
+    def print_stats(self):
+
+        for stream_name in self.runs.keys():
+            print(stream_name + ": " + str(len(self.runs[stream_name])) + " runs")
+            print("[Name, " + ", ".join(RepeatedMultiPairs.MEASURES_NAMES) + "]")
+            for name, mean, std in zip(self.pairs_names, self.mean[stream_name], self.std[stream_name]):
+                print(name + ":\t" + "\t".join("%0.4f (%0.4f)" % (m, s) for m, s in zip(mean, std)))
+
+
+def run_multi_pairs_job(job):
+    """Runs one (stream, seed) job, and returns the measures of its pairs as an array with one row per pair:
+    the average error-rate, the detection delay, TP, FP, FN, the average memory usage and the average runtime."""
+
+    stream_path, random_seed, pairs_creator, actual_drift_points, drift_acceptance_interval, w_vec, \
+        project_folder, record_step = job
+
+    labels, attributes, stream_records = ARFFReader.read(stream_path)
+    attributes_scheme = AttributeScheme.get_scheme(attributes)
+    pairs = pairs_creator(labels, attributes_scheme)
+
+    stream_name = RepeatedMultiPairs.get_stream_name(stream_path)
+    file_name = os.path.splitext(os.path.basename(stream_path))[0]
+    project = Project(project_folder + "/" + stream_name, file_name + "_" + str(random_seed))
+
+    prequential = PrequentialMultiPairs(pairs, attributes, attributes_scheme,
+                                        list(actual_drift_points), drift_acceptance_interval,
+                                        w_vec, project, record_step=record_step)
+    prequential.run(stream_records, random_seed)
+
+    measures = []
+    for i in range(0, len(pairs)):
+        dl, (tp_loc, tp), fp, fn = prequential.dl_tp_fp_fn[i]
+        measures.append([numpy.mean(prequential.er[i]), dl, tp, fp, fn,
+                         numpy.mean(prequential.mu[i]), numpy.mean(prequential.rt[i])])
+
+    return [stream_path, random_seed, prequential.pairs_names, numpy.array(measures)]
@@ -0,0 +1,10 @@
+import numpy
+import pytest
+
+
+@pytest.fixture
+def outcomes():
+    # THE ACCURACY DROPS FROM 0.9 TO 0.6 AT 3000, AND RISES TO 0.85 AT 6000
+    rng = numpy.random.RandomState(1)
+    p = numpy.concatenate([numpy.full(3000, 0.9), numpy.full(3000, 0.6), numpy.full(3000, 0.85)])
+    return rng.rand(len(p)) < p
@@ -0,0 +1,29 @@
+from data_structures.outcome_window import OutcomeWindow
+from drift_detection.ddm import DDM
+from drift_detection.fhddm import FHDDM
+from drift_detection.fhddms import FHDDMS
+from drift_detection.hddm_a import HDDM_A_test
+from drift_detection.mddm_a import MDDM_A
+
+
+def detect_one_by_one(detector, outcomes, reset_on_drift):
+    warning_indexes, drift_indexes = [], []
+    for i, pr in enumerate(outcomes.tolist()):
+        warning_status, drift_status = detector.detect(pr)
+        if warning_status:
+            warning_indexes.append(i)
+        if drift_status:
+            drift_indexes.append(i)
+            if reset_on_drift:
+                detector.reset()
+    return warning_indexes, drift_indexes
+
+
+def test_detect_batch_of_float_outcomes(outcomes):
+    for create_detector in [lambda: DDM(), lambda: FHDDM(), lambda: FHDDMS(), lambda: MDDM_A(),
+                            lambda: HDDM_A_test(), lambda: HDDM_A_test(test_type='one-sided'),
+                            lambda: FHDDM(outcome_window=OutcomeWindow())]:
+        for reset_on_drift in [True, False]:
+            expected = detect_one_by_one(create_detector(), outcomes, reset_on_drift)
+            assert len(expected[1]) > 0
+            assert create_detector().detect_batch(outcomes.astype(float), reset_on_drift) == expected
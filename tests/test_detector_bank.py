@@ -0,0 +1,43 @@
+import numpy
+import pytest
+
+from drift_detection.ddm import DDM, DDMBank
+from drift_detection.fhddm import FHDDM, FHDDMBank
+from drift_detection.hddm_a import HDDM_A_test, HDDM_A_test_Bank
+
+
+def create_streams(num_streams, num_steps):
+    # EACH STREAM HAS ITS OWN ACCURACIES, WHICH CHANGE AT RANDOM STEPS
+    rng = numpy.random.RandomState(7)
+    p = numpy.empty((num_streams, num_steps))
+    for i in range(0, num_streams):
+        changes = numpy.sort(rng.randint(0, num_steps, rng.randint(0, 6)))
+        levels = rng.uniform(0.4, 0.99, len(changes) + 1)
+        p[i] = levels[numpy.searchsorted(changes, numpy.arange(0, num_steps), side='right')]
+    # SOME DETECTORS ARE ALSO RESET AT RANDOM, AS WHEN THEIR LEARNERS ARE REPLACED
+    return rng.rand(num_streams, num_steps) < p, rng.rand(num_streams, num_steps) < 0.0005
+
+
+@pytest.mark.parametrize("create_bank, create_detector", [
+    (lambda k: DDMBank(k), lambda: DDM()),
+    (lambda k: FHDDMBank(k), lambda: FHDDM()),
+    (lambda k: FHDDMBank(k, n=25), lambda: FHDDM(n=25)),
+    (lambda k: HDDM_A_test_Bank(k), lambda: HDDM_A_test()),
+    (lambda k: HDDM_A_test_Bank(k, test_type='one-sided'), lambda: HDDM_A_test(test_type='one-sided'))])
+def test_bank_matches_its_detectors(create_bank, create_detector):
+    outcomes, extra_resets = create_streams(40, 6000)
+    bank = create_bank(len(outcomes))
+    detectors = [create_detector() for _ in range(0, len(outcomes))]
+
+    num_drifts = 0
+    for t in range(0, outcomes.shape[1]):
+        warnings, drifts = bank.detect(outcomes[:, t])
+        for i, detector in enumerate(detectors):
+            warning_status, drift_status = detector.detect(bool(outcomes[i, t]))
+            assert (warning_status, drift_status) == (bool(warnings[i]), bool(drifts[i]))
+        resets = drifts | extra_resets[:, t]
+        bank.reset(resets)
+        for i in numpy.flatnonzero(resets).tolist():
+            detectors[i].reset()
+        num_drifts += int(drifts.sum())
+    assert num_drifts > 0
@@ -0,0 +1,20 @@
+from drift_detection.fhddm import FHDDM
+from drift_detection.fhddms import FHDDMS
+
+
+def locate_drifts(detector, outcomes):
+    drifts = []
+    for i, pr in enumerate(outcomes):
+        warning_status, drift_status = detector.detect(pr)
+        if drift_status:
+            drifts.append(i)
+            detector.reset()
+    return drifts
+
+
+def test_fhddm_accepts_numpy_and_integer_outcomes(outcomes):
+    for create_detector in [lambda: FHDDM(), lambda: FHDDMS()]:
+        expected = locate_drifts(create_detector(), outcomes.tolist())
+        assert len(expected) > 0
+        assert locate_drifts(create_detector(), list(outcomes)) == expected
+        assert locate_drifts(create_detector(), outcomes.astype(int).tolist()) == expected
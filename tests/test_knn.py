@@ -0,0 +1,44 @@
+import random
+
+from classifier.knn import KNN
+from classifier.perceptron import Perceptron
+from data_structures.attribute import Attribute
+from data_structures.attribute_scheme import AttributeScheme
+from dictionary.tornado_dictionary import TornadoDic
+
+
+def create_attributes():
+    attributes = []
+    for name in ["x", "y"]:
+        attribute = Attribute()
+        attribute.set_name(name)
+        attribute.set_type(TornadoDic.NUMERIC_ATTRIBUTE)
+        attribute.set_bounds_values(0, 1)
+        attributes.append(attribute)
+    return attributes
+
+
+def create_records(n):
+    rng = random.Random(1)
+    records = []
+    for i in range(0, n):
+        x, y = rng.random(), rng.random()
+        records.append([x, y, "p" if x + y > 1 else "n"])
+    return records
+
+
+def test_knn_built_after_perceptron_sharing_attributes():
+    labels = ["p", "n"]
+    scheme = AttributeScheme.get_scheme(create_attributes())
+    # PERCEPTRON APPENDS ITS BIAS ATTRIBUTE TO THE SHARED LIST OF NUMERIC ATTRIBUTES
+    Perceptron(labels, scheme['numeric'])
+    knn = KNN(labels, scheme['numeric'], window_size=10)
+    reference = KNN(labels, AttributeScheme.get_scheme(create_attributes())['numeric'], window_size=10)
+
+    for record in create_records(50):
+        if knn.is_ready():
+            assert knn.do_testing(record) == reference.do_testing(record)
+        knn.do_loading(record)
+        reference.do_loading(record)
+        knn.set_ready()
+        reference.set_ready()
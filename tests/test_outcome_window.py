@@ -0,0 +1,50 @@
+import pytest
+
+from data_structures.outcome_window import OutcomeWindow
+from drift_detection.fhddm import FHDDM
+from drift_detection.fhddms import FHDDMS
+from drift_detection.mddm_g import MDDM_G
+
+
+def create_detectors(outcome_window=None):
+    return [FHDDM(100, outcome_window=outcome_window), FHDDMS(4, 25, outcome_window=outcome_window),
+            MDDM_G(50, outcome_window=outcome_window)]
+
+
+def test_shared_window_gives_same_drifts(outcomes):
+    shared, unshared = create_detectors(OutcomeWindow()), create_detectors()
+    for pr in outcomes.tolist():
+        for detector, reference in zip(shared, unshared):
+            status = detector.detect(pr)
+            assert status == reference.detect(pr)
+            if status[1]:
+                detector.reset()
+                reference.reset()
+
+
+def test_subscribers_fed_different_outcomes():
+    outcome_window = OutcomeWindow()
+    detector, other = FHDDM(10, outcome_window=outcome_window), FHDDM(10, outcome_window=outcome_window)
+    detector.detect(True)
+    with pytest.raises(ValueError):
+        other.detect(False)
+
+
+def test_subscribers_out_of_lockstep():
+    outcome_window = OutcomeWindow()
+    detector, other = FHDDM(10, outcome_window=outcome_window), FHDDM(10, outcome_window=outcome_window)
+    detector.detect(True)
+    detector.detect(True)
+    with pytest.raises(ValueError):
+        other.detect(True)
+
+
+def test_subscribers_fed_a_batch():
+    outcome_window = OutcomeWindow()
+    detector, other = FHDDM(10, outcome_window=outcome_window), FHDDMS(4, 5, outcome_window=outcome_window)
+    # THE BATCH IS REJECTED BEFORE ANY OUTCOME IS ADDED TO THE WINDOW
+    with pytest.raises(ValueError):
+        detector.detect_batch([True] * 20)
+    assert outcome_window.TIME == 0
+    detector.detect(True)
+    other.detect(True)
@@ -0,0 +1,149 @@
+import random
+
+import numpy
+import pytest
+
+from classifier.naive_bayes import NaiveBayes
+from classifier.perceptron import Perceptron
+from data_structures.attribute import Attribute
+from data_structures.attribute_scheme import AttributeScheme
+from data_structures.outcome_window import OutcomeWindow
+from dictionary.tornado_dictionary import TornadoDic
+from drift_detection.ddm import DDM
+from drift_detection.fhddm import FHDDM
+from drift_detection.hddm_a import HDDM_A_test
+from filters.project_creator import Project
+from tasks.prequential_learner_detector_pairs import PrequentialMultiPairs, PairProcessor
+
+
+def create_attributes():
+    attributes = []
+    for name in ["x", "y"]:
+        attribute = Attribute()
+        attribute.set_name(name)
+        attribute.set_type(TornadoDic.NUMERIC_ATTRIBUTE)
+        attribute.set_bounds_values(0, 1)
+        attributes.append(attribute)
+    return attributes
+
+
+def create_records(n):
+    # THE CONCEPT IS FLIPPED HALFWAY THROUGH THE STREAM
+    rng = random.Random(1)
+    records = []
+    for i in range(0, n):
+        x, y = rng.random(), rng.random()
+        positive = (x + y > 1) if i < n // 2 else (x + y <= 1)
+        records.append([x, y, "p" if positive else "n"])
+    return records
+
+
+def create_prequential(folder, learner=NaiveBayes):
+    # PERCEPTRON DRAWS ITS INITIAL WEIGHTS FROM THE GLOBAL RANDOM STATE
+    random.seed(1)
+    labels, attributes = ["p", "n"], create_attributes()
+    scheme = AttributeScheme.get_scheme(attributes)
+    pairs = [[learner(labels, scheme['nominal']), FHDDM()],
+             [learner(labels, scheme['nominal']), DDM()],
+             [Perceptron(labels, scheme['numeric']), FHDDM()],
+             [Perceptron(labels, scheme['numeric']), HDDM_A_test()]]
+    return PrequentialMultiPairs(pairs, attributes, scheme, [1500], 250, [1, 1, 1, 1, 1, 1],
+                                 Project(folder, "pairs"))
+
+
+def get_deterministic_stats(prequential):
+    # THE RUNTIMES ARE MEASURED AS THE RUN GOES, AND THE MEMORY ESTIMATES DEPEND ON HOW THE OBJECTS WERE BUILT,
+    # E.G. BY UNPICKLING IN A WORKER, SO THEY DIFFER FROM ONE RUN TO ANOTHER
+    excluded = [PairProcessor.LEARNER_MEMORY, PairProcessor.DETECTOR_MEMORY,
+                PairProcessor.LEARNER_RUNTIME, PairProcessor.DETECTOR_RUNTIME]
+    columns = [k for k in range(0, PairProcessor.NUM_COLUMNS) if k not in excluded]
+    return prequential.stats[:, :prequential.num_records[0]][:, :, columns]
+
+
+class FailingNaiveBayes(NaiveBayes):
+
+    def train(self, instance):
+        if self.NUMBER_OF_INSTANCES_OBSERVED == 1200:
+            raise ValueError('FAILED ON PURPOSE')
+        super().train(instance)
+
+
+@pytest.fixture(autouse=True)
+def no_plots(monkeypatch):
+    monkeypatch.setattr(PrequentialMultiPairs, "plot", lambda self: None)
+
+
+def test_workers_give_the_same_stats_as_a_sequential_run(tmp_path):
+    records = create_records(3000)
+    sequential = create_prequential(str(tmp_path / "sequential"))
+    sequential.run(records, 1, chunk_size=400)
+    parallel = create_prequential(str(tmp_path / "parallel"))
+    parallel.run(records, 1, num_workers=2, chunk_size=400)
+
+    assert numpy.array_equal(get_deterministic_stats(sequential), get_deterministic_stats(parallel), equal_nan=True)
+    assert numpy.array_equal(sequential.pair_located_drift_points, parallel.pair_located_drift_points)
+    assert sequential.dl_tp_fp_fn == parallel.dl_tp_fp_fn
+
+
+def test_failure_in_a_worker_is_raised_in_the_main_process(tmp_path):
+    prequential = create_prequential(str(tmp_path), learner=FailingNaiveBayes)
+    with pytest.raises(ValueError, match='FAILED ON PURPOSE'):
+        prequential.run(create_records(3000), 1, num_workers=2, chunk_size=400)
+
+
+class CrashingStream(list):
+    """A stream whose second iteration crashes at the given record; its first one is the hash of its records."""
+
+    def __init__(self, records, crash_at):
+        super().__init__(records)
+        self.crash_at = crash_at
+        self.iterations = 0
+
+    def __iter__(self):
+        self.iterations += 1
+        for i, record in enumerate(super().__iter__()):
+            if self.iterations == 2 and i == self.crash_at:
+                raise KeyboardInterrupt
+            yield record
+
+
+@pytest.mark.parametrize("num_workers", [1, 2])
+def test_resumed_run_gives_the_same_stats_as_an_uninterrupted_run(tmp_path, num_workers):
+    records = create_records(3000)
+    uninterrupted = create_prequential(str(tmp_path / "uninterrupted"))
+    uninterrupted.run(records, 1, num_workers=num_workers, chunk_size=300)
+
+    crashed = create_prequential(str(tmp_path / "resumed"))
+    with pytest.raises(KeyboardInterrupt):
+        crashed.run(CrashingStream(records, 2345), 1, num_workers=num_workers, chunk_size=300,
+                    checkpoint_interval=700)
+    assert crashed.num_checkpoints > 0
+    resumed = create_prequential(str(tmp_path / "resumed"))
+    resumed.run(records, 1, num_workers=num_workers, chunk_size=300, checkpoint_interval=700, resume=True)
+
+    assert numpy.array_equal(uninterrupted.er, resumed.er)
+    assert uninterrupted.dl_tp_fp_fn == resumed.dl_tp_fp_fn
+    assert not (tmp_path / "resumed" / "pairs" / "checkpoints").exists()
+
+
+def test_run_which_is_not_checkpointed_ignores_the_checkpoints(tmp_path):
+    records = create_records(3000)
+    crashed = create_prequential(str(tmp_path))
+    with pytest.raises(KeyboardInterrupt):
+        crashed.run(CrashingStream(records, 2345), 1, chunk_size=300, checkpoint_interval=700)
+
+    # A GENERATOR CANNOT BE IDENTIFIED FOR ITS CHECKPOINTS, SO IT IS RUN WITHOUT LOOKING FOR THEM
+    prequential = create_prequential(str(tmp_path))
+    prequential.run((record for record in records), 1, chunk_size=300)
+    assert prequential.num_records[0] == len(records)
+    assert (tmp_path / "pairs" / "checkpoints").exists()
+
+
+def test_pairs_cannot_share_an_outcome_window(tmp_path):
+    labels, attributes = ["p", "n"], create_attributes()
+    scheme = AttributeScheme.get_scheme(attributes)
+    outcome_window = OutcomeWindow()
+    pairs = [[NaiveBayes(labels, scheme['nominal']), FHDDM(outcome_window=outcome_window)],
+             [NaiveBayes(labels, scheme['nominal']), FHDDM(n=50, outcome_window=outcome_window)]]
+    with pytest.raises(ValueError, match='CANNOT SHARE AN OUTCOME WINDOW'):
+        PrequentialMultiPairs(pairs, attributes, scheme, [1500], 250, [1, 1, 1, 1, 1, 1], Project(str(tmp_path), "pairs"))